@@ -3,20 +3,31 @@ PTSC Document Management System - Backend API
 Flask server for handling Excel import, database operations
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, Response, make_response
 from flask_cors import CORS
 import os
 import json
-from datetime import datetime
-import sqlite3
+import hashlib
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from functools import wraps
 from werkzeug.utils import secure_filename
 import sys
 
 # Add scripts directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'scripts'))
 
-from export_db_to_json_v2 import export_database_to_json
+from export_db_to_json_v2 import open_export_stream, iter_gzip
 from excel_importer import process_excel_file
+from document_query import query_documents, FILTER_COLUMNS, DEFAULT_LIMIT
+from data_version import get_data_version
+from stats_summary import read_stats_summary
+from db_connection import get_connection, release_connections
+from job_queue import JobQueue
+from change_log import query_changes, DEFAULT_LIMIT as CHANGES_DEFAULT_LIMIT
+from row_version import query_delta
+from document_search import search_documents, DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
@@ -24,13 +35,51 @@ CORS(app)  # Enable CORS for React frontend
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 DATABASE_PATH = 'project_data.db'
+JOBS_DATABASE_PATH = 'jobs.db'  # separate file: imports hold the documents write lock
 ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+jobs = JobQueue(JOBS_DATABASE_PATH, workers=int(os.environ.get('IMPORT_WORKERS', 1)))
+
+@app.teardown_appcontext
+def release_db(exception):
+    """Connections are reused per worker thread; reset any open transaction"""
+    release_connections()
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def cached_by_data_version(view):
+    """
+    Conditional GET support for read endpoints
+    
+    The ETag is derived from the data version counter (bumped by every
+    import/scan/feedback/upload) and the request URL, so unchanged data is
+    answered with 304 Not Modified without touching the documents table.
+    The ETag is authoritative: Last-Modified is sent for information only,
+    its one-second resolution cannot tell apart two writes in the same second.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version, updated_at = get_data_version(DATABASE_PATH)
+        url_hash = hashlib.md5(request.full_path.encode('utf-8')).hexdigest()[:12]
+        etag = f"v{version}-{url_hash}"
+        
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        
+        response.set_etag(etag)
+        if updated_at:
+            response.last_modified = datetime.fromtimestamp(int(updated_at), tz=timezone.utc)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
 # ============================================
 # API Routes
 # ============================================
@@ -45,16 +94,134 @@ def health_check():
     })
 
 @app.route('/api/documents', methods=['GET'])
+@cached_by_data_version
 def get_documents():
-    """Get all documents from database"""
+    """
+    Get one page of documents from database
+    
+    Query params:
+        limit: page size (default 100, max 1000)
+        cursor: nextCursor from the previous page
+        sort / order: sort field and asc|desc (default stt asc)
+        discipline, scope, doc_status, ipi_status, review_code, table:
+            filters, repeat a param to match any of several values
+    """
+    try:
+        filters = {key: request.args.getlist(key) for key in FILTER_COLUMNS if key in request.args}
+        data = query_documents(
+            DATABASE_PATH,
+            filters=filters,
+            sort=request.args.get('sort', 'stt'),
+            order=request.args.get('order', 'asc').lower(),
+            limit=request.args.get('limit', DEFAULT_LIMIT, type=int),
+            cursor=request.args.get('cursor')
+        )
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/search', methods=['GET'])
+@cached_by_data_version
+def search():
+    """
+    Full-text search over document names, descriptions and doc/transmittal numbers
+    
+    Query params:
+        q: words to search for; each word also matches as a prefix
+        limit: page size (default 50, max 500)
+        offset: number of results to skip
+    """
+    try:
+        data = search_documents(
+            DATABASE_PATH,
+            request.args.get('q', ''),
+            limit=request.args.get('limit', SEARCH_DEFAULT_LIMIT),
+            offset=request.args.get('offset', 0)
+        )
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/documents/delta', methods=['GET'])
+@cached_by_data_version
+def get_documents_delta():
+    """
+    MDI documents inserted, updated or deleted since a row version
+    
+    Query params:
+        since: version from the previous delta, or metadata.rowVersion of
+            the JSON export (default 0: everything)
+    """
+    try:
+        data = query_delta(DATABASE_PATH, since=request.args.get('since', 0))
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/changes', methods=['GET'])
+@cached_by_data_version
+def get_changes():
+    """
+    Field-level changes made by Excel imports
+    
+    Query params:
+        since: latestImportId from the previous call (default 0: everything)
+        limit: page size (default 1000, max 10000)
+        cursor: nextCursor from the previous page
+    """
     try:
-        # Export database to JSON format
-        data = export_database_to_json(DATABASE_PATH, return_dict=True)
+        data = query_changes(
+            DATABASE_PATH,
+            since=request.args.get('since', 0),
+            limit=request.args.get('limit', CHANGES_DEFAULT_LIMIT),
+            cursor=request.args.get('cursor')
+        )
         
         return jsonify({
             'success': True,
             'data': data
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -85,22 +252,26 @@ def upload_file():
                 'error': 'Invalid file type. Only .xlsx and .xls allowed'
             }), 400
         
-        # Save uploaded file
+        # Save uploaded file (unique name: several imports may be queued)
         filename = secure_filename(file.filename)
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
+        filepath = os.path.join(UPLOAD_FOLDER, f'{uuid.uuid4().hex}_{filename}')
         file.save(filepath)
         
-        # Process Excel file and import to database
-        result = process_excel_file(filepath, DATABASE_PATH)
+        # clean=1: run the cleaner's transforms in memory and import in one pass
+        clean = request.form.get('clean', '').lower() in ('1', 'true')
         
-        # Clean up uploaded file
-        os.remove(filepath)
+        # Import in the background; poll /api/jobs/<id> for progress
+        job_id = jobs.submit('excel_import', import_upload, filepath, DATABASE_PATH, clean)
         
         return jsonify({
             'success': True,
-            'message': f'Imported {result["count"]} documents',
-            'data': result
-        })
+            'message': f'Import of {filename} queued',
+            'data': {
+                'jobId': job_id,
+                'status': 'queued',
+                'statusUrl': f'/api/jobs/{job_id}'
+            }
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -108,61 +279,92 @@ def upload_file():
             'error': str(e)
         }), 500
 
+def import_upload(filepath, db_path, clean, progress):
+    """
+    Background job: import an uploaded workbook, then delete it
+
+    A rolled-back import is reported in stats['errors'] rather than raised;
+    raise it here so the job is recorded as failed, not succeeded.
+    """
+    try:
+        stats = process_excel_file(filepath, db_path, progress=progress, clean=clean)
+    finally:
+        os.remove(filepath)
+    if stats['errors']:
+        raise RuntimeError('; '.join(stats['errors']))
+    return stats
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status, progress and result of a background job"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown job: {job_id}'
+        }), 404
+    return jsonify({
+        'success': True,
+        'data': job
+    })
+
 @app.route('/api/export', methods=['GET'])
 def export_json():
-    """Export database to JSON file"""
+    """
+    Stream the database export as a JSON download
+    
+    Query params:
+        compact: 1/true to omit indentation
+        format: json (default) or columnar (column arrays, dictionary-encoded)
+    The body is gzip-encoded when the client accepts gzip.
+    """
     try:
-        output_path = 'export.json'
-        export_database_to_json(DATABASE_PATH, output_path)
-        
-        return send_file(
-            output_path,
-            mimetype='application/json',
-            as_attachment=True,
-            download_name=f'ptsc_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-        )
+        compact = request.args.get('compact', '').lower() in ('1', 'true')
+        body = open_export_stream(DATABASE_PATH, compact=compact,
+                                  export_format=request.args.get('format', 'json'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
+    
+    headers = {
+        'Content-Disposition': f'attachment; filename=ptsc_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json',
+        'Vary': 'Accept-Encoding'
+    }
+    if request.accept_encodings['gzip']:
+        body = iter_gzip(body)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(body, mimetype='application/json', headers=headers)
 
 @app.route('/api/stats', methods=['GET'])
+@cached_by_data_version
 def get_stats():
     """Get database statistics"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        # Materialized counts (document_stats), kept in step by triggers
+        summary = read_stats_summary(get_connection(DATABASE_PATH))
         
         # Total documents
-        cursor.execute("SELECT COUNT(*) FROM documents")
-        total = cursor.fetchone()[0]
+        total = sum(summary['flags'].values())
         
-        # Overdue count
-        cursor.execute("SELECT COUNT(*) FROM documents WHERE is_overdue = 1")
-        overdue = cursor.fetchone()[0]
+        # Overdue count (only tracked when the schema has is_overdue)
+        overdue = summary['overdue'][1] if 'overdue' in summary else 0
         
         # By discipline
-        cursor.execute("""
-            SELECT discipline, COUNT(*) as count 
-            FROM documents 
-            GROUP BY discipline 
-            ORDER BY count DESC 
-            LIMIT 5
-        """)
-        disciplines = [{'discipline': row[0], 'count': row[1]} for row in cursor.fetchall()]
+        disciplines = [{'discipline': key, 'count': count} for key, count in summary['discipline'].most_common(5)]
         
         # By status
-        cursor.execute("""
-            SELECT doc_status, COUNT(*) as count 
-            FROM documents 
-            GROUP BY doc_status 
-            ORDER BY count DESC 
-            LIMIT 5
-        """)
-        statuses = [{'status': row[0], 'count': row[1]} for row in cursor.fetchall()]
-        
-        conn.close()
+        status_counts = Counter()
+        for (_, status), count in summary['table_status'].items():
+            status_counts[status] += count
+        statuses = [{'status': key, 'count': count} for key, count in status_counts.most_common(5)]
         
         return jsonify({
             'success': True,
@@ -0,0 +1,91 @@
+"""
+Date Cleaning Benchmark
+Times format_date_columns against the per-cell convert_excel_date path on a
+synthetic MDI sheet and checks both give the same values
+
+Usage: python benchmark_date_cleaning.py [rows]   (default 50000)
+"""
+
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from clean_excel_for_import_v2 import format_date_columns
+from mdi_schema import convert_excel_date
+
+DATE_COLUMNS = [f'{stage}_{kind}_date' for kind in ('plan', 'actual') for stage in ('ifi', 'ifr', 'ifa', 'ifc', 'iff')]
+TEXT_VALUES = ['', 'N/A', 'TBA', '-', 'Hold', '2024-03-15', '15/03/2024', 'Mar 15, 2024']
+
+def create_synthetic_sheet(rows, seed=42):
+    """
+    What read_excel gives for an MDI sheet: date columns holding real dates
+    (datetime64), serial numbers (float64) or a mix of datetimes, serials,
+    out-of-range numbers, text and blanks (object)
+    """
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    some_date = lambda: start + timedelta(days=rng.randint(0, 900))
+    some_serial = lambda: float(44927 + rng.randint(0, 900))
+
+    def mixed_cell():
+        kind = rng.random()
+        if kind < 0.3:
+            return some_date()
+        if kind < 0.5:
+            return some_serial()
+        if kind < 0.55:
+            return rng.choice([0, -5, 75000, 45000.75, True])
+        if kind < 0.7:
+            return rng.choice(TEXT_VALUES)
+        return None
+
+    data = {'companyDocNo': [f'LSPET-TCPT-PI-{i:06d}' for i in range(rows)]}
+    for position, col in enumerate(DATE_COLUMNS):
+        if position % 3 == 0:
+            data[col] = pd.Series([rng.choice([some_date(), pd.NaT]) for _ in range(rows)], dtype='datetime64[ns]')
+        elif position % 3 == 1:
+            data[col] = pd.Series([rng.choice([some_serial(), np.nan]) for _ in range(rows)], dtype='float64')
+        else:
+            data[col] = pd.Series([mixed_cell() for _ in range(rows)], dtype=object)
+    data['target_mitigation_date'] = pd.Series([mixed_cell() for _ in range(rows)], dtype=object)
+    return pd.DataFrame(data)
+
+def format_per_cell(df):
+    """format_date_columns as it was: convert_excel_date applied cell by cell"""
+    for col in df.columns:
+        if col != 'companyDocNo':
+            df[col] = df[col].apply(convert_excel_date)
+    return df
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"Creating synthetic sheet with {rows} rows...", file=sys.stderr)
+    df = create_synthetic_sheet(rows)
+
+    start = time.perf_counter()
+    expected = format_per_cell(df.copy())
+    per_cell_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        actual = format_date_columns(df.copy())
+    vectorized_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "rows": rows,
+        "date_columns": len(df.columns) - 1,
+        "per_cell_s": round(per_cell_seconds, 3),
+        "vectorized_s": round(vectorized_seconds, 3),
+        "speedup": round(per_cell_seconds / vectorized_seconds, 1),
+        "identical": actual.equals(expected)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Export Format Benchmark
+Compares size and encode/decode time of the JSON export formats on a
+synthetic documents table
+
+Usage: python benchmark_export.py [rows]   (default 100000)
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from export_db_to_json_v2 import export_database_to_json, decode_columnar
+
+DISCIPLINES = ['PIPING', 'PROCESS', 'STRUCTURE', 'ELECTRICAL', 'INSTRUMENT', 'MECHANICAL',
+               'HVAC', 'TELECOM', 'SAFETY', 'ARCHITECTURE', 'CIVIL', 'GENERAL']
+STATUSES = ['Approved', 'Waiting Cmt', 'OVERDUE CMT', 'Input Plan', 'Ongoing Resubmit',
+            'Overdue Re-submit', 'Waiting Issue Final', 'overdue 1st Issue', 'ongoing 1st issue - x']
+PICS = [f'Engineer {i:02d}' for i in range(30)]
+DATE_COLUMNS = [f'{stage}_{kind}_date' for kind in ('plan', 'actual') for stage in ('ifi', 'ifr', 'ifa', 'ifc', 'iff')]
+
+def create_synthetic_db(db_path, rows, seed=42):
+    """Documents table with realistic cardinalities: few disciplines/statuses/PICs, unique numbers and titles"""
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    some_date = lambda: rng.choice([None, (start + timedelta(days=rng.randint(0, 900))).isoformat()])
+    conn = sqlite3.connect(db_path)
+    conn.execute(f'''
+    CREATE TABLE documents (
+        localPath TEXT PRIMARY KEY, stt INTEGER, name TEXT, "table" TEXT, discipline TEXT,
+        scope TEXT, item TEXT, companyDocNo TEXT, contractorDocNo TEXT, doc_class TEXT, revision TEXT,
+        ipi_status TEXT, review_code TEXT, doc_status TEXT, transNo TEXT, dateReceived TEXT,
+        trn_out_date TEXT, trn_out_no TEXT, trn_in_date TEXT, trn_in_no TEXT,
+        {', '.join(f'{col} TEXT' for col in DATE_COLUMNS)}, target_mitigation_date TEXT,
+        pic_ptsc TEXT, pic_lsp TEXT, sharepointPath TEXT, is_overdue INTEGER, is_critical INTEGER
+    )''')
+    records = []
+    for i in range(rows):
+        discipline = rng.choice(DISCIPLINES)
+        doc_no = f'LSPET-TCPT-{discipline[:2]}-{i:06d}'
+        records.append((
+            f'D:/MDI/{discipline}/{doc_no}.pdf', i + 1, f'{discipline.title()} deliverable {i} - {rng.randint(0, 10**6)}',
+            rng.choice(['T1', 'T2', 'T3']), discipline, rng.choice(['Topside', 'Jacket', 'Subsea']),
+            f'{rng.randint(1, 400):03d}', doc_no, f'CTR-{i:06d}', rng.choice(['1', '2', '3']), rng.choice(['A', 'B', 'C', '0', '1']),
+            rng.choice(['IFR', 'IFA', 'IFC', 'AFC']), rng.choice([None, '1', '2', '3', '4']), rng.choice(STATUSES),
+            f'LSPET-TCPT-T-ZZ-{rng.randint(1, 3000):04d}', some_date(),
+            some_date(), f'TRN-OUT-{rng.randint(1, 5000):05d}', some_date(), f'TRN-IN-{rng.randint(1, 5000):05d}',
+            *(some_date() for _ in DATE_COLUMNS), some_date(),
+            rng.choice(PICS), rng.choice(PICS), None, rng.random() < 0.2, rng.random() < 0.05
+        ))
+    conn.executemany(f'INSERT INTO documents VALUES ({", ".join("?" * len(records[0]))})', records)
+    conn.commit()
+    conn.close()
+
+def run_case(db_path, output_path, export_format, compact):
+    """Export once and read the result back into a list of document dicts"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = export_database_to_json(db_path, output_path, compact=compact, export_format=export_format)
+    encode_seconds = time.perf_counter() - start
+    if not result:
+        raise RuntimeError(f"Export failed for format {export_format}")
+
+    start = time.perf_counter()
+    opener = gzip.open if output_path.endswith('.gz') else open
+    with opener(output_path, 'rt', encoding='utf-8') as f:
+        data = json.load(f)
+    documents = decode_columnar(data) if export_format == 'columnar' else data['documents']
+    decode_seconds = time.perf_counter() - start
+
+    return {
+        "format": export_format + (' compact' if compact and export_format == 'json' else '')
+                  + (' gzip' if output_path.endswith('.gz') else ''),
+        "size_mb": round(os.path.getsize(output_path) / (1024 * 1024), 2),
+        "encode_s": round(encode_seconds, 2),
+        "decode_s": round(decode_seconds, 2),
+        "documents": len(documents)
+    }, documents
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        print(f"Creating synthetic database with {rows} rows...", file=sys.stderr)
+        create_synthetic_db(db_path, rows)
+
+        results = []
+        baseline = None
+        for export_format, compact, suffix in [
+            ('json', False, '.json'), ('json', True, '.json'), ('columnar', True, '.json'),
+            ('json', False, '.json.gz'), ('json', True, '.json.gz'), ('columnar', True, '.json.gz'),
+        ]:
+            output_path = os.path.join(tmp, f'{export_format}-{compact}{suffix}')
+            print(f"Running {export_format} compact={compact} {suffix}...", file=sys.stderr)
+            result, documents = run_case(db_path, output_path, export_format, compact)
+            # Every format must round-trip to the same documents
+            if baseline is None:
+                baseline = documents
+            result["round_trip_ok"] = documents == baseline
+            results.append(result)
+
+    print(json.dumps({"rows": rows, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
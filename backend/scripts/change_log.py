@@ -0,0 +1,149 @@
+"""
+Import Change Log
+Field-level record of what each MDI import changed, computed in bulk from
+the values before and after the upsert
+"""
+
+import sqlite3
+
+import pandas as pd
+
+from db_connection import get_connection
+
+# Field value of the single change row recorded for a newly created document
+CREATED_FIELD = '*'
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+
+def ensure_change_log(cursor):
+    """Create the document_changes table if missing"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS document_changes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        import_id INTEGER NOT NULL,
+        companyDocNo TEXT NOT NULL,
+        field TEXT NOT NULL,
+        old_value TEXT,
+        new_value TEXT
+    )''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_document_changes_import ON document_changes(import_id)")
+
+def fetch_current_values(cursor, keys, columns):
+    """
+    Current values of columns for each companyDocNo in keys, in one query
+
+    When several documents rows share a key, the oldest row (lowest rowid)
+    stands for the key.
+
+    Returns:
+        DataFrame indexed by companyDocNo with the requested columns
+    """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS change_log_keys (companyDocNo TEXT PRIMARY KEY)")
+    cursor.execute("DELETE FROM change_log_keys")
+    cursor.executemany("INSERT OR IGNORE INTO change_log_keys (companyDocNo) VALUES (?)", ((key,) for key in keys))
+    # Bare columns next to MIN(rowid) come from that row
+    cursor.execute(f'''
+        SELECT d.companyDocNo, MIN(d.rowid), {', '.join('d.' + col for col in columns)}
+        FROM documents d JOIN change_log_keys k ON k.companyDocNo = d.companyDocNo
+        GROUP BY d.companyDocNo
+    ''')
+    rows = cursor.fetchall()
+    cursor.execute("DELETE FROM change_log_keys")
+    frame = pd.DataFrame.from_records(rows, columns=['companyDocNo', '_rowid'] + columns)
+    return frame.drop(columns='_rowid').set_index('companyDocNo').astype(object)
+
+def diff_values(old, new):
+    """
+    Field-level differences between two frames indexed by companyDocNo
+
+    Args:
+        old: Values before the import (keys missing here are not compared)
+        new: Values the import writes, same columns as old
+
+    Returns:
+        List of (companyDocNo, field, old_value, new_value) tuples
+    """
+    new = new[new.index.isin(old.index)]
+    old = old.reindex(new.index)
+    changes = []
+    for field in new.columns:
+        before = old[field].astype(object)
+        after = new[field].astype(object)
+        unchanged = (before == after) | (before.isna() & after.isna())
+        changed = ~unchanged
+        changes.extend(zip(
+            new.index[changed],
+            [field] * int(changed.sum()),
+            before[changed].where(before[changed].notna(), None),
+            after[changed].where(after[changed].notna(), None)
+        ))
+    return changes
+
+def record_changes(cursor, import_id, changes, created_keys=()):
+    """
+    Append one import's changes to document_changes
+
+    Returns:
+        Number of change rows written
+    """
+    ensure_change_log(cursor)
+    rows = [(import_id, key, CREATED_FIELD, None, None) for key in created_keys]
+    rows.extend((import_id, key, field, old, new) for key, field, old, new in changes)
+    cursor.executemany('''
+        INSERT INTO document_changes (import_id, companyDocNo, field, old_value, new_value)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+    return len(rows)
+
+def query_changes(db_path, since=0, limit=DEFAULT_LIMIT, cursor=None):
+    """
+    Changes recorded by imports after a given import id
+
+    Args:
+        db_path: Path to SQLite database file
+        since: Import id already seen by the client (0 for everything)
+        limit: Page size (capped at MAX_LIMIT)
+        cursor: nextCursor from the previous page, or None for the first page
+
+    Returns:
+        Dict with changes, latestImportId and pagination info
+    """
+    since = int(since)
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    after_id = int(cursor) if cursor else 0
+
+    db_cursor = get_connection(db_path).cursor()
+    try:
+        db_cursor.execute('''
+            SELECT id, import_id, companyDocNo, field, old_value, new_value
+            FROM document_changes
+            WHERE import_id > ? AND id > ?
+            ORDER BY id
+            LIMIT ?
+        ''', (since, after_id, limit + 1))
+        rows = db_cursor.fetchall()
+        db_cursor.execute('SELECT MAX(import_id) FROM document_changes')
+        latest = db_cursor.fetchone()[0] or since
+    except sqlite3.OperationalError:
+        # No import has run against this database yet
+        rows, latest = [], since
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "changes": [{
+            "id": row[0],
+            "importId": row[1],
+            "companyDocNo": row[2],
+            "field": row[3],
+            "oldValue": row[4],
+            "newValue": row[5]
+        } for row in rows],
+        "latestImportId": latest,
+        "pagination": {
+            "limit": limit,
+            "nextCursor": str(rows[-1][0]) if has_more else None,
+            "hasMore": has_more
+        }
+    }
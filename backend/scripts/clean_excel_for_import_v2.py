@@ -5,62 +5,16 @@ Script để clean Excel file MDI - Version 2
 - Output đến cùng thư mục với file gốc
 """
 
-import pandas as pd
 import sys
-import io
 import os
 from pathlib import Path
-from datetime import datetime
-import numpy as np
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+from mdi_schema import (
+    convert_date_column, find_date_columns, read_mdi_sheet,
+    to_clean_layout, write_clean_workbook
+)
 
-def convert_excel_date(value):
-    """
-    Convert Excel serial date to string format YYYY-MM-DD
-    
-    Excel lưu dates dưới dạng số (serial date):
-    - 1 = 1900-01-01
-    - 45835 = 2025-06-15
-    
-    Args:
-        value: Excel cell value (có thể là số, string, hoặc datetime)
-    
-    Returns:
-        String YYYY-MM-DD hoặc None nếu không phải date
-    """
-    # Handle NaN, None, empty
-    if pd.isna(value) or value == '' or value == 'N/A':
-        return None
-    
-    # Nếu đã là datetime object
-    if isinstance(value, (pd.Timestamp, datetime)):
-        return value.strftime('%Y-%m-%d')
-    
-    # Nếu là string, kiểm tra có phải date format không
-    if isinstance(value, str):
-        try:
-            # Thử parse string date
-            dt = pd.to_datetime(value, errors='coerce')
-            if pd.notna(dt):
-                return dt.strftime('%Y-%m-%d')
-            return None
-        except:
-            return None
-    
-    # Nếu là số (Excel serial date)
-    if isinstance(value, (int, float)):
-        # Excel serial dates thường từ 1 đến ~50000 (years 1900-2136)
-        if 1 <= value <= 60000:
-            try:
-                # Convert Excel serial date to datetime
-                # Excel epoch là 1899-12-30 (không phải 1900-01-01 do Excel bug)
-                dt = pd.to_datetime(value, origin='1899-12-30', unit='D')
-                return dt.strftime('%Y-%m-%d')
-            except:
-                return None
-    
-    return None
+sys.stdout.reconfigure(encoding='utf-8')
 
 def format_date_columns(df):
     """
@@ -72,18 +26,8 @@ def format_date_columns(df):
     Returns:
         DataFrame với dates đã được format
     """
-    # Danh sách các date columns cần check
-    date_column_keywords = [
-        'date', 'plan', 'actual', 'ifi', 'ifr', 'ifa', 'ifc', 'iff',
-        'trn', 'received', 'mitigation'
-    ]
-    
-    # Tìm các columns có tên chứa keywords
-    date_columns = []
-    for col in df.columns:
-        col_lower = str(col).lower()
-        if any(keyword in col_lower for keyword in date_column_keywords):
-            date_columns.append(col)
+    # Cột trong schema theo kind; cột khác theo tên chứa keywords
+    date_columns = find_date_columns(df.columns)
     
     print(f"\n📅 FORMATTING DATE COLUMNS ({len(date_columns)} columns):")
     
@@ -93,18 +37,11 @@ def format_date_columns(df):
         if col not in df.columns:
             continue
         
-        # Đếm số cells là Excel serial dates (numbers)
-        numeric_dates = df[col].apply(lambda x: isinstance(x, (int, float)) and 1 <= x <= 60000).sum()
+        df[col], numeric_dates = convert_date_column(df[col])
         
         if numeric_dates > 0:
-            print(f"   ⚙️  {col}: Converting {numeric_dates} serial dates...")
-            
-            # Apply conversion
-            df[col] = df[col].apply(convert_excel_date)
+            print(f"   ⚙️  {col}: Converted {numeric_dates} serial dates")
             converted_count += numeric_dates
-        else:
-            # Vẫn cố gắng format nếu là datetime objects
-            df[col] = df[col].apply(convert_excel_date)
     
     if converted_count > 0:
         print(f"\n✅ Đã convert {converted_count} Excel serial dates sang YYYY-MM-DD format")
@@ -136,81 +73,27 @@ def clean_excel_file(input_file, output_file=None):
         input_path = Path(input_file)
         output_file = input_path.parent / f"{input_path.stem}_CLEAN{input_path.suffix}"
     
-    # Đọc file Excel, bỏ qua 3 dòng header phức tạp
-    df = pd.read_excel(input_file, sheet_name='MDI_DetailStatus', skiprows=3)
+    # Đọc sheet theo schema: header dòng 4, tên cột đã normalize (\n, khoảng trắng)
+    df = read_mdi_sheet(input_file, all_columns=True)
     
     print(f"✅ Đã đọc {len(df)} dòng dữ liệu")
     print(f"📊 Số cột: {len(df.columns)}")
     
-    # Normalize column names - loại bỏ \n và khoảng trắng thừa
-    new_columns = []
-    for col in df.columns:
-        # Replace \n với space, strip whitespace
-        clean_col = str(col).replace('\n', ' ').strip()
-        # Remove multiple spaces
-        clean_col = ' '.join(clean_col.split())
-        new_columns.append(clean_col)
+    # ===== FORMAT DATE COLUMNS =====
+    df = format_date_columns(df)
     
-    df.columns = new_columns
+    # Đổi tên cột schema sang tên frontend dễ parse, thêm cột STT nếu chưa có
+    df = to_clean_layout(df)
     
     print("\n📋 CÁC CỘT SAU KHI CLEAN (20 cột đầu):")
     for i, col in enumerate(df.columns[:20], 1):
         print(f"   {i}. {col}")
     
-    # Mapping tên cột để frontend dễ parse
-    column_mapping = {
-        'Org.': 'discipline',
-        'CompanyDoc.No.': 'companyDocNo',
-        'DocumentName': 'name',
-        'Class': 'doc_class',
-        'Rev': 'revision',
-        'Status': 'doc_status',
-        'Scope': 'scope',
-        'Table': 'table',
-        'Item': 'item',
-        'IPI': 'ipi_status',
-        'Code': 'review_code',
-        'DateTRNOut': 'trn_out_date',
-        'TRNOutNo.': 'trn_out_no',
-        'DateTRNIn': 'trn_in_date',
-        'TRNInNo.': 'trn_in_no',
-        'DateReciveTRNOut': 'dateReceived',
-        'IFI Plan Date': 'ifi_plan_date',
-        'IFR Plan Date': 'ifr_plan_date',
-        'IFA Plan Date': 'ifa_plan_date',
-        'IFC Plan Date': 'ifc_plan_date',
-        'IFF/ASB Plan Date': 'iff_plan_date',
-        'IFI Actual Date': 'ifi_actual_date',
-        'IFR Actual Date': 'ifr_actual_date',
-        'IFA Actual Date': 'ifa_actual_date',
-        'IFC Actual Date': 'ifc_actual_date',
-        'IFF/ASB Actual Date': 'iff_actual_date',
-        'Target Mitigation Date': 'target_mitigation_date',
-        'PIC PTSC': 'pic_ptsc',
-        'PIC LSP': 'pic_lsp',
-    }
-    
-    # Rename columns nếu tồn tại
-    rename_dict = {}
-    for old_name, new_name in column_mapping.items():
-        if old_name in df.columns:
-            rename_dict[old_name] = new_name
-    
-    df.rename(columns=rename_dict, inplace=True)
-    
-    # ===== FORMAT DATE COLUMNS =====
-    df = format_date_columns(df)
-    
-    # Thêm cột STT nếu chưa có
-    if 'stt' not in df.columns:
-        df.insert(0, 'stt', range(1, len(df) + 1))
-    
     print(f"\n💾 ĐANG LƯU FILE...")
     print(f"   Output: {output_file}")
     
     # Tạo sheet mới tên "MDI_DetailStatus" 
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='MDI_DetailStatus', index=False)
+    write_clean_workbook(df, output_file)
     
     print(f"\n✅ ĐÃ LƯU FILE THÀNH CÔNG!")
     print(f"   📁 File: {output_file}")
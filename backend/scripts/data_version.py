@@ -0,0 +1,50 @@
+"""
+Data Version Counter
+Single-row counter bumped by every write path (import, scan, feedback, upload)
+so read endpoints can answer conditional requests without recomputing
+"""
+
+import os
+import sqlite3
+import time
+
+from db_connection import get_connection
+
+def ensure_data_version(cursor):
+    """Create the data_version table with its single row if missing"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS data_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    )''')
+    cursor.execute('INSERT OR IGNORE INTO data_version (id, version, updated_at) VALUES (1, 0, ?)', (time.time(),))
+
+def bump_data_version(cursor):
+    """
+    Increment the data version; runs in the caller's transaction, so the
+    bump is committed (or rolled back) together with the data it describes
+
+    Returns:
+        The new version number
+    """
+    ensure_data_version(cursor)
+    cursor.execute('UPDATE data_version SET version = version + 1, updated_at = ? WHERE id = 1', (time.time(),))
+    cursor.execute('SELECT version FROM data_version WHERE id = 1')
+    return cursor.fetchone()[0]
+
+def get_data_version(db_path):
+    """
+    Read the current data version
+
+    Returns:
+        (version, updated_at unix timestamp); (0, 0.0) for databases that
+        have never been written by a versioned write path
+    """
+    if not os.path.exists(db_path):
+        return (0, 0.0)
+    try:
+        row = get_connection(db_path).execute('SELECT version, updated_at FROM data_version WHERE id = 1').fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    return (row[0], row[1]) if row else (0, 0.0)
@@ -9,6 +9,10 @@ import json
 import io
 from datetime import datetime
 
+from stats_summary import ensure_stats_summary
+from row_version import ensure_row_versions
+from document_numbers import ensure_document_numbers
+
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
@@ -103,6 +107,9 @@ def migrate_database(db_path):
             ('idx_company_doc', 'companyDocNo'),
             ('idx_contractor_doc', 'contractorDocNo'),
             ('idx_review_code', 'review_code'),
+            ('idx_discipline', 'discipline'),
+            ('idx_table', '"table"'),
+            ('idx_stt', 'stt'),
         ]
         
         for idx_name, col_name in indexes:
@@ -114,6 +121,11 @@ def migrate_database(db_path):
         
         conn.commit()
         
+        # Statistics summary over the new columns (rebuilt if they changed its dimensions)
+        ensure_stats_summary(conn)
+        ensure_row_versions(conn)
+        ensure_document_numbers(conn)
+        
         # Verify migration
         new_cols = get_column_names(cursor, 'documents')
         print(f"Total columns after migration: {len(new_cols)}")
@@ -4,10 +4,23 @@ import os
 import sys
 import json
 import re
+import math
 from datetime import datetime
 import shutil
 import pandas as pd
 import sqlite3
+import xlsxwriter
+from concurrent.futures import ThreadPoolExecutor
+from mdi_classifier import MDIClassifier
+from feedback_matcher import FeedbackMatcher
+from sharepoint_sync import load_sync_manifest, sync_files
+from data_version import ensure_data_version, bump_data_version
+from stats_summary import ensure_stats_summary, stats_source
+from row_version import ensure_row_versions
+from document_numbers import ensure_document_numbers
+from document_search import ensure_search_index
+from document_query import ensure_indexes
+from db_connection import connect
 
 # --- CONFIGURATION AND DATABASE SETUP ---
 
@@ -34,11 +47,16 @@ def load_config():
 
 CONFIG = load_config()
 DISCIPLINE_MAP = CONFIG.get("discipline_map", {})
+SCAN_WORKERS = CONFIG.get("scan_workers", 8)
+SHAREPOINT_WORKERS = CONFIG.get("sharepoint_workers", 4)
+SHAREPOINT_VERIFY = CONFIG.get("sharepoint_verify", "stat")
+ALLOWED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.xls', '.xlsx')
+TRANS_NO_PATTERN = re.compile(r'(LSPET-TCPT-T- ?\w{2}-\d{4})')
 
 def init_db():
     """Initializes the database and creates tables if they don't exist."""
     try:
-        conn = sqlite3.connect(DB_NAME)
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -87,15 +105,23 @@ def init_db():
             localPath TEXT PRIMARY KEY, stt INTEGER, name TEXT, format TEXT,
             dateReceived TEXT, revision TEXT
         )''')
+
+        init_file_state(cursor)
+        ensure_data_version(cursor)
         
         conn.commit()
+        ensure_stats_summary(conn)
+        ensure_row_versions(conn)
+        ensure_document_numbers(conn)
+        ensure_indexes(conn)
+        ensure_search_index(conn)
         conn.close()
         print(json.dumps({"success": True, "message": "Database initialized successfully."}))
     except Exception as e:
         print(json.dumps({"success": False, "error": str(e)}), file=sys.stderr)
 
 def db_connect():
-    return sqlite3.connect(DB_NAME)
+    return connect(DB_NAME)
 
 def load_mdi_mapping():
     try:
@@ -107,7 +133,7 @@ def load_mdi_mapping():
         return {}
 
 MDI_MAPPING = load_mdi_mapping()
-SORTED_MDI_KEYS = sorted(list(MDI_MAPPING.keys()), key=len, reverse=True) if MDI_MAPPING else []
+MDI_CLASSIFIER = MDIClassifier(MDI_MAPPING)
 
 
 # --- CORE LOGIC (No changes needed here) ---
@@ -143,51 +169,135 @@ def parse_filename(base_name):
     doc_revision = parse_revision_from_name(base_name)
     return doc_table_name, doc_description, doc_discipline, doc_revision
 
-def scan_documents(root_folder):
+def _with_filename(error, path):
+    if error.filename is None:
+        error.filename = path
+    return error
+
+def _list_directory(dirpath, extensions):
+    """
+    Lists one directory, stat'ing only the files that match extensions.
+
+    Returns (dirpath, subdirs, files, errors); errors holds the OSErrors hit,
+    and subdirs/files are None when the directory itself could not be listed.
+    """
+    subdirs, files, errors = [], [], []
+    try:
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Same as os.walk(followlinks=False): symlinked dirs are not entered
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.lower().endswith(extensions):
+                    try:
+                        files.append((entry.name, entry.stat()))
+                    except OSError as e:
+                        errors.append(_with_filename(e, entry.path))
+    except OSError as e:
+        return dirpath, None, None, [_with_filename(e, dirpath)]
+    return dirpath, subdirs, files, errors
+
+def walk_files(root_folder, extensions=ALLOWED_EXTENSIONS, workers=None, onerror=None):
+    """
+    Parallel replacement for os.walk that yields (dirpath, [(filename, stat_result), ...]).
+
+    Directory listings and file stats run on a thread pool of `workers` threads so
+    slow network shares are not walked one round-trip at a time. Directories are
+    yielded in the same top-down order as os.walk.
+
+    As with os.walk, a directory that cannot be listed is skipped and onerror,
+    if given, is called with the OSError; its filename is the directory (or the
+    file whose stat failed), so callers can tell unread paths from deleted ones.
+    """
+    with ThreadPoolExecutor(max_workers=workers or SCAN_WORKERS) as pool:
+        pending = [pool.submit(_list_directory, root_folder, extensions)]
+        while pending:
+            dirpath, subdirs, files, errors = pending.pop().result()
+            if onerror is not None:
+                for error in errors:
+                    onerror(error)
+            if subdirs is None:
+                continue
+            yield dirpath, files
+            pending.extend(reversed([pool.submit(_list_directory, subdir, extensions) for subdir in subdirs]))
+
+def resolve_trans_no(dirpath, normalized_root_folder):
+    """Finds the transmittal number of the nearest ancestor folder (up to the scan root)."""
+    current_search_path = os.path.abspath(dirpath)
+    while True:
+        folder_name = os.path.basename(current_search_path)
+        trans_match = TRANS_NO_PATTERN.search(folder_name)
+        if trans_match:
+            return trans_match.group(1).replace(' ', '')
+        try:
+            if os.path.samefile(current_search_path, normalized_root_folder):
+                break
+        except FileNotFoundError:
+            break
+        parent_path = os.path.dirname(current_search_path)
+        if parent_path == current_search_path:
+            break
+        current_search_path = parent_path
+    return "N/A"
+
+def init_file_state(cursor):
+    """Creates the file-state index used by incremental scans."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS file_state (
+        localPath TEXT PRIMARY KEY, scanRoot TEXT, size INTEGER, mtime REAL, inode INTEGER
+    )''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_file_state_root ON file_state(scanRoot)')
+
+def scan_documents(root_folder, incremental=False, workers=None):
+    """
+    Scans root_folder for documents and upserts them into the documents table.
+
+    With incremental=True, files whose (size, mtime, inode) match the file_state
+    index are skipped and rows for files that disappeared under root_folder are
+    deleted. A directory or file that cannot be read (share offline, permission
+    error) is not a deletion: known paths under it are kept. Returns the delta
+    counts (added, changed, removed, unchanged) and the number of unreadable paths.
+    """
     conn = db_connect()
     cursor = conn.cursor()
-    cursor.execute('SELECT localPath, sharepointPath, feedbackStatus, scope, companyDocNo, contractorDocNo, ipi_status, review_code, trn_out_date, trn_out_no, date_receive_trn_out, trn_in_date, trn_in_no, ifi_plan_date, ifr_plan_date, ifa_plan_date, ifc_plan_date, iff_plan_date, ifi_actual_date, ifr_actual_date, ifa_actual_date, ifc_actual_date, iff_actual_date, target_mitigation_date, pic_ptsc, pic_lsp, doc_status FROM documents')
-    existing_data = {}
-    for row in cursor.fetchall():
-        existing_data[row[0]] = {
-            'sp': row[1], 'fb': row[2], 'scope': row[3], 'companyDocNo': row[4], 'contractorDocNo': row[5],
-            'ipi_status': row[6], 'review_code': row[7], 'trn_out_date': row[8], 'trn_out_no': row[9],
-            'date_receive_trn_out': row[10], 'trn_in_date': row[11], 'trn_in_no': row[12],
-            'ifi_plan_date': row[13], 'ifr_plan_date': row[14], 'ifa_plan_date': row[15],
-            'ifc_plan_date': row[16], 'iff_plan_date': row[17], 'ifi_actual_date': row[18],
-            'ifr_actual_date': row[19], 'ifa_actual_date': row[20], 'ifc_actual_date': row[21],
-            'iff_actual_date': row[22], 'target_mitigation_date': row[23], 'pic_ptsc': row[24],
-            'pic_lsp': row[25], 'doc_status': row[26]
-        }
-    documents_to_upsert = []
-    allowed_extensions = ('.pdf', '.doc', '.docx', '.xls', '.xlsx')
+    init_file_state(cursor)
+    ensure_row_versions(conn)
+    ensure_document_numbers(conn)
+    # 'docs/', './docs' and 'docs' give the same localPaths; file_state is
+    # keyed by the absolute root so they also share one index
+    root_folder = os.path.normpath(root_folder)
     normalized_root_folder = os.path.abspath(root_folder)
+    cursor.execute('SELECT localPath, size, mtime, inode FROM file_state WHERE scanRoot = ?', (normalized_root_folder,))
+    known_state = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+    cursor.execute('SELECT localPath FROM documents')
+    known_docs = {row[0] for row in cursor.fetchall()}
+    delta = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0, 'unreadable': 0}
+    seen_paths = set()
+    unreadable = []
+    scanned_files = []
     class_cache = {}
-    for dirpath, _, filenames in os.walk(root_folder):
-        project_trans_no = "N/A"
-        current_search_path = os.path.abspath(dirpath)
-        while True:
-            folder_name = os.path.basename(current_search_path)
-            trans_match = re.search(r'(LSPET-TCPT-T- ?\w{2}-\d{4})', folder_name)
-            if trans_match:
-                project_trans_no = trans_match.group(1).replace(' ', '')
-                break
-            try:
-                if os.path.samefile(current_search_path, normalized_root_folder):
-                    break
-            except FileNotFoundError:
-                break
-            parent_path = os.path.dirname(current_search_path)
-            if parent_path == current_search_path:
-                break
-            current_search_path = parent_path
+    trans_no_cache = {}
+    for dirpath, files in walk_files(root_folder, workers=workers,
+                                     onerror=lambda error: unreadable.append(error.filename)):
+        # Directories arrive top-down, so the parent's transmittal number is
+        # normally cached already; only the root needs the climbing lookup
+        parent_trans_no = trans_no_cache.get(os.path.dirname(dirpath))
+        if parent_trans_no is None:
+            project_trans_no = resolve_trans_no(dirpath, normalized_root_folder)
+        else:
+            trans_match = TRANS_NO_PATTERN.search(os.path.basename(dirpath))
+            project_trans_no = trans_match.group(1).replace(' ', '') if trans_match else parent_trans_no
+        trans_no_cache[dirpath] = project_trans_no
         level_1_folder = "N/A"
         relative_path = os.path.relpath(dirpath, normalized_root_folder)
         if relative_path != '.':
             level_1_folder = relative_path.split(os.sep)[0]
-        for filename in filenames:
-            if not filename.lower().endswith(allowed_extensions):
-                continue
+        for filename, file_stat in files:
             base_name, _ = os.path.splitext(filename)
             file_path = os.path.join(dirpath, filename)
             table, desc, disc, rev = "N/A", "N/A", "N/A", "N/A"
@@ -196,7 +306,7 @@ def scan_documents(root_folder):
                 rev = parse_revision_from_name(base_name)
             else:
                 table, desc, disc, rev = parse_filename(base_name)
-            found_key = next((key for key in SORTED_MDI_KEYS if base_name.startswith(key)), None)
+            found_key = MDI_CLASSIFIER.longest_prefix(base_name)
             if found_key:
                 class_value = MDI_MAPPING.get(found_key, "N/A")
                 if class_value and class_value != "N/A":
@@ -206,10 +316,17 @@ def scan_documents(root_folder):
             else:
                 if level_1_folder != "N/A":
                     doc_class = class_cache.get(level_1_folder, "N/A")
-            creation_date = datetime.fromtimestamp(os.path.getctime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
-            existing_info = existing_data.get(file_path, {})
-            sharepoint_path = existing_info.get('sp')
-            feedback_status = existing_info.get('fb')
+            fingerprint = (file_stat.st_size, file_stat.st_mtime, file_stat.st_ino)
+            seen_paths.add(file_path)
+            if file_path not in known_docs:
+                delta['added'] += 1
+            elif known_state.get(file_path) != fingerprint:
+                delta['changed'] += 1
+            else:
+                delta['unchanged'] += 1
+                if incremental:
+                    continue
+            creation_date = datetime.fromtimestamp(file_stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
             
             # Extract item code from base_name (e.g., A19, B01, M90)
             item_code = "N/A"
@@ -221,24 +338,50 @@ def scan_documents(root_folder):
                     if len(potential_item) >= 2:
                         item_code = potential_item
             
-            # Try to extract company doc number (base_name might be the doc number)
-            company_doc_no = base_name if base_name.startswith("TF1-2") or base_name.startswith("TCPT-") or base_name.startswith("LSPET-") else existing_info.get('companyDocNo')
-            
-            # Preserve all existing tracked data
-            documents_to_upsert.append((
-                file_path, base_name, table, desc, disc, project_trans_no, 
-                creation_date, rev, doc_class, sharepoint_path, feedback_status,
-                existing_info.get('scope'), item_code, company_doc_no, existing_info.get('contractorDocNo'),
-                existing_info.get('ipi_status'), existing_info.get('review_code'),
-                existing_info.get('trn_out_date'), existing_info.get('trn_out_no'), existing_info.get('date_receive_trn_out'),
-                existing_info.get('trn_in_date'), existing_info.get('trn_in_no'),
-                existing_info.get('ifi_plan_date'), existing_info.get('ifr_plan_date'), existing_info.get('ifa_plan_date'),
-                existing_info.get('ifc_plan_date'), existing_info.get('iff_plan_date'),
-                existing_info.get('ifi_actual_date'), existing_info.get('ifr_actual_date'), existing_info.get('ifa_actual_date'),
-                existing_info.get('ifc_actual_date'), existing_info.get('iff_actual_date'),
-                existing_info.get('target_mitigation_date'), existing_info.get('pic_ptsc'), existing_info.get('pic_lsp'),
-                existing_info.get('doc_status')
+            scanned_files.append((
+                file_path, fingerprint, base_name, table, desc, disc, project_trans_no,
+                creation_date, rev, doc_class, item_code
             ))
+
+    existing_data = {}
+    if scanned_files:
+        cursor.execute('SELECT localPath, sharepointPath, feedbackStatus, scope, companyDocNo, contractorDocNo, ipi_status, review_code, trn_out_date, trn_out_no, date_receive_trn_out, trn_in_date, trn_in_no, ifi_plan_date, ifr_plan_date, ifa_plan_date, ifc_plan_date, iff_plan_date, ifi_actual_date, ifr_actual_date, ifa_actual_date, ifc_actual_date, iff_actual_date, target_mitigation_date, pic_ptsc, pic_lsp, doc_status, stt FROM documents')
+        for row in cursor.fetchall():
+            existing_data[row[0]] = {
+                'sp': row[1], 'fb': row[2], 'scope': row[3], 'companyDocNo': row[4], 'contractorDocNo': row[5],
+                'ipi_status': row[6], 'review_code': row[7], 'trn_out_date': row[8], 'trn_out_no': row[9],
+                'date_receive_trn_out': row[10], 'trn_in_date': row[11], 'trn_in_no': row[12],
+                'ifi_plan_date': row[13], 'ifr_plan_date': row[14], 'ifa_plan_date': row[15],
+                'ifc_plan_date': row[16], 'iff_plan_date': row[17], 'ifi_actual_date': row[18],
+                'ifr_actual_date': row[19], 'ifa_actual_date': row[20], 'ifc_actual_date': row[21],
+                'iff_actual_date': row[22], 'target_mitigation_date': row[23], 'pic_ptsc': row[24],
+                'pic_lsp': row[25], 'doc_status': row[26], 'stt': row[27]
+            }
+    documents_to_upsert = []
+    for (file_path, _, base_name, table, desc, disc, project_trans_no,
+         creation_date, rev, doc_class, item_code) in scanned_files:
+        existing_info = existing_data.get(file_path, {})
+        sharepoint_path = existing_info.get('sp')
+        feedback_status = existing_info.get('fb')
+        
+        # Try to extract company doc number (base_name might be the doc number)
+        company_doc_no = base_name if base_name.startswith("TF1-2") or base_name.startswith("TCPT-") or base_name.startswith("LSPET-") else existing_info.get('companyDocNo')
+        
+        # Preserve all existing tracked data
+        documents_to_upsert.append((
+            file_path, base_name, table, desc, disc, project_trans_no, 
+            creation_date, rev, doc_class, sharepoint_path, feedback_status,
+            existing_info.get('scope'), item_code, company_doc_no, existing_info.get('contractorDocNo'),
+            existing_info.get('ipi_status'), existing_info.get('review_code'),
+            existing_info.get('trn_out_date'), existing_info.get('trn_out_no'), existing_info.get('date_receive_trn_out'),
+            existing_info.get('trn_in_date'), existing_info.get('trn_in_no'),
+            existing_info.get('ifi_plan_date'), existing_info.get('ifr_plan_date'), existing_info.get('ifa_plan_date'),
+            existing_info.get('ifc_plan_date'), existing_info.get('iff_plan_date'),
+            existing_info.get('ifi_actual_date'), existing_info.get('ifr_actual_date'), existing_info.get('ifa_actual_date'),
+            existing_info.get('ifc_actual_date'), existing_info.get('iff_actual_date'),
+            existing_info.get('target_mitigation_date'), existing_info.get('pic_ptsc'), existing_info.get('pic_lsp'),
+            existing_info.get('doc_status'), existing_info.get('stt')
+        ))
     if documents_to_upsert:
         cursor.executemany('''
         REPLACE INTO documents (
@@ -247,27 +390,44 @@ def scan_documents(root_folder):
             ipi_status, review_code, trn_out_date, trn_out_no, date_receive_trn_out,
             trn_in_date, trn_in_no, ifi_plan_date, ifr_plan_date, ifa_plan_date, ifc_plan_date, iff_plan_date,
             ifi_actual_date, ifr_actual_date, ifa_actual_date, ifc_actual_date, iff_actual_date,
-            target_mitigation_date, pic_ptsc, pic_lsp, doc_status
+            target_mitigation_date, pic_ptsc, pic_lsp, doc_status, stt
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', documents_to_upsert)
+        cursor.executemany(
+            'REPLACE INTO file_state (localPath, scanRoot, size, mtime, inode) VALUES (?, ?, ?, ?, ?)',
+            [(item[0], normalized_root_folder) + item[1] for item in scanned_files]
+        )
+    delta['unreadable'] = len(unreadable)
+    if incremental:
+        # Only paths the walk could have seen count as removed
+        unread_paths = set(unreadable)
+        unread_prefixes = tuple(path + os.sep for path in unread_paths)
+        removed_paths = [
+            (path,) for path in known_state
+            if path not in seen_paths and path not in unread_paths and not path.startswith(unread_prefixes)
+        ]
+        if removed_paths:
+            cursor.executemany('DELETE FROM documents WHERE localPath = ?', removed_paths)
+            cursor.executemany('DELETE FROM file_state WHERE localPath = ?', removed_paths)
+        delta['removed'] = len(removed_paths)
+    if documents_to_upsert or delta['removed']:
+        bump_data_version(cursor)
     conn.commit()
     conn.close()
     load_all_docs()
+    return delta
 
-def scan_generic_files(root_folder):
+def scan_generic_files(root_folder, workers=None):
     conn = db_connect()
     cursor = conn.cursor()
-    allowed_extensions = ('.pdf', '.doc', '.docx', '.xls', '.xlsx')
     files_to_upsert = []
-    for dirpath, _, filenames in os.walk(root_folder):
-        for filename in filenames:
-            if not filename.lower().endswith(allowed_extensions):
-                continue
+    for dirpath, files in walk_files(root_folder, workers=workers):
+        for filename, file_stat in files:
             base_name, extension = os.path.splitext(filename)
             file_format = extension.replace('.', '').lower()
             file_path = os.path.join(dirpath, filename)
-            creation_date = datetime.fromtimestamp(os.path.getctime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
+            creation_date = datetime.fromtimestamp(file_stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
             revision = parse_revision_from_name(base_name)
             files_to_upsert.append((
                 file_path, base_name, file_format, creation_date, revision
@@ -277,6 +437,7 @@ def scan_generic_files(root_folder):
         REPLACE INTO generic_files (localPath, name, format, dateReceived, revision)
         VALUES (?, ?, ?, ?, ?)
         ''', files_to_upsert)
+        bump_data_version(cursor)
     conn.commit()
     conn.close()
     load_all_generic_files()
@@ -305,29 +466,62 @@ def load_all_generic_files():
     print(json.dumps(files))
     conn.close()
 
-def upload_to_sharepoint(documents_json, sp_root_path):
+def upload_to_sharepoint(documents_json, sp_root_path, workers=None, verify=None):
+    """
+    Copy documents into <sp_root_path>/<discipline>/ and record sharepointPath
+
+    Unchanged files are skipped and copies run concurrently (see
+    sharepoint_sync). The per-file results and throughput go to stderr as
+    {"sharepoint_sync": ...}; stdout keeps the reloaded document list.
+
+    Returns:
+        The sync report, or None if sp_root_path does not exist
+    """
     documents = json.loads(documents_json)
     if not os.path.isdir(sp_root_path):
         print(json.dumps({"status": "error", "message": "Đường dẫn SharePoint không tồn tại."}))
         return
-    conn = db_connect()
-    cursor = conn.cursor()
+    
+    # Destination -> documents copied there; when several share a file name
+    # the last one's file is copied, as with the old sequential copies
+    targets = {}
     for doc in documents:
         local_path = doc.get("localPath", "")
         discipline = doc.get("discipline", "N/A")
         if os.path.exists(local_path) and discipline != "N/A":
             dest_folder = os.path.join(sp_root_path, discipline)
-            os.makedirs(dest_folder, exist_ok=True)
-            file_name = os.path.basename(local_path)
-            dest_path = os.path.join(dest_folder, file_name)
-            try:
-                shutil.copy2(local_path, dest_path)
-                cursor.execute('UPDATE documents SET sharepointPath = ? WHERE localPath = ?', (dest_path, local_path))
-            except Exception:
-                cursor.execute('UPDATE documents SET sharepointPath = ? WHERE localPath = ?', ("Lỗi Upload", local_path))
+            dest_path = os.path.join(dest_folder, os.path.basename(local_path))
+            targets.setdefault(dest_path, []).append(local_path)
+    for dest_folder in {os.path.dirname(dest_path) for dest_path in targets}:
+        os.makedirs(dest_folder, exist_ok=True)
+    
+    conn = db_connect()
+    cursor = conn.cursor()
+    manifest = load_sync_manifest(cursor)
+    pairs = [(local_paths[-1], dest_path) for dest_path, local_paths in targets.items()]
+    results, summary = sync_files(pairs, manifest,
+                                  workers=workers or SHAREPOINT_WORKERS,
+                                  verify=verify or SHAREPOINT_VERIFY)
+    
+    updates = []
+    synced = []
+    now = datetime.now().timestamp()
+    for result in results:
+        ok = result["status"] != "failed"
+        sharepoint_path = result["destPath"] if ok else "Lỗi Upload"
+        updates.extend((sharepoint_path, local_path) for local_path in targets[result["destPath"]])
+        if ok:
+            synced.append((result["localPath"], result["destPath"], result["size"], result["mtime"], now))
+    cursor.executemany('UPDATE documents SET sharepointPath = ? WHERE localPath = ?', updates)
+    cursor.executemany('REPLACE INTO sync_manifest (localPath, destPath, size, mtime, synced_at) VALUES (?, ?, ?, ?, ?)', synced)
+    bump_data_version(cursor)
     conn.commit()
     conn.close()
+    
+    report = dict(summary, results=results)
+    print(json.dumps({"sharepoint_sync": report}, ensure_ascii=False), file=sys.stderr)
     load_all_docs()
+    return report
 
 def process_feedback(documents_json, feedback_folder, subcon_folder):
     documents = json.loads(documents_json)
@@ -336,10 +530,10 @@ def process_feedback(documents_json, feedback_folder, subcon_folder):
         return
     conn = db_connect()
     cursor = conn.cursor()
-    doc_map = {doc['name']: doc for doc in documents}
-    for filename in os.listdir(feedback_folder):
+    matcher = FeedbackMatcher(documents)
+    for filename in sorted(os.listdir(feedback_folder)):
         feedback_name, _ = os.path.splitext(filename)
-        found_doc = next((doc_data for doc_name, doc_data in doc_map.items() if feedback_name in doc_name or doc_name in feedback_name), None)
+        found_doc = matcher.match(feedback_name)
         if found_doc:
             discipline = found_doc.get("discipline", "N/A")
             local_path = found_doc.get("localPath")
@@ -353,106 +547,174 @@ def process_feedback(documents_json, feedback_folder, subcon_folder):
                     cursor.execute('UPDATE documents SET feedbackStatus = ? WHERE localPath = ?', ("Đã nhận phản hồi", local_path))
                 except Exception:
                     pass
+    bump_data_version(cursor)
     conn.commit()
     conn.close()
     load_all_docs()
     
+# Document column -> Excel header, in export order
+EXCEL_COLUMNS = {
+    "stt": "STT",
+    "scope": "Scope",
+    "table": "Table",
+    "item": "Item",
+    "discipline": "Bộ môn",
+    "companyDocNo": "Company Doc No",
+    "contractorDocNo": "Contractor Doc No",
+    "name": "Tên tài liệu",
+    "doc_class": "Class",
+    "revision": "Phiên bản",
+    "ipi_status": "IPI Status",
+    "transNo": "Trans No",
+    "dateReceived": "Ngày nhận",
+    "trn_out_date": "TRN Out Date",
+    "trn_out_no": "TRN Out No",
+    "date_receive_trn_out": "Date Receive TRN Out",
+    "trn_in_date": "TRN In Date",
+    "trn_in_no": "TRN In No",
+    "review_code": "Review Code",
+    "ifi_plan_date": "IFI Plan",
+    "ifr_plan_date": "IFR Plan",
+    "ifa_plan_date": "IFA Plan",
+    "ifc_plan_date": "IFC Plan",
+    "iff_plan_date": "IFF Plan",
+    "ifi_actual_date": "IFI Actual",
+    "ifr_actual_date": "IFR Actual",
+    "ifa_actual_date": "IFA Actual",
+    "ifc_actual_date": "IFC Actual",
+    "iff_actual_date": "IFF Actual",
+    "target_mitigation_date": "Target Date",
+    "pic_ptsc": "PIC PTSC",
+    "pic_lsp": "PIC LSP",
+    "doc_status": "Status",
+    "description": "Description",
+    "sharepointPath": "Đường dẫn (SharePoint)",
+    "feedbackStatus": "Trạng thái Phản hồi",
+    "localLink": "Đường dẫn Local"
+}
+
+# Hyperlinks Excel allows per worksheet
+MAX_EXCEL_LINKS = 65530
+
+def local_link(local_path, excel_dir):
+    """Path of local_path relative to the Excel file, with forward slashes"""
+    try:
+        return os.path.relpath(local_path, excel_dir).replace('\\', '/')
+    except ValueError:
+        # Fallback for different drives on Windows
+        return local_path.replace('\\', '/')
+
+def sanitize_text(value):
+    """Replace what cannot be written as UTF-8 (e.g. undecodable file names)"""
+    if value.isascii():
+        return value
+    return value.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+
+def write_documents_excel(documents, columns, output_path):
+    """
+    Stream documents into Sheet1 of an .xlsx in one pass, hyperlinks included
+
+    xlsxwriter's constant_memory mode flushes every row to disk once the next
+    one starts, so memory stays flat however many rows are exported.
+
+    Args:
+        documents: Iterable of document dicts, e.g. straight off a cursor
+        columns: EXCEL_COLUMNS keys to export, in order; 'localLink' is
+            derived from localPath as a link to the file
+        output_path: Path of the .xlsx to write
+
+    Returns:
+        Number of documents written
+    """
+    excel_dir = os.path.dirname(output_path)
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet('Sheet1')
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        url_format = workbook.add_format({'font_color': 'blue', 'underline': 1})
+        for col, key in enumerate(columns):
+            worksheet.write_string(0, col, EXCEL_COLUMNS[key], header_format)
+
+        row = links = 0
+        for row, doc in enumerate(documents, 1):
+            for col, key in enumerate(columns):
+                if key == 'localLink':
+                    local_path = doc.get('localPath')
+                    if local_path:
+                        link = local_link(sanitize_text(local_path), excel_dir)
+                        # Beyond Excel's links-per-sheet limit the path is kept as text
+                        if links < MAX_EXCEL_LINKS and worksheet.write_url(
+                                row, col, 'external:' + link.replace('#', '%23'), url_format, 'Mở File') == 0:
+                            links += 1
+                        else:
+                            worksheet.write_string(row, col, link)
+                    continue
+                value = doc.get(key)
+                if value is None or value == '':
+                    continue
+                if isinstance(value, str):
+                    worksheet.write_string(row, col, sanitize_text(value))
+                elif isinstance(value, bool):
+                    worksheet.write_boolean(row, col, value)
+                elif isinstance(value, (int, float)):
+                    # NaN stays blank and infinities are written as text, as pandas does
+                    if math.isfinite(value):
+                        worksheet.write_number(row, col, value)
+                    elif value == value:
+                        worksheet.write_string(row, col, str(value))
+                else:
+                    worksheet.write_string(row, col, str(value))
+    finally:
+        workbook.close()
+    return row
+
 def export_to_excel(documents_json, output_path):
+    """Export the documents given as JSON (e.g. a filtered list) to Excel"""
     try:
         documents = json.loads(documents_json)
         if not documents:
             print(json.dumps({"success": False, "error": "Không có dữ liệu để xuất."}), flush=True)
             return
 
-        sanitized_documents = []
-        excel_dir = os.path.dirname(output_path) # Get directory where Excel file is saved
-
+        keys = set()
         for doc in documents:
-            sanitized_doc = {}
-            for key, value in doc.items():
-                if isinstance(value, str):
-                    sanitized_doc[key] = value.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
-                else:
-                    sanitized_doc[key] = value
-            
-            # --- START: RELATIVE PATH LOGIC ---
-            local_path = sanitized_doc.get("localPath")
-            if local_path:
-                try:
-                    relative_path = os.path.relpath(local_path, excel_dir)
-                    sanitized_doc['localLink'] = relative_path.replace('\\', '/')
-                except ValueError:
-                    # Fallback for different drives on Windows
-                    sanitized_doc['localLink'] = local_path.replace('\\', '/')
-            # --- END: RELATIVE PATH LOGIC ---
-            sanitized_documents.append(sanitized_doc)
+            keys.update(doc)
+        if any(doc.get("localPath") for doc in documents):
+            keys.add("localLink")
+        columns = [key for key in EXCEL_COLUMNS if key in keys]
 
-        df = pd.DataFrame(sanitized_documents)
-        
-        columns_map = {
-            "stt": "STT",
-            "scope": "Scope",
-            "table": "Table",
-            "item": "Item",
-            "discipline": "Bộ môn",
-            "companyDocNo": "Company Doc No",
-            "contractorDocNo": "Contractor Doc No",
-            "name": "Tên tài liệu",
-            "doc_class": "Class",
-            "revision": "Phiên bản",
-            "ipi_status": "IPI Status",
-            "transNo": "Trans No",
-            "dateReceived": "Ngày nhận",
-            "trn_out_date": "TRN Out Date",
-            "trn_out_no": "TRN Out No",
-            "date_receive_trn_out": "Date Receive TRN Out",
-            "trn_in_date": "TRN In Date",
-            "trn_in_no": "TRN In No",
-            "review_code": "Review Code",
-            "ifi_plan_date": "IFI Plan",
-            "ifr_plan_date": "IFR Plan",
-            "ifa_plan_date": "IFA Plan",
-            "ifc_plan_date": "IFC Plan",
-            "iff_plan_date": "IFF Plan",
-            "ifi_actual_date": "IFI Actual",
-            "ifr_actual_date": "IFR Actual",
-            "ifa_actual_date": "IFA Actual",
-            "ifc_actual_date": "IFC Actual",
-            "iff_actual_date": "IFF Actual",
-            "target_mitigation_date": "Target Date",
-            "pic_ptsc": "PIC PTSC",
-            "pic_lsp": "PIC LSP",
-            "doc_status": "Status",
-            "description": "Description",
-            "sharepointPath": "Đường dẫn (SharePoint)",
-            "feedbackStatus": "Trạng thái Phản hồi",
-            "localLink": "Đường dẫn Local"
-        }
-        
-        cols_to_export = [key for key in columns_map if key in df.columns]
-        df_export = df[cols_to_export].rename(columns=columns_map)
+        write_documents_excel(documents, columns, output_path)
+        print(json.dumps({"success": True, "path": output_path}), flush=True)
 
-        writer = pd.ExcelWriter(output_path, engine='xlsxwriter')
-        df_export.to_excel(writer, sheet_name='Sheet1', index=False)
-        
-        workbook  = writer.book
-        worksheet = writer.sheets['Sheet1']
-        url_format = workbook.add_format({'font_color': 'blue', 'underline': 1})
-        
-        # Find the index of our new link column
-        try:
-            link_col_idx = df_export.columns.get_loc("Đường dẫn Local")
-            # Write hyperlink formula for each row
-            for index, row in df_export.iterrows():
-                link_path = row["Đường dẫn Local"]
-                if link_path:
-                    worksheet.write_url(index + 1, link_col_idx, link_path, string='Mở File', cell_format=url_format)
-        except KeyError:
-            pass # Column wasn't there, do nothing
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}), flush=True)
 
-        writer.close()
-        
-        print(json.dumps({"success": True, "path": output_path}), flush=True)
+def export_db_to_excel(output_path):
+    """Export every document to Excel straight from the database cursor"""
+    try:
+        conn = db_connect()
+        try:
+            # Let the ORDER BY sort spill to disk instead of holding the table in memory
+            conn.execute('PRAGMA temp_store = FILE')
+            # Same rows and numbering as load_all_docs
+            cursor = conn.execute('SELECT * FROM documents ORDER BY stt, name')
+            names = [description[0] for description in cursor.description]
+            columns = [key for key in EXCEL_COLUMNS if key in names or key == "localLink"]
+
+            def documents():
+                for stt, values in enumerate(cursor, 1):
+                    doc = dict(zip(names, values))
+                    doc['stt'] = stt
+                    yield doc
+
+            count = write_documents_excel(documents(), columns, output_path)
+        finally:
+            conn.close()
+        if not count:
+            os.remove(output_path)
+            print(json.dumps({"success": False, "error": "Không có dữ liệu để xuất."}), flush=True)
+            return
+        print(json.dumps({"success": True, "path": output_path, "count": count}), flush=True)
 
     except Exception as e:
         print(json.dumps({"success": False, "error": str(e)}), flush=True)
@@ -505,166 +767,103 @@ def export_generic_to_excel(documents_json, output_path):
     except Exception as e:
         print(json.dumps({"success": False, "error": str(e)}), flush=True)
 
+STATUS_CATEGORIES = [
+    'Input Plan', 'Ongoing 1st Issue', 'Ongoing Resubmit', 
+    'Overdue 1st issue', 'Overdue Cmt', 'Overdue Re-submit',
+    'Waiting Issue Final', 'Waiting Cmt'
+]
+
+# Status categories and overdue, one SUM(CASE ...) column each, matched with
+# LIKE '%category%' over the distinct (table, status) groups of document_stats
+MATCHED_STATUSES = STATUS_CATEGORIES + ['Overdue']
+STATUS_BY_TABLE_SQL = f'''
+    SELECT table_name, {", ".join("SUM(CASE WHEN doc_status LIKE ? THEN count ELSE 0 END)" for _ in MATCHED_STATUSES)}
+    FROM (
+        SELECT json_extract(group_key, '$[0]') AS table_name, json_extract(group_key, '$[1]') AS doc_status, count
+        FROM document_stats WHERE dimension = 'table_status'
+    )
+    WHERE doc_status IS NOT NULL
+    GROUP BY table_name ORDER BY table_name
+'''
+
+FLAG_TOTALS_SQL = '''
+    SELECT COALESCE(SUM(count), 0),
+           COALESCE(SUM(CASE WHEN has_out THEN count ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN has_out AND NOT has_in THEN count ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN has_in THEN count ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN needs_feedback THEN count ELSE 0 END), 0)
+    FROM (
+        SELECT json_extract(group_key, '$[0]') AS has_out, json_extract(group_key, '$[1]') AS has_in,
+               json_extract(group_key, '$[2]') AS needs_feedback, count
+        FROM document_stats WHERE dimension = 'flags'
+    )
+'''
+
+def _dimension_counts(cursor, source, dimension, by_count=False):
+    """(key, count) pairs of a one-column dimension, by key or by count desc (ties by key)"""
+    order = 'count DESC, key' if by_count else 'key'
+    cursor.execute(source + f'''
+        SELECT json_extract(group_key, '$[0]') AS key, count FROM document_stats
+        WHERE dimension = ? ORDER BY {order}
+    ''', (dimension,))
+    return cursor.fetchall()
+
 def get_document_stats():
+    # Materialized per-dimension counts, kept in step by triggers on documents;
+    # every total below is aggregated by SQLite over their O(#groups) rows.
+    # Read-only: init/imports build the summary, until then it is computed live
     conn = db_connect()
     cursor = conn.cursor()
+    source = stats_source(cursor)
     
-    # Total documents
-    cursor.execute('SELECT COUNT(*) FROM documents')
-    total_docs = cursor.fetchone()[0]
+    cursor.execute(source + FLAG_TOTALS_SQL)
+    total_docs, total_trn_out, trn_pending, trn_received, docs_needing_feedback = cursor.fetchone()
     
-    # By discipline
-    cursor.execute('''
-        SELECT discipline, COUNT(*)
-        FROM documents
-        GROUP BY discipline
-        ORDER BY COUNT(*) DESC
-    ''')
-    docs_by_discipline_raw = cursor.fetchall()
-    docs_by_discipline = {item[0] if item[0] else "N/A": item[1] for item in docs_by_discipline_raw}
+    by_discipline = _dimension_counts(cursor, source, 'discipline', by_count=True)
+    by_scope = _dimension_counts(cursor, source, 'scope')
+    by_ipi = _dimension_counts(cursor, source, 'ipi_status')
+    by_review_code = _dimension_counts(cursor, source, 'review_code', by_count=True)
     
-    # By Scope
-    cursor.execute('''
-        SELECT scope, COUNT(*)
-        FROM documents
-        WHERE scope IS NOT NULL
-        GROUP BY scope
+    cursor.execute(source + '''
+        SELECT json_extract(group_key, '$[1]') AS doc_status, SUM(count) AS total FROM document_stats
+        WHERE dimension = 'table_status' AND doc_status IS NOT NULL
+        GROUP BY doc_status ORDER BY total DESC, doc_status
     ''')
-    docs_by_scope_raw = cursor.fetchall()
-    docs_by_scope = {item[0]: item[1] for item in docs_by_scope_raw}
+    by_status = cursor.fetchall()
     
-    # By IPI Status
-    cursor.execute('''
-        SELECT ipi_status, COUNT(*)
-        FROM documents
-        WHERE ipi_status IS NOT NULL
-        GROUP BY ipi_status
+    # Status by Table (for Overdue tracking), ordered by table then count desc
+    cursor.execute(source + '''
+        SELECT json_extract(group_key, '$[0]') AS table_name, json_extract(group_key, '$[1]') AS doc_status, count
+        FROM document_stats
+        WHERE dimension = 'table_status' AND table_name IS NOT NULL AND doc_status IS NOT NULL
+        ORDER BY table_name, count DESC, doc_status
     ''')
-    docs_by_ipi_raw = cursor.fetchall()
-    docs_by_ipi = {item[0]: item[1] for item in docs_by_ipi_raw}
-    
-    # By Document Status
-    cursor.execute('''
-        SELECT doc_status, COUNT(*)
-        FROM documents
-        WHERE doc_status IS NOT NULL
-        GROUP BY doc_status
-        ORDER BY COUNT(*) DESC
-    ''')
-    docs_by_status_raw = cursor.fetchall()
-    docs_by_status = {item[0]: item[1] for item in docs_by_status_raw}
-    
-    # TRN Statistics
-    cursor.execute('''
-        SELECT COUNT(*)
-        FROM documents
-        WHERE trn_out_date IS NOT NULL
-    ''')
-    total_trn_out = cursor.fetchone()[0]
-    
-    cursor.execute('''
-        SELECT COUNT(*)
-        FROM documents
-        WHERE trn_out_date IS NOT NULL AND trn_in_date IS NULL
-    ''')
-    trn_pending = cursor.fetchone()[0]
-    
-    cursor.execute('''
-        SELECT COUNT(*)
-        FROM documents
-        WHERE trn_in_date IS NOT NULL
-    ''')
-    trn_received = cursor.fetchone()[0]
-    
-    # Review Code Statistics
-    cursor.execute('''
-        SELECT review_code, COUNT(*)
-        FROM documents
-        WHERE review_code IS NOT NULL
-        GROUP BY review_code
-        ORDER BY COUNT(*) DESC
-    ''')
-    docs_by_review_code_raw = cursor.fetchall()
-    docs_by_review_code = {item[0]: item[1] for item in docs_by_review_code_raw}
-    
-    # Legacy feedback
-    cursor.execute('''
-        SELECT COUNT(*)
-        FROM documents
-        WHERE feedbackStatus IS NULL OR feedbackStatus = ''
-    ''')
-    docs_needing_feedback = cursor.fetchone()[0]
+    status_by_table = {}
+    for table_name, doc_status, count in cursor.fetchall():
+        status_by_table.setdefault(table_name, {})[doc_status] = count
     
     # Status Detail Distribution (matching Excel Summary sheet categories)
-    # Count by Table for each status category
-    status_categories = [
-        'Input Plan', 'Ongoing 1st Issue', 'Ongoing Resubmit', 
-        'Overdue 1st issue', 'Overdue Cmt', 'Overdue Re-submit',
-        'Waiting Issue Final', 'Waiting Cmt'
-    ]
+    cursor.execute(source + STATUS_BY_TABLE_SQL, [f'%{status}%' for status in MATCHED_STATUSES])
+    table_rows = cursor.fetchall()
+    conn.close()
     
+    matched_by_table = {status: [(row[0], row[position]) for row in table_rows if row[position]]
+                        for position, status in enumerate(MATCHED_STATUSES, start=1)}
     status_detail_distribution = {}
-    
-    for status_cat in status_categories:
-        cursor.execute('''
-            SELECT "table", COUNT(*)
-            FROM documents
-            WHERE doc_status LIKE ?
-            GROUP BY "table"
-        ''', (f'%{status_cat}%',))
-        table_data_raw = cursor.fetchall()
-        table_data = {item[0] if item[0] else "N/A": item[1] for item in table_data_raw}
-        
-        # Get total for this category
-        cursor.execute('''
-            SELECT COUNT(*)
-            FROM documents
-            WHERE doc_status LIKE ?
-        ''', (f'%{status_cat}%',))
-        total_count = cursor.fetchone()[0]
-        
+    for status_cat in STATUS_CATEGORIES:
+        table_counts = matched_by_table[status_cat]
         status_detail_distribution[status_cat] = {
-            "by_table": table_data,
-            "total": total_count
+            "by_table": {key if key else "N/A": count for key, count in table_counts},
+            "total": sum(count for _, count in table_counts)
         }
     
-    # Status by Table (for Overdue tracking)
-    cursor.execute('''
-        SELECT "table", doc_status, COUNT(*)
-        FROM documents
-        WHERE "table" IS NOT NULL AND doc_status IS NOT NULL
-        GROUP BY "table", doc_status
-        ORDER BY "table", COUNT(*) DESC
-    ''')
-    status_by_table_raw = cursor.fetchall()
-    
-    # Organize by table
-    status_by_table = {}
-    for table_name, status, count in status_by_table_raw:
-        if table_name not in status_by_table:
-            status_by_table[table_name] = {}
-        status_by_table[table_name][status] = count
-    
-    # Get Overdue counts by Table
-    cursor.execute('''
-        SELECT "table", COUNT(*)
-        FROM documents
-        WHERE doc_status LIKE '%Overdue%'
-        GROUP BY "table"
-        ORDER BY "table"
-    ''')
-    overdue_by_table_raw = cursor.fetchall()
-    overdue_by_table = {item[0]: item[1] for item in overdue_by_table_raw if item[0]}
-    
-    conn.close()
-    
     return {
         "total_documents": total_docs,
-        "docs_by_discipline": docs_by_discipline,
-        "docs_by_scope": docs_by_scope,
-        "docs_by_ipi": docs_by_ipi,
-        "docs_by_status": docs_by_status,
-        "docs_by_review_code": docs_by_review_code,
+        "docs_by_discipline": {key if key else "N/A": count for key, count in by_discipline},
+        "docs_by_scope": {key: count for key, count in by_scope if key is not None},
+        "docs_by_ipi": {key: count for key, count in by_ipi if key is not None},
+        "docs_by_status": dict(by_status),
+        "docs_by_review_code": {key: count for key, count in by_review_code if key is not None},
         "trn_stats": {
             "total_trn_out": total_trn_out,
             "trn_pending": trn_pending,
@@ -673,7 +872,7 @@ def get_document_stats():
         "docs_needing_feedback": docs_needing_feedback,
         "status_detail_distribution": status_detail_distribution,
         "status_by_table": status_by_table,
-        "overdue_by_table": overdue_by_table
+        "overdue_by_table": {key: count for key, count in matched_by_table['Overdue'] if key}
     }
 
 def import_from_excel_mdi(excel_path):
@@ -724,6 +923,9 @@ if __name__ == "__main__":
         load_all_generic_files()
     elif command == "scan":
         scan_documents(sys.argv[3])
+    elif command == "scan_incremental":
+        delta = scan_documents(sys.argv[3], incremental=True)
+        print(json.dumps({"scan_delta": delta}), file=sys.stderr)
     elif command == "upload":
         json_data = sys.stdin.read()
         sp_path = sys.argv[3]
@@ -737,6 +939,8 @@ if __name__ == "__main__":
         json_data = sys.stdin.read()
         output_path = sys.argv[3]
         export_to_excel(json_data, output_path)
+    elif command == "export_db":
+        export_db_to_excel(sys.argv[3])
     elif command == "scan_generic":
         scan_generic_files(sys.argv[3])
     elif command == "export_generic":
@@ -0,0 +1,44 @@
+"""
+Document Numbers
+Every MDI document gets a permanent stt when it is inserted (or first gets a
+companyDocNo), so the JSON export, deltas, pages and search results all show
+the same number for it instead of each numbering rows its own way
+"""
+
+# Only MDI documents (with companyDocNo), same as the JSON export
+MDI_CONDITION = "NEW.stt IS NULL AND NEW.companyDocNo IS NOT NULL AND NEW.companyDocNo != ''"
+
+NEXT_NUMBER_SQL = '''
+    UPDATE documents SET stt = (SELECT COALESCE(MAX(stt), 0) + 1 FROM documents)
+    WHERE rowid = NEW.rowid;'''
+
+def ensure_document_numbers(conn):
+    """Number existing MDI documents and install the numbering triggers if missing"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_document_number_insert'")
+    if cursor.fetchone() is not None:
+        return
+
+    # MAX(stt) per insert stays a single index lookup
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stt ON documents(stt)")
+
+    # Unnumbered documents continue after the highest number, in the order
+    # the export listed them so far
+    cursor.execute("SELECT COALESCE(MAX(stt), 0) FROM documents")
+    last = cursor.fetchone()[0]
+    cursor.execute('''
+        SELECT rowid FROM documents
+        WHERE stt IS NULL AND companyDocNo IS NOT NULL AND companyDocNo != ''
+        ORDER BY rowid''')
+    cursor.executemany("UPDATE documents SET stt = ? WHERE rowid = ?",
+                       [(last + i, row[0]) for i, row in enumerate(cursor.fetchall(), 1)])
+
+    cursor.execute(f'''
+        CREATE TRIGGER trg_document_number_insert AFTER INSERT ON documents
+        WHEN {MDI_CONDITION}
+        BEGIN {NEXT_NUMBER_SQL} END''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_document_number_update AFTER UPDATE OF companyDocNo ON documents
+        WHEN {MDI_CONDITION}
+        BEGIN {NEXT_NUMBER_SQL} END''')
+    conn.commit()
@@ -0,0 +1,159 @@
+"""
+Document Query - paginated, filterable reads of the documents table
+Filters and sorting run as indexed SQLite queries; pages use a keyset cursor
+"""
+
+import base64
+import json
+import sqlite3
+
+from db_connection import get_connection
+from export_db_to_json_v2 import map_document
+
+# Query parameter -> documents column
+FILTER_COLUMNS = {
+    'discipline': 'discipline',
+    'scope': 'scope',
+    'doc_status': 'doc_status',
+    'ipi_status': 'ipi_status',
+    'review_code': 'review_code',
+    'table': '"table"',
+}
+
+SORT_COLUMNS = {
+    'stt': 'stt',
+    'documentNo': 'companyDocNo',
+    'title': 'name',
+    'discipline': 'discipline',
+    'status': 'doc_status',
+    'ipiStatus': 'ipi_status',
+    'dateReceived': 'dateReceived',
+}
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Only MDI documents (with companyDocNo), same as the JSON export
+MDI_FILTER = "companyDocNo IS NOT NULL AND companyDocNo != ''"
+
+def ensure_indexes(conn):
+    """
+    Create the indexes used by filters, sorting and the keyset cursor
+    (run by init_db; reads never create them)
+    """
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stt ON documents(stt)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_discipline ON documents(discipline)")
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_table ON documents("table")')
+    for idx_name, col_name in [
+        ('idx_doc_status', 'doc_status'),
+        ('idx_ipi_status', 'ipi_status'),
+        ('idx_scope', 'scope'),
+        ('idx_company_doc', 'companyDocNo'),
+        ('idx_review_code', 'review_code'),
+    ]:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {idx_name} ON documents({col_name})")
+    conn.commit()
+
+def encode_cursor(sort_value, rowid):
+    """Opaque keyset cursor for the last row of a page"""
+    raw = json.dumps([sort_value, rowid]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor_token):
+    """Inverse of encode_cursor; raises ValueError on a malformed token"""
+    try:
+        sort_value, rowid = json.loads(base64.urlsafe_b64decode(cursor_token.encode('ascii')))
+        return sort_value, int(rowid)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor_token}")
+
+def _keyset_clause(sort_col, descending, sort_value, rowid):
+    """
+    WHERE clause selecting rows after (sort_value, rowid) in sort order.
+    SQLite sorts NULLs first ascending and last descending.
+    """
+    if descending:
+        if sort_value is None:
+            return f"({sort_col} IS NULL AND rowid < ?)", [rowid]
+        return (f"({sort_col} < ? OR ({sort_col} = ? AND rowid < ?) OR {sort_col} IS NULL)",
+                [sort_value, sort_value, rowid])
+    if sort_value is None:
+        return f"(({sort_col} IS NULL AND rowid > ?) OR {sort_col} IS NOT NULL)", [rowid]
+    return f"({sort_col} > ? OR ({sort_col} = ? AND rowid > ?))", [sort_value, sort_value, rowid]
+
+def query_documents(db_path, filters=None, sort='stt', order='asc', limit=DEFAULT_LIMIT, cursor=None):
+    """
+    Fetch one page of MDI documents
+
+    Args:
+        db_path: Path to SQLite database file
+        filters: Dict of FILTER_COLUMNS key -> list of accepted values
+        sort: SORT_COLUMNS key
+        order: 'asc' or 'desc'
+        limit: Page size (capped at MAX_LIMIT)
+        cursor: nextCursor from the previous page, or None for the first page
+
+    Returns:
+        Dict with documents, total and pagination info
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Unsupported sort field: {sort}")
+    if order not in ('asc', 'desc'):
+        raise ValueError(f"Unsupported sort order: {order}")
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    sort_col = SORT_COLUMNS[sort]
+    descending = order == 'desc'
+
+    where = [MDI_FILTER]
+    params = []
+    for key, values in (filters or {}).items():
+        if key not in FILTER_COLUMNS:
+            raise ValueError(f"Unsupported filter: {key}")
+        if not values:
+            continue
+        placeholders = ', '.join('?' * len(values))
+        where.append(f"{FILTER_COLUMNS[key]} IN ({placeholders})")
+        params.extend(values)
+
+    conn = get_connection(db_path)
+    db_cursor = conn.cursor()
+    db_cursor.row_factory = sqlite3.Row
+
+    db_cursor.execute(f"SELECT COUNT(*) FROM documents WHERE {' AND '.join(where)}", params)
+    total = db_cursor.fetchone()[0]
+
+    if cursor:
+        clause, clause_params = _keyset_clause(sort_col, descending, *decode_cursor(cursor))
+        where.append(clause)
+        params.extend(clause_params)
+
+    direction = 'DESC' if descending else 'ASC'
+    db_cursor.execute(f"""
+        SELECT rowid AS _rowid, * FROM documents
+        WHERE {' AND '.join(where)}
+        ORDER BY {sort_col} {direction}, rowid {direction}
+        LIMIT ?
+    """, params + [limit + 1])
+    rows = db_cursor.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    documents = [map_document(dict(row), row['_rowid']) for row in rows]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[sort_col.strip('"')], last['_rowid'])
+
+    return {
+        "documents": documents,
+        "total": total,
+        "pagination": {
+            "limit": limit,
+            "sort": sort,
+            "order": order,
+            "nextCursor": next_cursor,
+            "hasMore": has_more
+        }
+    }
@@ -0,0 +1,213 @@
+"""
+Document Search - SQLite FTS5 index over document names and numbers
+External-content index kept in sync with the documents table by triggers
+"""
+
+import json
+import sqlite3
+import sys
+
+from db_connection import connect, get_connection
+from export_db_to_json_v2 import map_document
+
+# Indexed columns and their bm25 weights (doc numbers rank above names)
+SEARCH_COLUMNS = {
+    'companyDocNo': 10.0,
+    'contractorDocNo': 5.0,
+    'name': 2.0,
+    'description': 1.0,
+    'transNo': 1.0,
+    'trn_out_no': 1.0,
+    'trn_in_no': 1.0,
+}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Only MDI documents (with companyDocNo), same as the JSON export
+MDI_FILTER = "d.companyDocNo IS NOT NULL AND d.companyDocNo != ''"
+
+_indexed_databases = {}
+
+def _search_index_installed(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_documents_fts_insert'")
+    return cursor.fetchone() is not None
+
+def _install_search_index(cursor):
+    """Drop and recreate documents_fts and its triggers, indexing every row"""
+    cursor.execute("PRAGMA table_info(documents)")
+    existing = {row[1] for row in cursor.fetchall()}
+    indexed = [col for col in SEARCH_COLUMNS if col in existing]
+    columns = ', '.join(indexed)
+    new_values = ', '.join(f'NEW.{col}' for col in indexed)
+    old_values = ', '.join(f'OLD.{col}' for col in indexed)
+    for name in ('insert', 'delete', 'update'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_documents_fts_{name}")
+    cursor.execute("DROP TABLE IF EXISTS documents_fts")
+    # Accent-insensitive; '-' separates tokens, so "TCPT-T-ZZ" matches as a phrase
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE documents_fts USING fts5(
+            {columns}, content='documents', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_documents_fts_insert AFTER INSERT ON documents BEGIN
+            INSERT INTO documents_fts (rowid, {columns}) VALUES (NEW.rowid, {new_values});
+        END''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_documents_fts_delete AFTER DELETE ON documents BEGIN
+            INSERT INTO documents_fts (documents_fts, rowid, {columns}) VALUES ('delete', OLD.rowid, {old_values});
+        END''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_documents_fts_update AFTER UPDATE OF {columns} ON documents BEGIN
+            INSERT INTO documents_fts (documents_fts, rowid, {columns}) VALUES ('delete', OLD.rowid, {old_values});
+            INSERT INTO documents_fts (rowid, {columns}) VALUES (NEW.rowid, {new_values});
+        END''')
+    cursor.execute("INSERT INTO documents_fts (documents_fts) VALUES ('rebuild')")
+
+def _write_search_index(conn, rebuild):
+    """
+    Install the index in one write transaction: IMMEDIATE takes the write lock
+    before sqlite_master is re-read, so two first searches on a fresh database
+    cannot both build it, and a failure leaves no half-built index behind
+    """
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        if rebuild or not _search_index_installed(cursor):
+            _install_search_index(cursor)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+def ensure_search_index(conn, db_path=None):
+    """
+    Create documents_fts and its triggers, indexing existing rows on first use
+
+    Returns:
+        The indexed columns (the SEARCH_COLUMNS the documents table has)
+    """
+    if db_path in _indexed_databases:
+        return _indexed_databases[db_path]
+    cursor = conn.cursor()
+    if not _search_index_installed(cursor):
+        _write_search_index(conn, rebuild=False)
+    cursor.execute("PRAGMA table_info(documents_fts)")
+    indexed = [row[1] for row in cursor.fetchall()]
+    if db_path:
+        _indexed_databases[db_path] = indexed
+    return indexed
+
+def rebuild_search_index(conn, db_path=None):
+    """
+    Recreate documents_fts from the documents table
+
+    The index is keyed on the implicit rowid (localPath, the primary key, is
+    TEXT). SQLite does not promise to keep those rowids across VACUUM, so run
+    this after a VACUUM, or whenever check_search_index reports a mismatch.
+
+    Returns:
+        The indexed columns
+    """
+    _indexed_databases.pop(db_path, None)
+    _write_search_index(conn, rebuild=True)
+    return ensure_search_index(conn, db_path)
+
+def check_search_index(conn):
+    """Compare documents_fts against the documents table (FTS5 integrity-check)"""
+    cursor = conn.cursor()
+    if not _search_index_installed(cursor):
+        return {"consistent": False, "error": "documents_fts is missing, run rebuild"}
+    try:
+        # rank = 1 also compares the index against the content table
+        cursor.execute("INSERT INTO documents_fts (documents_fts, rank) VALUES ('integrity-check', 1)")
+    except sqlite3.DatabaseError as e:
+        return {"consistent": False, "error": f"documents_fts does not match documents ({e}), run rebuild"}
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+    return {"consistent": True}
+
+def build_match_query(text):
+    """
+    FTS5 MATCH expression for free text: every word must match, the last
+    token of each word as a prefix. Words are quoted, so FTS5 syntax in user
+    input is searched for literally.
+    """
+    terms = ['"' + word.replace('"', '""') + '"*' for word in text.split()]
+    if not terms:
+        raise ValueError("Empty search query")
+    return ' '.join(terms)
+
+def search_documents(db_path, text, limit=DEFAULT_LIMIT, offset=0):
+    """
+    Ranked full-text search over MDI documents
+
+    Args:
+        db_path: Path to SQLite database file
+        text: Words to search for (prefixes allowed)
+        limit: Page size (capped at MAX_LIMIT)
+        offset: Number of results to skip
+
+    Returns:
+        Dict with documents (best match first), total and pagination info
+    """
+    match = build_match_query(text)
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    offset = max(0, int(offset))
+
+    conn = get_connection(db_path)
+    indexed = ensure_search_index(conn, db_path)
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+
+    weights = ', '.join(str(SEARCH_COLUMNS[col]) for col in indexed)
+    cursor.execute(f'''
+        SELECT COUNT(*) FROM documents_fts f JOIN documents d ON d.rowid = f.rowid
+        WHERE documents_fts MATCH ? AND {MDI_FILTER}
+    ''', (match,))
+    total = cursor.fetchone()[0]
+
+    cursor.execute(f'''
+        SELECT d.rowid AS _rowid, bm25(documents_fts, {weights}) AS _score, d.*
+        FROM documents_fts f JOIN documents d ON d.rowid = f.rowid
+        WHERE documents_fts MATCH ? AND {MDI_FILTER}
+        ORDER BY _score, d.rowid
+        LIMIT ? OFFSET ?
+    ''', (match, limit, offset))
+    rows = cursor.fetchall()
+
+    documents = []
+    for row in rows:
+        doc = map_document(dict(row), row['_rowid'])
+        doc['score'] = -row['_score']  # bm25 is lower-is-better
+        documents.append(doc)
+
+    return {
+        "documents": documents,
+        "total": total,
+        "pagination": {
+            "limit": limit,
+            "offset": offset,
+            "hasMore": offset + len(rows) < total
+        }
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python document_search.py <db_path> <rebuild|check>")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+    command = sys.argv[2]
+
+    conn = connect(db_path)
+    if command == "rebuild":
+        result = {"success": True, "columns": rebuild_search_index(conn)}
+    elif command == "check":
+        result = check_search_index(conn)
+    else:
+        result = {"error": f"Unknown command: {command}"}
+    conn.close()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -6,165 +6,345 @@ Imports data from Excel MDI Status Report into the database
 import pandas as pd
 import sqlite3
 import sys
+import os
 import json
-import io
-from datetime import datetime
-
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
-
-def parse_date(date_value):
-    """Convert Excel date to string format"""
-    if pd.isna(date_value):
-        return None
-    if isinstance(date_value, datetime):
-        return date_value.strftime('%Y-%m-%d')
-    return str(date_value)
-
-def import_from_excel(db_path, excel_path, sheet_name='MDI_DetailStatus'):
-    """Import MDI data from Excel into database"""
+import time
+import hashlib
+
+from data_version import ensure_data_version, bump_data_version
+from db_connection import connect
+from change_log import fetch_current_values, diff_values, record_changes
+from mdi_classifier import MDIClassifier, MAPPING_FILE
+from stats_summary import ensure_stats_summary
+from row_version import ensure_row_versions
+from document_numbers import ensure_document_numbers
+from mdi_schema import (
+    SHEET_NAME, MDI_COLUMNS, COLUMNS_BY_FIELD, CONVERTERS,
+    read_mdi_sheet, clean_dates, to_clean_layout, write_clean_workbook
+)
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+UPDATE_FIELDS = [
+    'scope', 'item', 'contractor_doc_no',
+    'ipi_status', 'review_code',
+    'trn_out_date', 'trn_out_no', 'date_receive_trn_out',
+    'trn_in_date', 'trn_in_no',
+    'ifi_plan', 'ifr_plan', 'ifa_plan', 'ifc_plan', 'iff_plan',
+    'ifi_actual', 'ifr_actual', 'ifa_actual', 'ifc_actual', 'iff_actual',
+    'target_date', 'pic_ptsc', 'pic_lsp', 'doc_status',
+    'company_doc_no'
+]
+
+INSERT_FIELDS = [
+    'temp_path', 'doc_name', 'table', 'description', 'org',
+    'scope', 'item', 'company_doc_no', 'contractor_doc_no', 'doc_class', 'revision',
+    'ipi_status', 'review_code',
+    'trn_out_date', 'trn_out_no', 'date_receive_trn_out',
+    'trn_in_date', 'trn_in_no',
+    'ifi_plan', 'ifr_plan', 'ifa_plan', 'ifc_plan', 'iff_plan',
+    'ifi_actual', 'ifr_actual', 'ifa_actual', 'ifc_actual', 'iff_actual',
+    'target_date', 'pic_ptsc', 'pic_lsp', 'doc_status'
+]
+
+UPDATE_SQL = '''
+    UPDATE documents SET
+        scope = ?, item = ?, contractorDocNo = ?,
+        ipi_status = ?, review_code = ?,
+        trn_out_date = ?, trn_out_no = ?, date_receive_trn_out = ?,
+        trn_in_date = ?, trn_in_no = ?,
+        ifi_plan_date = ?, ifr_plan_date = ?, ifa_plan_date = ?, ifc_plan_date = ?, iff_plan_date = ?,
+        ifi_actual_date = ?, ifr_actual_date = ?, ifa_actual_date = ?, ifc_actual_date = ?, iff_actual_date = ?,
+        target_mitigation_date = ?, pic_ptsc = ?, pic_lsp = ?, doc_status = ?
+    WHERE companyDocNo = ?
+'''
+
+# documents column written for each UPDATE_FIELDS entry (all but the key)
+UPDATE_COLUMNS = [COLUMNS_BY_FIELD[field].db_column for field in UPDATE_FIELDS[:-1]]
+
+INSERT_SQL = '''
+    INSERT INTO documents (
+        localPath, name, "table", description, discipline,
+        scope, item, companyDocNo, contractorDocNo, doc_class, revision,
+        ipi_status, review_code,
+        trn_out_date, trn_out_no, date_receive_trn_out,
+        trn_in_date, trn_in_no,
+        ifi_plan_date, ifr_plan_date, ifa_plan_date, ifc_plan_date, iff_plan_date,
+        ifi_actual_date, ifr_actual_date, ifa_actual_date, ifc_actual_date, iff_actual_date,
+        target_mitigation_date, pic_ptsc, pic_lsp, doc_status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Classes for inserted rows the sheet leaves without one, same lookup as scan_documents
+MDI_CLASSIFIER = MDIClassifier.from_file(MAPPING_FILE)
+
+def normalize_frame(df):
+    """Convert all MDI columns at once into a frame keyed by importer field name"""
+    columns = {}
+    for col in MDI_COLUMNS:
+        if col.field in df.columns:
+            columns[col.field] = CONVERTERS[col.kind](df[col.field])
+        else:
+            columns[col.field] = pd.Series([None] * len(df), index=df.index, dtype=object)
+    records = pd.DataFrame(columns, index=df.index)
+    records['description'] = ''
+    records['temp_path'] = 'IMPORT_' + records['company_doc_no'].fillna('')
+    return records
+
+# Rows per executemany call; progress is reported after each batch
+IMPORT_BATCH_SIZE = 500
+
+def print_progress(processed, total, message=None):
+    """Default progress callback: report to stderr like the other CLI scripts"""
+    if message:
+        print(message, file=sys.stderr)
+    elif total:
+        print(f"Processed {processed}/{total} rows", file=sys.stderr)
+
+def ensure_import_tables(cursor):
+    """Create the tables that let re-imports skip unchanged files and rows"""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS import_files (
+        file_hash TEXT PRIMARY KEY,
+        filename TEXT,
+        data_version INTEGER NOT NULL,
+        stats TEXT NOT NULL,
+        imported_at REAL NOT NULL
+    )''')
+    # row_hash covers UPDATE_FIELDS as last written for the key; doc_count is
+    # the number of documents rows with that key at the time, so rows added
+    # later (e.g. by a scan) make the key count as changed
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS import_row_hashes (
+        companyDocNo TEXT PRIMARY KEY,
+        row_hash TEXT NOT NULL,
+        doc_count INTEGER NOT NULL
+    )''')
+    # UPDATE_SQL matches rows by companyDocNo: without this index every row of
+    # the batch scans the table (init_db does not create it)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_company_doc ON documents(companyDocNo)")
+
+def hash_file(path, sheet_name):
+    """SHA-256 of the workbook bytes and the sheet being imported (plus import mode)"""
+    digest = hashlib.sha256(sheet_name.encode('utf-8'))
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_rows(frame):
+    """Content hash of each row of frame, as a Series aligned with it"""
+    return pd.Series(
+        [hashlib.sha1(json.dumps(row, ensure_ascii=False).encode('utf-8')).hexdigest()
+         for row in frame.itertuples(index=False, name=None)],
+        index=frame.index, dtype=object
+    )
+
+def _current_data_version(cursor):
+    ensure_data_version(cursor)
+    cursor.execute('SELECT version FROM data_version WHERE id = 1')
+    return cursor.fetchone()[0]
+
+def process_excel_file(excel_path, db_path, sheet_name=SHEET_NAME, progress=None,
+                       clean=False, clean_output=None):
+    """
+    Import MDI data from Excel into database
+
+    Re-importing a file already imported with no write since short-circuits;
+    otherwise only rows whose content changed since the last import are written.
+
+    Args:
+        excel_path: Path to the MDI Status Report workbook
+        db_path: Path to SQLite database file
+        sheet_name: Sheet holding the detail rows
+        progress: Optional callback(processed, total, message=None), called
+            while reading and after every batch of IMPORT_BATCH_SIZE rows
+        clean: Pipeline mode: apply the cleaner's transforms (dates, serial
+            numbers included, as YYYY-MM-DD) in memory before the upsert,
+            instead of importing a _CLEAN.xlsx written beforehand
+        clean_output: Optional path to also write the cleaned workbook to
+            (same layout as clean_excel_for_import_v2.py); implies clean
+
+    Returns:
+        Dict of import statistics; 'count' is the number of rows written and
+        'unchanged' the number of rows skipped because nothing changed
+
+    Raises:
+        Whatever reading the workbook raises; database errors roll the whole
+        import back and are reported in stats['errors'] instead
+    """
+    report = progress or print_progress
+    report(0, 0, f"Reading Excel file: {excel_path}")
+    
+    clean = clean or clean_output is not None
+    # A cleaned import stores different values, so it has its own file hash
+    file_hash = hash_file(excel_path, sheet_name + (':clean' if clean else ''))
+    
+    # Connect to database
+    conn = connect(db_path)
+    cursor = conn.cursor()
     try:
-        print(f"Reading Excel file: {excel_path}", file=sys.stderr)
+        with conn:
+            ensure_import_tables(cursor)
+            data_version = _current_data_version(cursor)
+        # Built (or rebuilt for a changed schema) by writers, never by /api/stats
+        ensure_stats_summary(conn)
+        ensure_row_versions(conn)
+        ensure_document_numbers(conn)
+        
+        # Same file, and nothing has written to the database since it was
+        # imported (a cleaned workbook to write still needs the rows)
+        cursor.execute('SELECT data_version, stats FROM import_files WHERE file_hash = ?', (file_hash,))
+        previous = cursor.fetchone()
+        if previous and previous[0] == data_version and clean_output is None:
+            stats = json.loads(previous[1])
+            stats.pop('import_id', None)
+            stats.update({
+                'imported': 0,
+                'updated': 0,
+                'unchanged': stats['total_rows'] - stats['skipped'],
+                'changes': 0,
+                'errors': [],
+                'count': 0,
+                'file_unchanged': True
+            })
+            report(stats['total_rows'], stats['total_rows'], "File unchanged since last import, nothing to do")
+            return stats
         
-        # Read Excel with proper header row (skip first 3 rows which are summary/headers)
-        df = pd.read_excel(excel_path, sheet_name=sheet_name, skiprows=3)
+        # Stream only the MDI columns below the summary rows (header is row 4);
+        # the cleaned workbook keeps every column
+        df = read_mdi_sheet(excel_path, sheet_name, all_columns=clean_output is not None)
         
-        print(f"Total rows read: {len(df)}", file=sys.stderr)
-        print(f"Columns: {list(df.columns)[:10]}", file=sys.stderr)
+        report(0, len(df), f"Total rows read: {len(df)}")
+        report(0, len(df), f"Columns: {list(df.columns)[:10]}")
         
-        # Connect to database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        if clean:
+            serial_dates = sum(clean_dates(df).values())
+            report(0, len(df), f"Cleaned date columns ({serial_dates} Excel serial dates converted)")
+        if clean_output is not None:
+            write_clean_workbook(to_clean_layout(df), clean_output)
+            report(0, len(df), f"Cleaned workbook written: {clean_output}")
         
         # Statistics
         stats = {
             'total_rows': len(df),
             'imported': 0,
             'updated': 0,
+            'unchanged': 0,
             'skipped': 0,
+            'changes': 0,
             'errors': []
         }
         
-        # Process each row
-        for idx, row in df.iterrows():
-            try:
-                # Extract data from Excel row
-                scope = str(row.get('Scope', '')).strip() if not pd.isna(row.get('Scope')) else None
-                table = str(row.get('Table', '')).strip() if not pd.isna(row.get('Table')) else None
-                item = str(row.get('Item', '')).strip() if not pd.isna(row.get('Item')) else None
-                org = str(row.get('Org.', '')).strip() if not pd.isna(row.get('Org.')) else None
-                company_doc_no = str(row.get('CompanyDoc.No.', '')).strip() if not pd.isna(row.get('CompanyDoc.No.')) else None
-                contractor_doc_no = str(row.get('ContractorDoc.No.', '')).strip() if not pd.isna(row.get('ContractorDoc.No.')) else None
-                doc_name = str(row.get('DocumentName', '')).strip() if not pd.isna(row.get('DocumentName')) else None
-                doc_class = str(row.get('Class', '')).strip() if not pd.isna(row.get('Class')) else None
-                revision = str(row.get('Rev', '')).strip() if not pd.isna(row.get('Rev')) else None
-                ipi_status = str(row.get('IPI', '')).strip() if not pd.isna(row.get('IPI')) else None
-                
-                # TRN tracking
-                trn_out_date = parse_date(row.get('DateTRNOut'))
-                trn_out_no = str(row.get('TRNOutNo.', '')).strip() if not pd.isna(row.get('TRNOutNo.')) else None
-                date_receive_trn_out = parse_date(row.get('DateReciveTRNOut'))
-                trn_in_date = parse_date(row.get('DateTRNIn'))
-                trn_in_no = str(row.get('TRNInNo.', '')).strip() if not pd.isna(row.get('TRNInNo.')) else None
-                review_code = str(row.get('Code', '')).strip() if not pd.isna(row.get('Code')) else None
-                
-                # Plan dates
-                ifi_plan = parse_date(row.get('IFI\nPlan Date'))
-                ifr_plan = parse_date(row.get('IFR\nPlan Date'))
-                ifa_plan = parse_date(row.get('IFA\nPlan Date'))
-                ifc_plan = parse_date(row.get('IFC\nPlan Date'))
-                iff_plan = parse_date(row.get('IFF/ASB\nPlan Date'))
-                
-                # Actual dates
-                ifi_actual = parse_date(row.get('IFI\nActual Date'))
-                ifr_actual = parse_date(row.get('IFR\nActual Date'))
-                ifa_actual = parse_date(row.get('IFA\nActual Date'))
-                ifc_actual = parse_date(row.get('IFC\nActual Date'))
-                iff_actual = parse_date(row.get('IFF/ASB\nActual Date'))
-                
-                # Management
-                target_date = parse_date(row.get('Target Mitigation Date'))
-                pic_ptsc = str(row.get('PIC PTSC', '')).strip() if not pd.isna(row.get('PIC PTSC')) else None
-                pic_lsp = str(row.get('PIC LSP', '')).strip() if not pd.isna(row.get('PIC LSP')) else None
-                doc_status = str(row.get('Status', '')).strip() if not pd.isna(row.get('Status')) else None
-                
-                # Skip if no company doc number (key field)
-                if not company_doc_no or company_doc_no == 'nan':
-                    stats['skipped'] += 1
-                    continue
+        records = normalize_frame(df)
+        
+        # Skip if no company doc number (key field)
+        keys = records['company_doc_no']
+        has_key = keys.notna() & (keys != '') & (keys != 'nan')
+        stats['skipped'] = int((~has_key).sum())
+        records = records[has_key]
+        keys = records['company_doc_no']
+        
+        # One lookup for all existing keys instead of a SELECT per row
+        cursor.execute('''
+            SELECT companyDocNo, COUNT(*) FROM documents
+            WHERE companyDocNo IS NOT NULL GROUP BY companyDocNo
+        ''')
+        doc_counts = dict(cursor.fetchall())
+        cursor.execute('SELECT companyDocNo, row_hash, doc_count FROM import_row_hashes')
+        stored_hashes = {key: (row_hash, doc_count) for key, row_hash, doc_count in cursor.fetchall()}
+        
+        # Updates run in sheet order, so the last row of a key decides its final content
+        row_hashes = hash_rows(records[UPDATE_FIELDS])
+        final_hashes = row_hashes.groupby(keys, sort=False).last()
+        unchanged_keys = {
+            key for key, row_hash in final_hashes.items()
+            if stored_hashes.get(key) == (row_hash, doc_counts.get(key, 0))
+        }
+        is_unchanged = keys.isin(unchanged_keys)
+        stats['unchanged'] = int(is_unchanged.sum())
+        records = records[~is_unchanged]
+        keys = records['company_doc_no']
+        
+        # The first occurrence of an unknown key is inserted (without localPath,
+        # will be added when file is scanned); everything else updates in sheet order
+        is_new = ~keys.isin(doc_counts.keys()) & ~keys.duplicated()
+        inserts = records.loc[is_new, INSERT_FIELDS]
+        no_class = inserts['doc_class'].isna()
+        if no_class.any():
+            inserts = inserts.assign(doc_class=inserts['doc_class'].where(
+                ~no_class, inserts['company_doc_no'].map(MDI_CLASSIFIER.doc_class)
+            ))
+        updates = records.loc[~is_new, UPDATE_FIELDS]
+        
+        report(stats['skipped'] + stats['unchanged'], stats['total_rows'],
+               f"Writing {len(inserts)} new and {len(updates)} updated rows "
+               f"({stats['unchanged']} unchanged)...")
+        
+        processed = stats['skipped'] + stats['unchanged']
+        try:
+            with conn:
+                if len(records):
+                    # The data version this import produces doubles as its import id
+                    import_id = bump_data_version(cursor)
+                    new_values = records.drop_duplicates('company_doc_no', keep='last') \
+                        .set_index('company_doc_no')[UPDATE_FIELDS[:-1]]
+                    new_values.columns = UPDATE_COLUMNS
+                    old_values = fetch_current_values(cursor, new_values.index, UPDATE_COLUMNS)
                 
-                # Check if document exists in database by companyDocNo
-                cursor.execute('SELECT localPath FROM documents WHERE companyDocNo = ?', (company_doc_no,))
-                existing = cursor.fetchone()
+                for sql, frame in ((INSERT_SQL, inserts), (UPDATE_SQL, updates)):
+                    for start in range(0, len(frame), IMPORT_BATCH_SIZE):
+                        batch = frame.iloc[start:start + IMPORT_BATCH_SIZE]
+                        cursor.executemany(sql, batch.itertuples(index=False, name=None))
+                        processed += len(batch)
+                        report(processed, stats['total_rows'])
                 
-                if existing:
-                    # Update existing document
+                if len(records):
                     cursor.execute('''
-                        UPDATE documents SET
-                            scope = ?, item = ?, contractorDocNo = ?,
-                            ipi_status = ?, review_code = ?,
-                            trn_out_date = ?, trn_out_no = ?, date_receive_trn_out = ?,
-                            trn_in_date = ?, trn_in_no = ?,
-                            ifi_plan_date = ?, ifr_plan_date = ?, ifa_plan_date = ?, ifc_plan_date = ?, iff_plan_date = ?,
-                            ifi_actual_date = ?, ifr_actual_date = ?, ifa_actual_date = ?, ifc_actual_date = ?, iff_actual_date = ?,
-                            target_mitigation_date = ?, pic_ptsc = ?, pic_lsp = ?, doc_status = ?
-                        WHERE companyDocNo = ?
-                    ''', (
-                        scope, item, contractor_doc_no,
-                        ipi_status, review_code,
-                        trn_out_date, trn_out_no, date_receive_trn_out,
-                        trn_in_date, trn_in_no,
-                        ifi_plan, ifr_plan, ifa_plan, ifc_plan, iff_plan,
-                        ifi_actual, ifr_actual, ifa_actual, ifc_actual, iff_actual,
-                        target_date, pic_ptsc, pic_lsp, doc_status,
-                        company_doc_no
-                    ))
-                    stats['updated'] += 1
-                else:
-                    # Insert new record (without localPath, will be added when file is scanned)
-                    # Use company_doc_no as temporary localPath placeholder
-                    temp_path = f"IMPORT_{company_doc_no}"
-                    cursor.execute('''
-                        INSERT INTO documents (
-                            localPath, name, "table", description, discipline,
-                            scope, item, companyDocNo, contractorDocNo, doc_class, revision,
-                            ipi_status, review_code,
-                            trn_out_date, trn_out_no, date_receive_trn_out,
-                            trn_in_date, trn_in_no,
-                            ifi_plan_date, ifr_plan_date, ifa_plan_date, ifc_plan_date, iff_plan_date,
-                            ifi_actual_date, ifr_actual_date, ifa_actual_date, ifc_actual_date, iff_actual_date,
-                            target_mitigation_date, pic_ptsc, pic_lsp, doc_status
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        temp_path, doc_name, table, '', org,
-                        scope, item, company_doc_no, contractor_doc_no, doc_class, revision,
-                        ipi_status, review_code,
-                        trn_out_date, trn_out_no, date_receive_trn_out,
-                        trn_in_date, trn_in_no,
-                        ifi_plan, ifr_plan, ifa_plan, ifc_plan, iff_plan,
-                        ifi_actual, ifr_actual, ifa_actual, ifc_actual, iff_actual,
-                        target_date, pic_ptsc, pic_lsp, doc_status
-                    ))
-                    stats['imported'] += 1
+                        SELECT companyDocNo, COUNT(*) FROM documents
+                        WHERE companyDocNo IS NOT NULL GROUP BY companyDocNo
+                    ''')
+                    doc_counts = dict(cursor.fetchall())
+                    cursor.executemany(
+                        'REPLACE INTO import_row_hashes (companyDocNo, row_hash, doc_count) VALUES (?, ?, ?)',
+                        [(key, final_hashes[key], doc_counts[key]) for key in set(keys)]
+                    )
+                    stats['changes'] = record_changes(
+                        cursor, import_id, diff_values(old_values, new_values), inserts['company_doc_no']
+                    )
+                    stats['import_id'] = import_id
                 
-                # Commit every 100 rows for progress
-                if (idx + 1) % 100 == 0:
-                    conn.commit()
-                    print(f"Processed {idx + 1}/{len(df)} rows...", file=sys.stderr)
-            
-            except Exception as e:
-                error_msg = f"Row {idx}: {str(e)}"
-                stats['errors'].append(error_msg)
-                print(f"Error: {error_msg}", file=sys.stderr)
-        
-        # Final commit
-        conn.commit()
+                stats['imported'] = len(inserts)
+                stats['updated'] = len(updates)
+                stats['count'] = stats['imported'] + stats['updated']
+                cursor.execute('''
+                    REPLACE INTO import_files (file_hash, filename, data_version, stats, imported_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (file_hash, os.path.basename(excel_path), _current_data_version(cursor),
+                      json.dumps(stats, ensure_ascii=False), time.time()))
+        except sqlite3.Error as e:
+            stats['imported'] = stats['updated'] = stats['changes'] = 0
+            stats.pop('import_id', None)
+            error_msg = f"Batch upsert rolled back: {str(e)}"
+            stats['errors'].append(error_msg)
+            report(processed, stats['total_rows'], f"Error: {error_msg}")
+    finally:
         conn.close()
+    
+    stats['count'] = stats['imported'] + stats['updated']
+    return stats
+
+def import_from_excel(db_path, excel_path, sheet_name=SHEET_NAME, clean=False, clean_output=None):
+    """Import MDI data from Excel into database (CLI entry point, prints JSON)"""
+    try:
+        stats = process_excel_file(excel_path, db_path, sheet_name, clean=clean, clean_output=clean_output)
         
         print(json.dumps({
             "success": True,
             "stats": stats
         }))
+        return stats
         
     except Exception as e:
         import traceback
@@ -175,11 +355,17 @@ def import_from_excel(db_path, excel_path, sheet_name='MDI_DetailStatus'):
         }), file=sys.stderr)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python excel_importer.py <db_path> <excel_path>")
+    # Options: --clean (clean and import in one pass, no _CLEAN.xlsx),
+    # --clean-output=<path> (also write the cleaned workbook; implies --clean)
+    options = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(args) < 2:
+        print("Usage: python excel_importer.py <db_path> <excel_path> [--clean] [--clean-output=<path>]")
         sys.exit(1)
     
-    db_path = sys.argv[1]
-    excel_path = sys.argv[2]
+    db_path = args[0]
+    excel_path = args[1]
+    clean = '--clean' in options
+    clean_output = next((opt.split('=', 1)[1] for opt in options if opt.startswith('--clean-output=')), None)
     
-    import_from_excel(db_path, excel_path)
+    import_from_excel(db_path, excel_path, clean=clean, clean_output=clean_output)
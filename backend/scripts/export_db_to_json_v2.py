@@ -5,22 +5,500 @@ Export SQLite Database to JSON for Static Web Deployment
 
 import sqlite3
 import json
+import gzip
 import os
 import sys
+import zlib
 from datetime import datetime
 from pathlib import Path
 
+from db_connection import connect
+
 # Fix encoding for Windows console
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
-def export_database_to_json(db_path='project_data.db', output_path='public/data.json'):
+def map_document(raw_doc, i, has_json_dates=False):
+    """
+    Map a documents row (as dict) to the frontend MDIDocument shape
+    
+    Args:
+        raw_doc: Row from the documents table as a dict
+        i: Fallback position used when the row has no stt/id
+        has_json_dates: True if plan/actual dates are stored as JSON strings
+    
+    Returns:
+        Dict matching the frontend MDIDocument interface
+    """
+    # Parse plan_dates and actual_dates
+    if has_json_dates:
+        # Parse plan_dates (JSON string → Object)
+        plan_dates = {}
+        if raw_doc.get('plan_dates'):
+            try:
+                plan_dates = json.loads(raw_doc['plan_dates'])
+            except (json.JSONDecodeError, TypeError):
+                plan_dates = {}
+        
+        # Parse actual_dates (JSON string → Object)
+        actual_dates = {}
+        if raw_doc.get('actual_dates'):
+            try:
+                actual_dates = json.loads(raw_doc['actual_dates'])
+            except (json.JSONDecodeError, TypeError):
+                actual_dates = {}
+    else:
+        # Build from separate columns
+        plan_dates = {
+            "ifi": raw_doc.get('ifi_plan_date'),
+            "ifr": raw_doc.get('ifr_plan_date'),
+            "ifa": raw_doc.get('ifa_plan_date'),
+            "ifc": raw_doc.get('ifc_plan_date'),
+            "iff": raw_doc.get('iff_plan_date')
+        }
+        
+        actual_dates = {
+            "ifi": raw_doc.get('ifi_actual_date'),
+            "ifr": raw_doc.get('ifr_actual_date'),
+            "ifa": raw_doc.get('ifa_actual_date'),
+            "ifc": raw_doc.get('ifc_actual_date'),
+            "iff": raw_doc.get('iff_actual_date')
+        }
+    
+    # Map database columns to frontend interface
+    # Support both new structure (document_no, status, table_name) 
+    # and old structure (companyDocNo, doc_status, table)
+    doc = {
+        # Key Identifiers
+        "id": raw_doc.get('id') or raw_doc.get('localPath') or f"doc-{i}",
+        "stt": raw_doc.get('stt') or i,
+        "documentNo": raw_doc.get('document_no') or raw_doc.get('companyDocNo') or raw_doc.get('contractorDocNo') or '',
+        "title": raw_doc.get('title') or raw_doc.get('name') or '',
+        "revision": raw_doc.get('revision') or '',
+        
+        # Classification
+        "discipline": raw_doc.get('discipline') or 'N/A',
+        "scope": raw_doc.get('scope') or '',
+        "docClass": raw_doc.get('doc_class') or '',
+        "table": raw_doc.get('table_name') or raw_doc.get('table') or '',
+        "item": raw_doc.get('item') or '',
+        
+        # Status & Progress
+        "status": raw_doc.get('status') or raw_doc.get('doc_status') or raw_doc.get('feedbackStatus') or '',
+        "ipiStatus": raw_doc.get('ipi_status') or '',
+        "reviewCode": raw_doc.get('review_code') or '',
+        
+        # Dates
+        "planDates": plan_dates,
+        "actualDates": actual_dates,
+        "targetMitigationDate": raw_doc.get('target_mitigation_date'),
+        
+        # Transmittals
+        "transNo": raw_doc.get('transNo'),
+        "dateReceived": raw_doc.get('dateReceived') or raw_doc.get('date_received'),
+        "trnOutDate": raw_doc.get('trn_out_date'),
+        "trnOutNo": raw_doc.get('trn_out_no'),
+        "trnInDate": raw_doc.get('trn_in_date'),
+        "trnInNo": raw_doc.get('trn_in_no'),
+        
+        # People (QUAN TRỌNG!)
+        "picPtsc": raw_doc.get('pic_ptsc'),
+        "picLsp": raw_doc.get('pic_lsp'),
+        
+        # System Paths
+        "localPath": raw_doc.get('localPath'),
+        "sharepointPath": raw_doc.get('sharepointPath'),
+        
+        # Computed fields (0/1 → boolean)
+        "isOverdue": bool(raw_doc.get('is_overdue', 0)),
+        "isCritical": bool(raw_doc.get('is_critical', 0))
+    }
+    
+    return doc
+
+EXPORT_CHUNK_SIZE = 1000
+
+def detect_export_source(cursor):
+    """
+    Detect which documents table and column layout the database uses
+    
+    Returns:
+        Dict describing the source table, or None if there is no documents table
+    """
+    # Check table name (could be 'documents' or 'mdi_documents')
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = [row[0] for row in cursor.fetchall()]
+    
+    if 'mdi_documents' in tables:
+        table_name = 'mdi_documents'
+    elif 'documents' in tables:
+        table_name = 'documents'
+    else:
+        return None
+    
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    columns = [row[1] for row in cursor.fetchall()]
+    
+    # Check which column name exists
+    if 'document_no' in columns:
+        doc_no_col = 'document_no'
+    elif 'companyDocNo' in columns:
+        doc_no_col = 'companyDocNo'
+    else:
+        doc_no_col = None
+    
+    return {
+        "table": table_name,
+        "columns": columns,
+        "has_json_dates": 'plan_dates' in columns and 'actual_dates' in columns,
+        "doc_no_col": doc_no_col,
+        # FILTER: Only MDI documents with companyDocNo or document_no (exclude supporting files)
+        "where": f"WHERE {doc_no_col} IS NOT NULL AND {doc_no_col} != ''" if doc_no_col else "WHERE 1 = 1"
+    }
+
+def build_export_metadata(cursor, source):
+    """Compute the metadata block (statistics) for the MDI documents"""
+    table_name = source["table"]
+    columns = source["columns"]
+    where_clause = source["where"]
+    
+    cursor.execute(f"SELECT COUNT(*) FROM {table_name} {where_clause}")
+    total_count = cursor.fetchone()[0]
+    
+    cursor.execute(f"""
+        SELECT COUNT(DISTINCT discipline) FROM {table_name} 
+        {where_clause}
+        AND discipline IS NOT NULL AND discipline != ''
+    """)
+    discipline_count = cursor.fetchone()[0]
+    
+    # Check for status column (could be 'status' or 'doc_status')
+    status_col = 'status' if 'status' in columns else 'doc_status'
+    if status_col in columns:
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM {table_name} 
+            {where_clause}
+            AND {status_col} = 'Approved'
+        """)
+        approved_count = cursor.fetchone()[0]
+    else:
+        approved_count = 0
+    
+    # Check for is_overdue column
+    if 'is_overdue' in columns:
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM {table_name} 
+            {where_clause}
+            AND is_overdue = 1
+        """)
+        overdue_count = cursor.fetchone()[0]
+    else:
+        overdue_count = 0
+    
+    now = datetime.now()
+    metadata = {
+        "exportDate": now.isoformat(),
+        "totalDocuments": total_count,
+        "lastUpdate": now.strftime('%Y-%m-%d %H:%M:%S'),
+        "version": "1.0.0",
+        "statistics": {
+            "total": total_count,
+            "approved": approved_count,
+            "overdue": overdue_count,
+            "disciplines": discipline_count
+        }
+    }
+    
+    # Starting point for /api/documents/delta; read before the documents so
+    # anything written during the export is picked up by the next delta
+    if 'row_version' in columns:
+        cursor.execute(f"SELECT MAX(row_version) FROM {table_name}")
+        metadata["rowVersion"] = cursor.fetchone()[0] or 0
+    return metadata
+
+def iter_document_chunks(cursor, source, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield mapped documents, sorted by stt, in lists of at most chunk_size"""
+    cursor.execute(f"SELECT * FROM {source['table']} {source['where']} ORDER BY stt ASC")
+    column_names = [description[0] for description in cursor.description]
+    position = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        chunk = []
+        for row in rows:
+            position += 1
+            chunk.append(map_document(dict(zip(column_names, row)), position, source["has_json_dates"]))
+        yield chunk
+
+def _dump(value, level, compact):
+    if compact:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    # Re-indent nested output so it matches a single json.dump(indent=2)
+    return json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n' + ' ' * level)
+
+def iter_export_json(metadata, document_chunks, compact=False):
+    """
+    Yield the export document as text, metadata first, one piece per chunk
+    
+    The indented output is byte-identical to json.dump(..., indent=2).
+    """
+    if compact:
+        yield '{"metadata":' + _dump(metadata, 0, True) + ',"documents":['
+    else:
+        yield '{\n  "metadata": ' + _dump(metadata, 2, False) + ',\n  "documents": ['
+    
+    separator = ',' if compact else ',\n    '
+    written = 0
+    for chunk in document_chunks:
+        if not chunk:
+            continue
+        text = separator.join(_dump(doc, 4, compact) for doc in chunk)
+        if written:
+            yield separator + text
+        else:
+            yield text if compact else '\n    ' + text
+        written += len(chunk)
+    
+    if compact:
+        yield ']}'
+    else:
+        yield ('\n  ]' if written else ']') + '\n}'
+
+EXPORT_FORMATS = ('json', 'columnar')
+
+class _ColumnBuilder:
+    """
+    One export column, dictionary-encoded as its values arrive
+    
+    Values are stored once, as dictionary codes; a column with an unhashable
+    value falls back to a plain list.
+    """
+    
+    def __init__(self):
+        self.index = {}
+        self.codes = []
+        self.values = None
+    
+    def append(self, value):
+        if self.values is not None:
+            self.values.append(value)
+            return
+        try:
+            # Keyed by type too, so True/1/1.0 stay distinct
+            self.codes.append(self.index.setdefault((value.__class__, value), len(self.index)))
+        except TypeError:
+            self.values = self.plain()
+            self.values.append(value)
+            self.index = self.codes = None
+    
+    def plain(self):
+        """All values in order, as a list"""
+        if self.values is not None:
+            return self.values
+        dictionary = [value for _, value in self.index]
+        return [dictionary[code] for code in self.codes]
+    
+    def encoded(self):
+        """
+        Dictionary-encode the column when at most half its values are distinct
+        
+        Returns:
+            {"dictionary": [...distinct values...], "codes": [...]} or the plain list
+        """
+        if self.values is not None or len(self.index) * 2 > len(self.codes):
+            return self.plain()
+        return {"dictionary": [value for _, value in self.index], "codes": self.codes}
+
+class ColumnarEncoder:
+    """
+    Builds the columnar form of mapped documents one document at a time
+    
+    Nested objects (planDates, actualDates) become "parent.child" columns while
+    every document has the same keys as the first one; the mapped documents
+    themselves can be dropped as soon as they are added.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self._layout = None  # [(key, sub keys or None)] from the first document
+        self._columns = {}
+    
+    def add(self, doc):
+        if self._layout is None:
+            self._layout = [(key, list(value) if isinstance(value, dict) else None) for key, value in doc.items()]
+            for key, sub_keys in self._layout:
+                for name in ([f"{key}.{sub_key}" for sub_key in sub_keys] if sub_keys is not None else [key]):
+                    self._columns[name] = _ColumnBuilder()
+        
+        for position, (key, sub_keys) in enumerate(self._layout):
+            value = doc.get(key)
+            if sub_keys is not None:
+                if isinstance(value, dict) and list(value) == sub_keys:
+                    for sub_key in sub_keys:
+                        self._columns[f"{key}.{sub_key}"].append(value[sub_key])
+                    continue
+                self._unnest(position)
+            self._columns[key].append(value)
+        self.count += 1
+    
+    def _unnest(self, position):
+        """A document broke the shape of a nested key: store it as one column of objects"""
+        key, sub_keys = self._layout[position]
+        parts = [(sub_key, self._columns.pop(f"{key}.{sub_key}").plain()) for sub_key in sub_keys]
+        column = _ColumnBuilder()
+        for i in range(self.count):
+            column.append({sub_key: values[i] for sub_key, values in parts})
+        self._columns[key] = column
+        self._layout[position] = (key, None)
+    
+    def columns(self):
+        """Yield (column name, list or dictionary column) in document key order"""
+        for key, sub_keys in self._layout or []:
+            for name in ([f"{key}.{sub_key}" for sub_key in sub_keys] if sub_keys is not None else [key]):
+                yield name, self._columns[name].encoded()
+
+def encode_columnar(documents):
+    """
+    Column-oriented form of a list of mapped documents (see ColumnarEncoder)
+    
+    Returns:
+        Dict with count and columns (column name -> list or dictionary column)
+    """
+    encoder = ColumnarEncoder()
+    for doc in documents:
+        encoder.add(doc)
+    return {"count": encoder.count, "columns": dict(encoder.columns())}
+
+def decode_columnar(data):
+    """Inverse of encode_columnar: rebuild the list of document dicts"""
+    fields = []
+    for name, column in data["columns"].items():
+        if isinstance(column, dict):
+            dictionary = column["dictionary"]
+            column = [dictionary[code] for code in column["codes"]]
+        key, _, sub_key = name.partition('.')
+        fields.append((key, sub_key, column))
+    
+    documents = []
+    for i in range(data["count"]):
+        doc = {}
+        for key, sub_key, column in fields:
+            if sub_key:
+                doc.setdefault(key, {})[sub_key] = column[i]
+            else:
+                doc[key] = column[i]
+        documents.append(doc)
+    return documents
+
+def _iter_compact_list(values, chunk_size):
+    """Compact JSON text of a list, chunk_size values per piece"""
+    yield '['
+    for start in range(0, len(values), chunk_size):
+        yield (',' if start else '') + ','.join(_dump(value, 0, True) for value in values[start:start + chunk_size])
+    yield ']'
+
+def iter_columnar_json(metadata, document_chunks, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the columnar export as compact JSON text
+    
+    Metadata goes out before any row is read. Each chunk is folded into the
+    column builders and dropped, then the columns are written one by one,
+    chunk_size values per piece; memory holds the column values, never the
+    mapped documents or the whole text.
+    """
+    yield '{"metadata":' + _dump(dict(metadata, format="columnar"), 0, True)
+    
+    encoder = ColumnarEncoder()
+    for chunk in document_chunks:
+        for doc in chunk:
+            encoder.add(doc)
+    
+    yield ',"count":' + str(encoder.count) + ',"columns":{'
+    for position, (name, column) in enumerate(encoder.columns()):
+        yield (',' if position else '') + _dump(name, 0, True) + ':'
+        if isinstance(column, dict):
+            yield '{"dictionary":'
+            yield from _iter_compact_list(column["dictionary"], chunk_size)
+            yield ',"codes":'
+            yield from _iter_compact_list(column["codes"], chunk_size)
+            yield '}'
+        else:
+            yield from _iter_compact_list(column, chunk_size)
+    yield '}}'
+
+def iter_export(metadata, document_chunks, compact=False, export_format='json'):
+    """Yield the export text in the requested format (see EXPORT_FORMATS)"""
+    if export_format == 'columnar':
+        return iter_columnar_json(metadata, document_chunks)
+    if export_format == 'json':
+        return iter_export_json(metadata, document_chunks, compact=compact)
+    raise ValueError(f"Unsupported export format: {export_format}")
+
+def open_export_stream(db_path, compact=False, chunk_size=EXPORT_CHUNK_SIZE, export_format='json'):
+    """
+    Prepare a streamed export of the database for an HTTP response
+    
+    Connecting, table detection and the metadata queries run immediately so
+    errors surface before any byte is sent. The returned generator yields the
+    JSON text chunk by chunk and closes its own connection when exhausted.
+    
+    Raises:
+        FileNotFoundError: Database file does not exist
+        LookupError: Database has no documents table
+        ValueError: Unknown export_format
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file not found: {db_path}")
+    
+    conn = connect(db_path, check_same_thread=False)
+    try:
+        cursor = conn.cursor()
+        source = detect_export_source(cursor)
+        if source is None:
+            raise LookupError("No documents table found")
+        metadata = build_export_metadata(cursor, source)
+    except Exception:
+        conn.close()
+        raise
+    
+    def generate():
+        try:
+            yield from iter_export(metadata, iter_document_chunks(cursor, source, chunk_size),
+                                   compact=compact, export_format=export_format)
+        finally:
+            conn.close()
+    
+    return generate()
+
+def iter_gzip(pieces, compresslevel=6):
+    """Gzip-encode a stream of text pieces incrementally"""
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for piece in pieces:
+        data = compressor.compress(piece.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_database_to_json(db_path='project_data.db', output_path='public/data.json',
+                            compact=False, gzip_output=None, chunk_size=EXPORT_CHUNK_SIZE,
+                            export_format='json'):
     """
     Export all documents from SQLite database to JSON file
     
+    Documents are streamed from the cursor in chunks, so memory stays
+    bounded by chunk_size regardless of the table size.
+    
     Args:
         db_path: Path to SQLite database file
         output_path: Path to output JSON file
+        compact: Write without indentation/whitespace
+        gzip_output: Gzip the file (default: when output_path ends with .gz)
+        chunk_size: Number of rows fetched and written per batch
+        export_format: 'json' (one object per document) or 'columnar'
+            (column arrays with dictionary-encoded repetitive values)
     
     Returns:
         Dict with export results
@@ -41,220 +519,35 @@ def export_database_to_json(db_path='project_data.db', output_path='public/data.
     
     print(f"[INFO] Reading database: {db_path}")
     
+    if gzip_output is None:
+        gzip_output = str(output_path).endswith('.gz')
+    
     try:
         # Connect to database
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        conn = connect(db_path)
         cursor = conn.cursor()
         
-        # Check table name (could be 'documents' or 'mdi_documents')
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row['name'] for row in cursor.fetchall()]
-        
-        table_name = None
-        if 'mdi_documents' in tables:
-            table_name = 'mdi_documents'
-        elif 'documents' in tables:
-            table_name = 'documents'
-        else:
+        source = detect_export_source(cursor)
+        if source is None:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            tables = [row[0] for row in cursor.fetchall()]
             print(f"[ERROR] No documents table found. Available tables: {tables}")
             return None
         
-        print(f"[INFO] Using table: {table_name}")
-        
-        # Check database structure
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = [row['name'] for row in cursor.fetchall()]
-        print(f"[INFO] Database has {len(columns)} columns")
-        
-        # Detect database structure type
-        has_json_dates = 'plan_dates' in columns and 'actual_dates' in columns
-        has_separate_dates = 'ifi_plan_date' in columns
+        print(f"[INFO] Using table: {source['table']}")
+        print(f"[INFO] Database has {len(source['columns'])} columns")
         
-        if has_json_dates:
+        if source["has_json_dates"]:
             print("[INFO] Database structure: JSON dates (plan_dates, actual_dates as JSON strings)")
         else:
             print("[INFO] Database structure: Separate date columns (ifi_plan_date, ifr_plan_date, etc.)")
         
-        # Get all documents, sorted by stt
-        # FILTER: Only MDI documents with companyDocNo or document_no (exclude supporting files)
-        print("[INFO] Fetching MDI documents (with companyDocNo)...")
-        
-        # Check which column name exists
-        if 'document_no' in columns:
-            doc_no_col = 'document_no'
-        elif 'companyDocNo' in columns:
-            doc_no_col = 'companyDocNo'
-        else:
-            doc_no_col = None
-        
-        if doc_no_col:
-            # Filter: Only documents with document number (MDI documents from Excel)
-            cursor.execute(f"""
-                SELECT * FROM {table_name} 
-                WHERE {doc_no_col} IS NOT NULL AND {doc_no_col} != ''
-                ORDER BY stt ASC
-            """)
-        else:
-            # Fallback: Get all documents
+        if not source["doc_no_col"]:
             print("[WARNING] No document_no column found, fetching all documents")
-            cursor.execute(f"SELECT * FROM {table_name} ORDER BY stt ASC")
-        
-        rows = cursor.fetchall()
-        
-        # Convert rows to list of dictionaries with proper field mapping
-        documents = []
-        for i, row in enumerate(rows, 1):
-            raw_doc = dict(row)
-            
-            # Parse plan_dates and actual_dates
-            if has_json_dates:
-                # Parse plan_dates (JSON string → Object)
-                plan_dates = {}
-                if raw_doc.get('plan_dates'):
-                    try:
-                        plan_dates = json.loads(raw_doc['plan_dates'])
-                    except (json.JSONDecodeError, TypeError):
-                        plan_dates = {}
-                
-                # Parse actual_dates (JSON string → Object)
-                actual_dates = {}
-                if raw_doc.get('actual_dates'):
-                    try:
-                        actual_dates = json.loads(raw_doc['actual_dates'])
-                    except (json.JSONDecodeError, TypeError):
-                        actual_dates = {}
-            else:
-                # Build from separate columns
-                plan_dates = {
-                    "ifi": raw_doc.get('ifi_plan_date'),
-                    "ifr": raw_doc.get('ifr_plan_date'),
-                    "ifa": raw_doc.get('ifa_plan_date'),
-                    "ifc": raw_doc.get('ifc_plan_date'),
-                    "iff": raw_doc.get('iff_plan_date')
-                }
-                
-                actual_dates = {
-                    "ifi": raw_doc.get('ifi_actual_date'),
-                    "ifr": raw_doc.get('ifr_actual_date'),
-                    "ifa": raw_doc.get('ifa_actual_date'),
-                    "ifc": raw_doc.get('ifc_actual_date'),
-                    "iff": raw_doc.get('iff_actual_date')
-                }
-            
-            # Map database columns to frontend interface
-            # Support both new structure (document_no, status, table_name) 
-            # and old structure (companyDocNo, doc_status, table)
-            doc = {
-                # Key Identifiers
-                "id": raw_doc.get('id') or raw_doc.get('localPath') or f"doc-{i}",
-                "stt": raw_doc.get('stt') or i,
-                "documentNo": raw_doc.get('document_no') or raw_doc.get('companyDocNo') or raw_doc.get('contractorDocNo') or '',
-                "title": raw_doc.get('title') or raw_doc.get('name') or '',
-                "revision": raw_doc.get('revision') or '',
-                
-                # Classification
-                "discipline": raw_doc.get('discipline') or 'N/A',
-                "scope": raw_doc.get('scope') or '',
-                "docClass": raw_doc.get('doc_class') or '',
-                "table": raw_doc.get('table_name') or raw_doc.get('table') or '',
-                "item": raw_doc.get('item') or '',
-                
-                # Status & Progress
-                "status": raw_doc.get('status') or raw_doc.get('doc_status') or raw_doc.get('feedbackStatus') or '',
-                "ipiStatus": raw_doc.get('ipi_status') or '',
-                "reviewCode": raw_doc.get('review_code') or '',
-                
-                # Dates
-                "planDates": plan_dates,
-                "actualDates": actual_dates,
-                "targetMitigationDate": raw_doc.get('target_mitigation_date'),
-                
-                # Transmittals
-                "transNo": raw_doc.get('transNo'),
-                "dateReceived": raw_doc.get('dateReceived') or raw_doc.get('date_received'),
-                "trnOutDate": raw_doc.get('trn_out_date'),
-                "trnOutNo": raw_doc.get('trn_out_no'),
-                "trnInDate": raw_doc.get('trn_in_date'),
-                "trnInNo": raw_doc.get('trn_in_no'),
-                
-                # People (QUAN TRỌNG!)
-                "picPtsc": raw_doc.get('pic_ptsc'),
-                "picLsp": raw_doc.get('pic_lsp'),
-                
-                # System Paths
-                "localPath": raw_doc.get('localPath'),
-                "sharepointPath": raw_doc.get('sharepointPath'),
-                
-                # Computed fields (0/1 → boolean)
-                "isOverdue": bool(raw_doc.get('is_overdue', 0)),
-                "isCritical": bool(raw_doc.get('is_critical', 0))
-            }
-            
-            documents.append(doc)
-        
-        print(f"[OK] Fetched {len(documents)} MDI documents")
-        
-        # Get statistics (only for MDI documents with companyDocNo)
-        if doc_no_col:
-            cursor.execute(f"""
-                SELECT COUNT(*) as total FROM {table_name}
-                WHERE {doc_no_col} IS NOT NULL AND {doc_no_col} != ''
-            """)
-        else:
-            cursor.execute(f"SELECT COUNT(*) as total FROM {table_name}")
-        total_count = cursor.fetchone()['total']
         
-        # Build WHERE clause for MDI documents filter
-        where_clause = f"WHERE {doc_no_col} IS NOT NULL AND {doc_no_col} != ''" if doc_no_col else ""
-        
-        cursor.execute(f"""
-            SELECT COUNT(DISTINCT discipline) as count FROM {table_name} 
-            {where_clause}
-            AND discipline IS NOT NULL AND discipline != ''
-        """)
-        discipline_count = cursor.fetchone()['count']
-        
-        # Check for status column (could be 'status' or 'doc_status')
-        status_col = 'status' if 'status' in columns else 'doc_status'
-        if status_col in columns:
-            cursor.execute(f"""
-                SELECT COUNT(*) as count FROM {table_name} 
-                {where_clause}
-                AND {status_col} = 'Approved'
-            """)
-            approved_count = cursor.fetchone()['count']
-        else:
-            approved_count = 0
-        
-        # Check for is_overdue column
-        if 'is_overdue' in columns:
-            cursor.execute(f"""
-                SELECT COUNT(*) as count FROM {table_name} 
-                {where_clause}
-                AND is_overdue = 1
-            """)
-            overdue_count = cursor.fetchone()['count']
-        else:
-            overdue_count = 0
-        
-        # Create output structure with metadata
-        now = datetime.now()
-        output_data = {
-            "metadata": {
-                "exportDate": now.isoformat(),
-                "totalDocuments": total_count,
-                "lastUpdate": now.strftime('%Y-%m-%d %H:%M:%S'),
-                "version": "1.0.0",
-                "statistics": {
-                    "total": total_count,
-                    "approved": approved_count,
-                    "overdue": overdue_count,
-                    "disciplines": discipline_count
-                }
-            },
-            "documents": documents
-        }
+        # Metadata goes at the head of the file, so compute statistics first
+        metadata = build_export_metadata(cursor, source)
+        statistics = metadata["statistics"]
         
         # Create public directory if not exists
         output_dir = Path(output_path).parent
@@ -262,10 +555,30 @@ def export_database_to_json(db_path='project_data.db', output_path='public/data.
             output_dir.mkdir(parents=True, exist_ok=True)
             print(f"[INFO] Created directory: {output_dir}")
         
-        # Write to JSON file
+        # Stream documents to the JSON file
+        print("[INFO] Fetching MDI documents (with companyDocNo)...")
         print(f"\n[INFO] Writing to: {output_path}")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        
+        sample = None
+        exported_count = 0
+        
+        def tracked_chunks():
+            nonlocal sample, exported_count
+            for chunk in iter_document_chunks(cursor, source, chunk_size):
+                if sample is None:
+                    sample = chunk[0]
+                exported_count += len(chunk)
+                yield chunk
+        
+        if gzip_output:
+            output_file = gzip.open(output_path, 'wt', encoding='utf-8')
+        else:
+            output_file = open(output_path, 'w', encoding='utf-8')
+        with output_file as f:
+            for piece in iter_export(metadata, tracked_chunks(), compact=compact, export_format=export_format):
+                f.write(piece)
+        
+        print(f"[OK] Fetched {exported_count} MDI documents")
         
         # Get file size
         file_size = os.path.getsize(output_path)
@@ -275,16 +588,15 @@ def export_database_to_json(db_path='project_data.db', output_path='public/data.
         print(f"\nEXPORT SUMMARY:")
         print(f"   File: {output_path}")
         print(f"   Size: {file_size_mb:.2f} MB")
-        print(f"   Documents: {total_count}")
-        print(f"   Approved: {approved_count}")
-        print(f"   Overdue: {overdue_count}")
-        print(f"   Disciplines: {discipline_count}")
-        print(f"   Export Date: {now.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"   Documents: {statistics['total']}")
+        print(f"   Approved: {statistics['approved']}")
+        print(f"   Overdue: {statistics['overdue']}")
+        print(f"   Disciplines: {statistics['disciplines']}")
+        print(f"   Export Date: {metadata['lastUpdate']}")
         
         # Show sample data
-        if documents:
+        if sample:
             print(f"\nSAMPLE DATA (first document):")
-            sample = documents[0]
             print(f"   ID: {sample.get('id')}")
             print(f"   STT: {sample.get('stt')}")
             print(f"   Doc No: {sample.get('documentNo')}")
@@ -313,7 +625,7 @@ def export_database_to_json(db_path='project_data.db', output_path='public/data.
             "success": True,
             "file": output_path,
             "size": file_size,
-            "count": total_count
+            "count": statistics['total']
         }
         
     except sqlite3.Error as e:
@@ -333,17 +645,31 @@ def main():
     db_path = 'project_data.db'
     output_path = 'public/data.json'
     
+    # Options: --compact (no indentation), --gzip (also implied by a .gz output path),
+    # --format=json|columnar
+    options = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    
     # Allow custom paths from command line
-    if len(sys.argv) > 1:
-        db_path = sys.argv[1]
-    if len(sys.argv) > 2:
-        output_path = sys.argv[2]
+    if len(args) > 0:
+        db_path = args[0]
+    if len(args) > 1:
+        output_path = args[1]
+    
+    compact = '--compact' in options
+    gzip_output = True if '--gzip' in options else None
+    export_format = next((opt.split('=', 1)[1] for opt in options if opt.startswith('--format=')), 'json')
+    if export_format not in EXPORT_FORMATS:
+        print(f"[ERROR] Unsupported format: {export_format} (choose from {', '.join(EXPORT_FORMATS)})")
+        sys.exit(1)
     
     print(f"\nArguments:")
     print(f"  Database: {db_path}")
     print(f"  Output: {output_path}")
+    print(f"  Format: {export_format}")
     
-    result = export_database_to_json(db_path, output_path)
+    result = export_database_to_json(db_path, output_path, compact=compact, gzip_output=gzip_output,
+                                     export_format=export_format)
     
     if result:
         sys.exit(0)
@@ -0,0 +1,119 @@
+"""
+Feedback Matcher
+Matches feedback filenames to documents through indexes instead of testing
+every filename against every document name
+"""
+
+import re
+from collections import defaultdict
+
+# Doc-number-like tokens: 3+ alphanumeric segments joined by '-' or '_',
+# containing at least one digit (LSPET-TCPT-T-ZZ-0009, TF1-2-PI_001, ...)
+DOC_NO_PATTERN = re.compile(r'[A-Z0-9]+(?:[-_][A-Z0-9]+){2,}')
+MIN_TOKEN_SEGMENTS = 3
+NGRAM = 3
+
+def doc_number_tokens(text):
+    """Normalized doc-number tokens in text (uppercase, '_' read as '-')"""
+    tokens = []
+    for match in DOC_NO_PATTERN.findall(text.upper().replace('_', '-')):
+        if any(ch.isdigit() for ch in match):
+            tokens.append(match)
+    return tokens
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+class FeedbackMatcher:
+    """
+    Deterministic best-match lookup of a feedback filename among documents
+
+    1. Doc-number tokens of the filename (and their shorter prefixes, so
+       LSPET-TCPT-PI-0001-REV-B still finds LSPET-TCPT-PI-0001) are looked
+       up exactly against tokens of each document's name and doc numbers.
+    2. Otherwise the original rule applies (filename contained in the
+       document name or the other way round), answered from a trigram index
+       and a name lookup of the filename's substrings.
+
+    Ties go to the closest name (length ratio), then to the earliest document.
+    """
+
+    def __init__(self, documents):
+        # Same de-duplication as before: the last document with a name wins
+        by_name = {}
+        for doc in documents:
+            name = doc.get('name') or ''
+            if name:
+                by_name[name] = doc
+        self.names = list(by_name)
+        self.documents = list(by_name.values())
+        self.name_index = {name: position for position, name in enumerate(self.names)}
+
+        self.token_index = defaultdict(set)
+        self.ngram_index = defaultdict(set)
+        for position, (name, doc) in enumerate(zip(self.names, self.documents)):
+            fields = [name, doc.get('companyDocNo') or '', doc.get('contractorDocNo') or '']
+            for field in fields:
+                for token in doc_number_tokens(field):
+                    self.token_index[token].add(position)
+            for gram in _ngrams(name):
+                self.ngram_index[gram].add(position)
+
+    def _closeness(self, position, feedback_name):
+        name = self.names[position]
+        if feedback_name in name or name in feedback_name:
+            return min(len(name), len(feedback_name)) / max(len(name), len(feedback_name))
+        return 0.0
+
+    def _token_candidates(self, feedback_name):
+        """Position -> summed length of the doc-number tokens it shares"""
+        scores = defaultdict(int)
+        for token in doc_number_tokens(feedback_name):
+            segments = token.split('-')
+            # Longest matching prefix of each token only
+            for end in range(len(segments), MIN_TOKEN_SEGMENTS - 1, -1):
+                prefix = '-'.join(segments[:end])
+                positions = self.token_index.get(prefix)
+                if positions:
+                    for position in positions:
+                        scores[position] += len(prefix)
+                    break
+        return scores
+
+    def _substring_candidates(self, feedback_name):
+        """Positions whose name contains feedback_name or is contained in it"""
+        candidates = set()
+
+        # Names contained in the filename: look up each of its substrings
+        length = len(feedback_name)
+        for start in range(length):
+            for end in range(start + 1, length + 1):
+                position = self.name_index.get(feedback_name[start:end])
+                if position is not None:
+                    candidates.add(position)
+
+        # Names containing the filename: intersect trigram postings, then verify
+        grams = _ngrams(feedback_name)
+        if grams:
+            postings = sorted((self.ngram_index.get(gram, set()) for gram in grams), key=len)
+            possible = set(postings[0]).intersection(*postings[1:])
+        else:
+            possible = range(len(self.names))
+        candidates.update(position for position in possible if feedback_name in self.names[position])
+        return candidates
+
+    def match(self, feedback_name):
+        """Best matching document for a filename (without extension), or None"""
+        if not feedback_name:
+            return None
+        scores = self._token_candidates(feedback_name)
+        if scores:
+            best = min(scores, key=lambda position: (
+                -scores[position], -self._closeness(position, feedback_name), position))
+            return self.documents[best]
+
+        candidates = self._substring_candidates(feedback_name)
+        if not candidates:
+            return None
+        best = min(candidates, key=lambda position: (-self._closeness(position, feedback_name), position))
+        return self.documents[best]
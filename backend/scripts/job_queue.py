@@ -0,0 +1,143 @@
+"""
+Background Job Queue
+Runs long tasks (Excel imports) on a local thread pool; job state and
+progress are persisted in SQLite so any worker can answer status polls
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from db_connection import get_connection
+
+def _process_alive(pid):
+    """Whether the process that owns a job is still running"""
+    if pid == os.getpid() or sys.platform == 'win32':
+        # os.kill(pid, 0) would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def ensure_jobs_table(conn):
+    """Create the jobs table if missing"""
+    with conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            owner_pid INTEGER NOT NULL,
+            processed INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        )''')
+
+class JobQueue:
+    """
+    Thread-pool job runner with SQLite-backed status
+
+    Jobs receive a progress(processed, total, message=None) callback as their
+    last argument and return a JSON-serializable result. Keep jobs_db_path
+    separate from the documents database: an import holds its write lock for
+    the whole transaction and progress updates must not wait for it.
+    """
+
+    def __init__(self, jobs_db_path, workers=1):
+        self.jobs_db_path = jobs_db_path
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        conn = get_connection(jobs_db_path)
+        ensure_jobs_table(conn)
+        # Jobs do not survive their process; fail those whose worker has exited
+        unfinished = conn.execute(
+            "SELECT id, owner_pid FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+        for job_id, owner_pid in unfinished:
+            if not _process_alive(owner_pid):
+                self._update(job_id, status='failed', error='Interrupted by server restart',
+                             finished_at=time.time())
+
+    def _update(self, job_id, **fields):
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        conn = get_connection(self.jobs_db_path)
+        with conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", list(fields.values()) + [job_id])
+
+    def submit(self, kind, func, *args):
+        """
+        Queue func(*args, progress) to run in the background
+
+        Returns:
+            The new job id
+        """
+        job_id = uuid.uuid4().hex
+        conn = get_connection(self.jobs_db_path)
+        with conn:
+            conn.execute('INSERT INTO jobs (id, kind, status, owner_pid, created_at) VALUES (?, ?, ?, ?, ?)',
+                         (job_id, kind, 'queued', os.getpid(), time.time()))
+        self._executor.submit(self._run, job_id, func, args)
+        return job_id
+
+    def _run(self, job_id, func, args):
+        def progress(processed, total, message=None):
+            fields = {'processed': processed, 'total': total}
+            if message:
+                fields['message'] = message
+            self._update(job_id, **fields)
+
+        self._update(job_id, status='running', started_at=time.time())
+        try:
+            result = func(*args, progress)
+        except Exception as e:
+            print(traceback.format_exc(), file=sys.stderr)
+            self._update(job_id, status='failed', error=str(e), finished_at=time.time())
+            return
+        self._update(job_id, status='succeeded', result=json.dumps(result, ensure_ascii=False),
+                     finished_at=time.time())
+
+    def get(self, job_id):
+        """
+        Current state of a job
+
+        Returns:
+            Dict with id, kind, status, progress, result and error, or None
+            for an unknown id
+        """
+        cursor = get_connection(self.jobs_db_path).cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'progress': {
+                'processed': row['processed'],
+                'total': row['total'],
+                'message': row['message']
+            },
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'createdAt': row['created_at'],
+            'startedAt': row['started_at'],
+            'finishedAt': row['finished_at']
+        }
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs; by default wait for queued ones to finish"""
+        self._executor.shutdown(wait=wait)
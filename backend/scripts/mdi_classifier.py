@@ -0,0 +1,69 @@
+"""
+MDI Prefix Classifier
+Longest-prefix lookup of document names against the mdi_mapping.json keys
+"""
+
+import json
+import os
+import sys
+
+# mdi_mapping.json next to the scripts, as doc_processor loads it
+MAPPING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mdi_mapping.json')
+
+# Marks a node that ends a mapping key; never collides with a single character
+_KEY_END = ''
+
+class MDIClassifier:
+    """
+    Character trie over the MDI mapping keys.
+
+    Built once per mapping; a lookup walks at most len(name) nodes, so the
+    per-document cost does not depend on how many keys the mapping has.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping or {}
+        self._root = {}
+        for key in self.mapping:
+            node = self._root
+            for char in key:
+                node = node.setdefault(char, {})
+            node[_KEY_END] = key
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def longest_prefix(self, name):
+        """Returns the longest mapping key that name starts with, or None"""
+        node = self._root
+        found = node.get(_KEY_END)
+        for char in name:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_KEY_END, found)
+        return found
+
+    def classify(self, name, default=None):
+        """Returns the mapping value of the longest matching key"""
+        key = self.longest_prefix(name)
+        if key is None:
+            return default
+        return self.mapping.get(key, default)
+
+    def doc_class(self, name, default=None):
+        """Returns the document class scan_documents assigns name (first entry of the mapping value)"""
+        value = self.classify(name)
+        if value and value != "N/A":
+            return value[0]
+        return default
+
+    @classmethod
+    def from_file(cls, mapping_file_path):
+        """Loads mdi_mapping.json; an unreadable file gives an empty classifier"""
+        try:
+            with open(mapping_file_path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except Exception as e:
+            print(f"Error loading MDI mapping: {e}", file=sys.stderr)
+            return cls({})
@@ -0,0 +1,333 @@
+"""
+MDI Column Schema
+The one definition of the MDI_DetailStatus columns, shared by the importer
+and the cleaner: header matching, column names and typed converters
+"""
+
+from collections import namedtuple
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import load_workbook
+
+SHEET_NAME = 'MDI_DetailStatus'
+
+# Header row of MDI_DetailStatus (1-based); the rows above are summary lines
+HEADER_ROW = 4
+
+# field: importer name; header: Excel header (whitespace-normalized);
+# db_column: documents column; clean_name: column in the _CLEAN workbook;
+# kind: 'string' or 'date', selects the converter
+MdiColumn = namedtuple('MdiColumn', ['field', 'header', 'db_column', 'clean_name', 'kind'])
+
+MDI_COLUMNS = [
+    MdiColumn('scope', 'Scope', 'scope', 'scope', 'string'),
+    MdiColumn('table', 'Table', 'table', 'table', 'string'),
+    MdiColumn('item', 'Item', 'item', 'item', 'string'),
+    MdiColumn('org', 'Org.', 'discipline', 'discipline', 'string'),
+    MdiColumn('company_doc_no', 'CompanyDoc.No.', 'companyDocNo', 'companyDocNo', 'string'),
+    MdiColumn('contractor_doc_no', 'ContractorDoc.No.', 'contractorDocNo', 'ContractorDoc.No.', 'string'),
+    MdiColumn('doc_name', 'DocumentName', 'name', 'name', 'string'),
+    MdiColumn('doc_class', 'Class', 'doc_class', 'doc_class', 'string'),
+    MdiColumn('revision', 'Rev', 'revision', 'revision', 'string'),
+    MdiColumn('ipi_status', 'IPI', 'ipi_status', 'ipi_status', 'string'),
+    MdiColumn('trn_out_no', 'TRNOutNo.', 'trn_out_no', 'trn_out_no', 'string'),
+    MdiColumn('trn_in_no', 'TRNInNo.', 'trn_in_no', 'trn_in_no', 'string'),
+    MdiColumn('review_code', 'Code', 'review_code', 'review_code', 'string'),
+    MdiColumn('pic_ptsc', 'PIC PTSC', 'pic_ptsc', 'pic_ptsc', 'string'),
+    MdiColumn('pic_lsp', 'PIC LSP', 'pic_lsp', 'pic_lsp', 'string'),
+    MdiColumn('doc_status', 'Status', 'doc_status', 'doc_status', 'string'),
+    MdiColumn('trn_out_date', 'DateTRNOut', 'trn_out_date', 'trn_out_date', 'date'),
+    MdiColumn('date_receive_trn_out', 'DateReciveTRNOut', 'date_receive_trn_out', 'dateReceived', 'date'),
+    MdiColumn('trn_in_date', 'DateTRNIn', 'trn_in_date', 'trn_in_date', 'date'),
+    MdiColumn('ifi_plan', 'IFI Plan Date', 'ifi_plan_date', 'ifi_plan_date', 'date'),
+    MdiColumn('ifr_plan', 'IFR Plan Date', 'ifr_plan_date', 'ifr_plan_date', 'date'),
+    MdiColumn('ifa_plan', 'IFA Plan Date', 'ifa_plan_date', 'ifa_plan_date', 'date'),
+    MdiColumn('ifc_plan', 'IFC Plan Date', 'ifc_plan_date', 'ifc_plan_date', 'date'),
+    MdiColumn('iff_plan', 'IFF/ASB Plan Date', 'iff_plan_date', 'iff_plan_date', 'date'),
+    MdiColumn('ifi_actual', 'IFI Actual Date', 'ifi_actual_date', 'ifi_actual_date', 'date'),
+    MdiColumn('ifr_actual', 'IFR Actual Date', 'ifr_actual_date', 'ifr_actual_date', 'date'),
+    MdiColumn('ifa_actual', 'IFA Actual Date', 'ifa_actual_date', 'ifa_actual_date', 'date'),
+    MdiColumn('ifc_actual', 'IFC Actual Date', 'ifc_actual_date', 'ifc_actual_date', 'date'),
+    MdiColumn('iff_actual', 'IFF/ASB Actual Date', 'iff_actual_date', 'iff_actual_date', 'date'),
+    MdiColumn('target_date', 'Target Mitigation Date', 'target_mitigation_date', 'target_mitigation_date', 'date'),
+]
+
+COLUMNS_BY_FIELD = {col.field: col for col in MDI_COLUMNS}
+
+# Cell strings pd.read_excel reads as NaN by default; applied by the streaming
+# reader so both readers produce the same frame
+NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+def normalize_header(value):
+    """'IFI\\nPlan  Date ' -> 'IFI Plan Date': newlines and runs of whitespace become one space"""
+    return ' '.join(str(value).split())
+
+FIELDS_BY_HEADER = {normalize_header(col.header): col.field for col in MDI_COLUMNS}
+
+def resolve_headers(header_values, all_columns=False):
+    """
+    Column names and positions for one header row, resolved once per sheet
+
+    Args:
+        header_values: Cell values of the header row
+        all_columns: Also keep columns outside the schema, named by their
+            normalized header (duplicates get '.1', '.2', ... and blank
+            headers 'Unnamed: <index>', as pd.read_excel names them)
+
+    Returns:
+        List of (name, column index) in sheet order; schema columns are
+        named by field, the first occurrence of a header wins
+    """
+    resolved = []
+    seen = set()
+    for index, value in enumerate(header_values):
+        header = normalize_header(value) if value is not None else ''
+        field = FIELDS_BY_HEADER.get(header)
+        if field is not None and field not in seen:
+            name = field
+            # A repeat of this header is then 'Scope.1', as pandas names it
+            seen.add(header)
+        elif not all_columns:
+            continue
+        elif not header:
+            name = f'Unnamed: {index}'
+        else:
+            name, suffix = header, 0
+            while name in seen:
+                suffix += 1
+                name = f'{header}.{suffix}'
+        seen.add(name)
+        resolved.append((name, index))
+    return resolved
+
+def _cell_value(value):
+    """Same cell conversion as pandas' openpyxl reader"""
+    if isinstance(value, str):
+        return None if value in NA_STRINGS else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def iter_mdi_rows(excel_path, sheet_name=SHEET_NAME, all_columns=False, header_row=HEADER_ROW):
+    """
+    Stream one sheet with openpyxl read-only mode, keeping only the needed columns
+
+    Args:
+        excel_path: Path to the workbook
+        sheet_name: Sheet to read; other sheets are never parsed
+        all_columns: Keep every column, not just the schema ones (see resolve_headers)
+        header_row: 1-based row holding the column headers
+
+    Returns:
+        (names, rows) where rows is a generator of value tuples in names
+        order; schema columns missing from the sheet are simply not returned
+    """
+    workbook = load_workbook(excel_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = workbook[sheet_name].iter_rows(min_row=header_row, values_only=True)
+        resolved = resolve_headers(next(rows, ()), all_columns)
+    except BaseException:
+        workbook.close()
+        raise
+    names = [name for name, _ in resolved]
+    indexes = [index for _, index in resolved]
+
+    def generate():
+        # Blank rows are kept unless they trail the data, as pd.read_excel does
+        blank = tuple(None for _ in indexes)
+        pending_blanks = 0
+        try:
+            for row in rows:
+                if all(value is None or value == '' for value in row):
+                    pending_blanks += 1
+                    continue
+                for _ in range(pending_blanks):
+                    yield blank
+                pending_blanks = 0
+                width = len(row)
+                yield tuple(_cell_value(row[i]) if i < width else None for i in indexes)
+        finally:
+            workbook.close()
+
+    return names, generate()
+
+def read_mdi_sheet(excel_path, sheet_name=SHEET_NAME, all_columns=False):
+    """
+    DataFrame of the MDI columns (named by field), built from the streaming reader
+
+    Only parsing is faster: the rows are still collected into one list before
+    the frame is built, so peak memory is the whole sheet's kept columns plus
+    the frame. Building it in chunks would let each chunk infer its own dtypes
+    (an int column turning float or object part way), which breaks parity
+    with pd.read_excel in the converters.
+    """
+    names, rows = iter_mdi_rows(excel_path, sheet_name, all_columns)
+    return pd.DataFrame.from_records(list(rows), columns=names)
+
+# ===== CONVERTERS: a whole column at a time =====
+
+def to_string(col):
+    """Vectorized equivalent of str(value).strip(), NaN -> None"""
+    return col.astype(object).astype(str).str.strip().where(col.notna(), None)
+
+def to_date_text(col):
+    """Dates as text: datetimes formatted YYYY-MM-DD, anything else kept as str(value), NaN -> None"""
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col.dt.strftime('%Y-%m-%d').astype(object).where(col.notna(), None)
+
+    values = col.astype(object)
+    result = values.astype(str).where(col.notna(), None)
+    is_datetime = values.map(lambda v: isinstance(v, datetime))
+    if is_datetime.any():
+        formatted = pd.to_datetime(values[is_datetime], errors='coerce').dt.strftime('%Y-%m-%d')
+        result[is_datetime] = formatted.astype(object).where(formatted.notna(), None)
+    return result
+
+# Converters the importer applies per column kind
+CONVERTERS = {
+    'string': to_string,
+    'date': to_date_text,
+}
+
+def convert_excel_date(value):
+    """
+    Convert Excel serial date to string format YYYY-MM-DD
+
+    Excel lưu dates dưới dạng số (serial date):
+    - 1 = 1900-01-01
+    - 45835 = 2025-06-15
+
+    Args:
+        value: Excel cell value (có thể là số, string, hoặc datetime)
+
+    Returns:
+        String YYYY-MM-DD hoặc None nếu không phải date
+    """
+    # Handle NaN, None, empty
+    if pd.isna(value) or value == '' or value == 'N/A':
+        return None
+
+    # Nếu đã là datetime object
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.strftime('%Y-%m-%d')
+
+    # Nếu là string, kiểm tra có phải date format không
+    if isinstance(value, str):
+        try:
+            # Thử parse string date
+            dt = pd.to_datetime(value, errors='coerce')
+            if pd.notna(dt):
+                return dt.strftime('%Y-%m-%d')
+            return None
+        except:
+            return None
+
+    # Nếu là số (Excel serial date)
+    if isinstance(value, (int, float)):
+        # Excel serial dates thường từ 1 đến ~50000 (years 1900-2136)
+        if 1 <= value <= 60000:
+            try:
+                # Convert Excel serial date to datetime
+                # Excel epoch là 1899-12-30 (không phải 1900-01-01 do Excel bug)
+                dt = pd.to_datetime(value, origin='1899-12-30', unit='D')
+                return dt.strftime('%Y-%m-%d')
+            except:
+                return None
+
+    return None
+
+# Excel serial dates thường từ 1 đến ~50000 (years 1900-2136)
+SERIAL_DATE_MIN = 1
+SERIAL_DATE_MAX = 60000
+
+def convert_date_column(series):
+    """
+    Vectorized convert_excel_date over a whole column, same output
+
+    Cells are split by type into datetime, serial-number and string masks;
+    datetimes and serials are converted with one pd.to_datetime call each.
+    Strings are parsed once per distinct value with convert_excel_date,
+    because pd.to_datetime on an array infers one format for all of them.
+
+    Returns:
+        (converted object Series of 'YYYY-MM-DD' / None, number of serial dates)
+    """
+    values = series.astype(object)
+    result = pd.Series([None] * len(values), index=values.index, dtype=object)
+
+    missing = values.isna() | values.isin(['', 'N/A'])
+    types = values.map(type)
+    unique_types = set(types.unique())
+    is_datetime = types.isin([t for t in unique_types if issubclass(t, datetime)]) & ~missing
+    is_string = types.isin([t for t in unique_types if issubclass(t, str)]) & ~missing
+    is_number = types.isin([t for t in unique_types if issubclass(t, (int, float))]) & ~missing
+
+    if is_number.any():
+        numbers = values[is_number].astype(float)
+        in_range = (numbers >= SERIAL_DATE_MIN) & (numbers <= SERIAL_DATE_MAX)
+        serials = numbers[in_range]
+        if len(serials):
+            # Excel epoch là 1899-12-30 (không phải 1900-01-01 do Excel bug)
+            converted = pd.to_datetime(serials, origin='1899-12-30', unit='D')
+            result[serials.index] = converted.dt.strftime('%Y-%m-%d').astype(object)
+        serial_count = len(serials)
+    else:
+        serial_count = 0
+
+    if is_datetime.any():
+        datetimes = values[is_datetime]
+        try:
+            result[datetimes.index] = pd.to_datetime(datetimes).dt.strftime('%Y-%m-%d').astype(object)
+        except (ValueError, OverflowError, TypeError):
+            # Out of the Timestamp range or mixed time zones: format one by one
+            result[datetimes.index] = datetimes.map(lambda value: value.strftime('%Y-%m-%d'))
+
+    if is_string.any():
+        strings = values[is_string]
+        parsed = {value: convert_excel_date(value) for value in strings.unique()}
+        result[strings.index] = strings.map(parsed)
+
+    return result, serial_count
+
+# ===== CLEANING: the cleaner's transforms, shared with the import pipeline =====
+
+# Columns outside the schema are formatted as dates when their name contains one of these
+DATE_KEYWORDS = [
+    'date', 'plan', 'actual', 'ifi', 'ifr', 'ifa', 'ifc', 'iff',
+    'trn', 'received', 'mitigation'
+]
+
+def find_date_columns(columns):
+    """Columns the cleaner formats as dates: schema columns by kind, others by name"""
+    date_columns = []
+    for col in columns:
+        schema_col = COLUMNS_BY_FIELD.get(col)
+        if schema_col is not None:
+            if schema_col.kind == 'date':
+                date_columns.append(col)
+        elif any(keyword in str(col).lower() for keyword in DATE_KEYWORDS):
+            date_columns.append(col)
+    return date_columns
+
+def clean_dates(df):
+    """Format every date column of a field-keyed frame in place; returns {column: serial dates converted}"""
+    counts = {}
+    for col in find_date_columns(df.columns):
+        df[col], counts[col] = convert_date_column(df[col])
+    return counts
+
+def to_clean_layout(df):
+    """A cleaned frame as the _CLEAN workbook lays it out: frontend column names, stt first"""
+    df = df.rename(columns={field: col.clean_name for field, col in COLUMNS_BY_FIELD.items()})
+    if 'stt' not in df.columns:
+        df.insert(0, 'stt', range(1, len(df) + 1))
+    return df
+
+def write_clean_workbook(df, output_file):
+    """Write a frame in clean layout as the MDI_DetailStatus sheet of output_file"""
+    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name=SHEET_NAME, index=False)
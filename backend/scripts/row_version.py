@@ -0,0 +1,123 @@
+"""
+Document Row Versions
+Every insert/update of a documents row stamps it with the next value of a
+global sequence and every delete leaves a tombstone, so clients can fetch
+only what changed since the version they already hold
+"""
+
+import sqlite3
+
+from db_connection import get_connection
+from export_db_to_json_v2 import map_document
+
+# Only MDI documents (with companyDocNo), same as the JSON export
+MDI_FILTER = "companyDocNo IS NOT NULL AND companyDocNo != ''"
+
+NEXT_VERSION_SQL = '''
+    UPDATE row_version_seq SET value = value + 1 WHERE id = 1;
+    UPDATE documents SET row_version = (SELECT value FROM row_version_seq WHERE id = 1) WHERE rowid = NEW.rowid;'''
+
+def ensure_row_versions(conn):
+    """Add documents.row_version, its sequence, tombstones and triggers if missing"""
+    cursor = conn.cursor()
+    if row_versions_ready(cursor):
+        return
+
+    cursor.execute("PRAGMA table_info(documents)")
+    if 'row_version' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE documents ADD COLUMN row_version INTEGER")
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS row_version_seq (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        value INTEGER NOT NULL
+    )''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS document_tombstones (
+        localPath TEXT PRIMARY KEY,
+        row_version INTEGER NOT NULL
+    )''')
+
+    # Existing rows all start at version 1
+    cursor.execute("INSERT OR IGNORE INTO row_version_seq (id, value) VALUES (1, 1)")
+    cursor.execute("UPDATE documents SET row_version = 1 WHERE row_version IS NULL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_row_version ON documents(row_version)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tombstone_version ON document_tombstones(row_version)")
+
+    cursor.execute(f"CREATE TRIGGER trg_row_version_insert AFTER INSERT ON documents BEGIN {NEXT_VERSION_SQL} END")
+    # Only fires for writes that did not set row_version, i.e. not for its own stamp
+    cursor.execute(f'''
+        CREATE TRIGGER trg_row_version_update AFTER UPDATE ON documents
+        WHEN NEW.row_version IS OLD.row_version
+        BEGIN {NEXT_VERSION_SQL} END''')
+    cursor.execute('''
+        CREATE TRIGGER trg_row_version_delete AFTER DELETE ON documents BEGIN
+            UPDATE row_version_seq SET value = value + 1 WHERE id = 1;
+            INSERT OR REPLACE INTO document_tombstones (localPath, row_version)
+            VALUES (OLD.localPath, (SELECT value FROM row_version_seq WHERE id = 1));
+        END''')
+    conn.commit()
+
+def row_versions_ready(cursor):
+    """Whether the row_version triggers are installed (see ensure_row_versions)"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_row_version_insert'")
+    return cursor.fetchone() is not None
+
+def current_row_version(cursor):
+    """Latest row version handed out, 0 if row versions are not set up"""
+    try:
+        cursor.execute("SELECT value FROM row_version_seq WHERE id = 1")
+    except sqlite3.OperationalError:
+        return 0
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+def query_delta(db_path, since=0):
+    """
+    MDI documents inserted, updated or deleted after a row version
+
+    Args:
+        db_path: Path to SQLite database file
+        since: rowVersion the client already holds (0 for everything)
+
+    Returns:
+        Dict with version (pass back as since next time), upserted documents,
+        deleted document ids and reset (True when since is ahead of the
+        database, e.g. after a rebuild, or the database has no row versions
+        yet: the client must reload in full)
+
+    Read-only: row versions are installed by init_db, scans, imports and
+    the migration, never by this request.
+    """
+    since = int(since)
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+
+    version = current_row_version(cursor)
+    if since > version or not row_versions_ready(cursor):
+        return {"version": version, "reset": True, "upserted": [], "deleted": []}
+
+    cursor.execute(f'''
+        SELECT rowid AS _rowid, * FROM documents
+        WHERE row_version > ? AND row_version <= ? AND {MDI_FILTER}
+        ORDER BY row_version
+    ''', (since, version))
+    upserted = [map_document(dict(row), row['_rowid']) for row in cursor.fetchall()]
+
+    # Rows deleted for good, plus rows that stopped being MDI documents
+    cursor.execute(f'''
+        SELECT t.localPath FROM document_tombstones t
+        WHERE t.row_version > ? AND t.row_version <= ?
+          AND NOT EXISTS (SELECT 1 FROM documents d WHERE d.localPath = t.localPath AND {MDI_FILTER})
+        UNION
+        SELECT localPath FROM documents
+        WHERE row_version > ? AND row_version <= ? AND NOT ({MDI_FILTER})
+    ''', (since, version, since, version))
+    deleted = [row[0] for row in cursor.fetchall()]
+
+    return {
+        "version": version,
+        "reset": False,
+        "upserted": upserted,
+        "deleted": deleted
+    }
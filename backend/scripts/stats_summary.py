@@ -0,0 +1,206 @@
+"""
+Materialized Document Statistics
+Per-dimension document counts kept in step with the documents table by
+triggers, so reading statistics costs O(#groups) instead of a table scan
+"""
+
+import sys
+import json
+from collections import Counter
+
+from db_connection import connect
+
+# Dimension name -> group key expression; {row} is NEW/OLD in triggers and
+# the table name in rebuild/check queries. Keys are stored as JSON arrays so
+# NULLs and value types survive the round-trip.
+DIMENSIONS = {
+    'discipline': 'json_array({row}.discipline)',
+    'scope': 'json_array({row}.scope)',
+    'ipi_status': 'json_array({row}.ipi_status)',
+    'review_code': 'json_array({row}.review_code)',
+    'table_status': 'json_array({row}."table", {row}.doc_status)',
+    'flags': "json_array({row}.trn_out_date IS NOT NULL, {row}.trn_in_date IS NOT NULL, "
+             "{row}.feedbackStatus IS NULL OR {row}.feedbackStatus = '')",
+}
+
+# Only maintained when the documents table has an is_overdue column
+OVERDUE_DIMENSION = ('overdue', 'json_array({row}.is_overdue = 1)')
+
+# Columns whose updates can move a row between groups of each dimension
+DIMENSION_COLUMNS = {
+    'discipline': 'discipline',
+    'scope': 'scope',
+    'ipi_status': 'ipi_status',
+    'review_code': 'review_code',
+    'table_status': '"table", doc_status',
+    'flags': 'trn_out_date, trn_in_date, feedbackStatus',
+    'overdue': 'is_overdue',
+}
+
+def get_dimensions(cursor):
+    """Dimensions that apply to this database's documents table"""
+    cursor.execute("PRAGMA table_info(documents)")
+    columns = {row[1] for row in cursor.fetchall()}
+    dimensions = dict(DIMENSIONS)
+    if 'is_overdue' in columns:
+        dimensions[OVERDUE_DIMENSION[0]] = OVERDUE_DIMENSION[1]
+    return dimensions
+
+def _increment_sql(dimension, key_expr):
+    return f'''
+        INSERT INTO document_stats (dimension, group_key, count) VALUES ('{dimension}', {key_expr}, 1)
+        ON CONFLICT(dimension, group_key) DO UPDATE SET count = count + 1;'''
+
+def _decrement_sql(dimension, key_expr):
+    return f'''
+        UPDATE document_stats SET count = count - 1 WHERE dimension = '{dimension}' AND group_key = {key_expr};
+        DELETE FROM document_stats WHERE dimension = '{dimension}' AND group_key = {key_expr} AND count <= 0;'''
+
+def create_triggers(cursor, dimensions):
+    """(Re)create the triggers that keep document_stats in step with documents"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_document_stats_%'")
+    for (trigger_name,) in cursor.fetchall():
+        cursor.execute(f"DROP TRIGGER {trigger_name}")
+
+    insert_body = ''.join(_increment_sql(name, expr.format(row='NEW')) for name, expr in dimensions.items())
+    delete_body = ''.join(_decrement_sql(name, expr.format(row='OLD')) for name, expr in dimensions.items())
+    cursor.execute(f"CREATE TRIGGER trg_document_stats_insert AFTER INSERT ON documents BEGIN {insert_body} END")
+    cursor.execute(f"CREATE TRIGGER trg_document_stats_delete AFTER DELETE ON documents BEGIN {delete_body} END")
+
+    # One update trigger per dimension, only firing when the row changes group
+    for name, expr in dimensions.items():
+        old_key, new_key = expr.format(row='OLD'), expr.format(row='NEW')
+        cursor.execute(f'''
+            CREATE TRIGGER trg_document_stats_update_{name}
+            AFTER UPDATE OF {DIMENSION_COLUMNS[name]} ON documents
+            WHEN {old_key} IS NOT {new_key}
+            BEGIN {_decrement_sql(name, old_key)}{_increment_sql(name, new_key)} END''')
+
+def live_counts(cursor, dimension_expr):
+    """Group counts for one dimension computed from the documents table"""
+    cursor.execute(f"SELECT {dimension_expr.format(row='documents')} AS group_key, COUNT(*) FROM documents GROUP BY group_key")
+    return dict(cursor.fetchall())
+
+def rebuild_stats_summary(conn):
+    """
+    Recompute document_stats from scratch and reinstall its triggers
+
+    Returns:
+        Number of groups written
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS document_stats (
+        dimension TEXT NOT NULL,
+        group_key TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (dimension, group_key)
+    )''')
+    dimensions = get_dimensions(cursor)
+    cursor.execute("DELETE FROM document_stats")
+    groups = 0
+    for name, expr in dimensions.items():
+        counts = live_counts(cursor, expr)
+        cursor.executemany(
+            'INSERT INTO document_stats (dimension, group_key, count) VALUES (?, ?, ?)',
+            [(name, key, count) for key, count in counts.items()]
+        )
+        groups += len(counts)
+    create_triggers(cursor, dimensions)
+    conn.commit()
+    return groups
+
+def summary_ready(cursor):
+    """Whether document_stats is built with triggers for exactly the dimensions that apply"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_document_stats_%'")
+    installed = {row[0] for row in cursor.fetchall()}
+    expected = {'trg_document_stats_insert', 'trg_document_stats_delete'}
+    expected.update(f'trg_document_stats_update_{name}' for name in get_dimensions(cursor))
+    return installed == expected
+
+def ensure_stats_summary(conn):
+    """
+    Build document_stats if missing, or rebuild it when the dimensions changed
+    (e.g. is_overdue was added after the first build); called by init, the
+    migration and imports, never by readers
+    """
+    if not summary_ready(conn.cursor()):
+        rebuild_stats_summary(conn)
+
+def stats_source(cursor):
+    """
+    SQL prefix that makes document_stats readable on any database
+
+    Empty when the summary is ready; otherwise a read-only CTE of the same
+    name computing the groups live from documents, so readers never build
+    or rebuild the summary themselves
+    """
+    if summary_ready(cursor):
+        return ''
+    groups = ' UNION ALL '.join(
+        f"SELECT '{name}' AS dimension, {expr.format(row='documents')} AS group_key, COUNT(*) AS count "
+        f"FROM documents GROUP BY group_key"
+        for name, expr in get_dimensions(cursor).items()
+    )
+    return f'WITH document_stats AS ({groups}) '
+
+def read_stats_summary(conn):
+    """
+    Read the materialized counts (computed live if the summary is not built)
+
+    Returns:
+        Dict dimension -> Counter of group key -> count; single-column keys
+        are plain values, multi-column keys are tuples
+    """
+    cursor = conn.cursor()
+    summary = {name: Counter() for name in get_dimensions(cursor)}
+    cursor.execute(stats_source(cursor) + "SELECT dimension, group_key, count FROM document_stats")
+    for dimension, group_key, count in cursor.fetchall():
+        key = json.loads(group_key)
+        summary.setdefault(dimension, Counter())[key[0] if len(key) == 1 else tuple(key)] = count
+    return summary
+
+def check_stats_summary(conn):
+    """Compare document_stats against live GROUP BY counts"""
+    cursor = conn.cursor()
+    if not summary_ready(cursor):
+        return {
+            "consistent": False,
+            "error": "document_stats is missing or out of date, run rebuild",
+            "mismatches": []
+        }
+    mismatches = []
+    for name, expr in get_dimensions(cursor).items():
+        live = live_counts(cursor, expr)
+        cursor.execute("SELECT group_key, count FROM document_stats WHERE dimension = ?", (name,))
+        stored = dict(cursor.fetchall())
+        for key in sorted(set(live) | set(stored)):
+            if live.get(key, 0) != stored.get(key, 0):
+                mismatches.append({
+                    "dimension": name,
+                    "group": json.loads(key),
+                    "live": live.get(key, 0),
+                    "stored": stored.get(key, 0)
+                })
+    return {
+        "consistent": not mismatches,
+        "mismatches": mismatches
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python stats_summary.py <db_path> <rebuild|check>")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+    command = sys.argv[2]
+
+    conn = connect(db_path)
+    if command == "rebuild":
+        result = {"success": True, "groups": rebuild_stats_summary(conn)}
+    elif command == "check":
+        result = check_stats_summary(conn)
+    else:
+        result = {"error": f"Unknown command: {command}"}
+    conn.close()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
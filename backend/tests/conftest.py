@@ -0,0 +1,81 @@
+"""
+Shared fixtures for the backend tests: scripts on sys.path, a temp database
+initialized by doc_processor and MDI workbooks built with openpyxl
+"""
+
+import importlib
+import os
+import sys
+
+import pytest
+from openpyxl import Workbook
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'scripts'))
+sys.path.insert(0, BACKEND_DIR)
+
+from db_connection import close_connections
+from job_queue import JobQueue
+from mdi_schema import SHEET_NAME, HEADER_ROW, MDI_COLUMNS
+
+# Headers as the MDI Status Report writes them: some wrap onto two lines
+WORKBOOK_HEADERS = [
+    col.header.replace(' Date', '\nDate') if col.kind == 'date' else col.header
+    for col in MDI_COLUMNS
+]
+
+def write_mdi_workbook(path, rows, headers=WORKBOOK_HEADERS, sheet_name=SHEET_NAME):
+    """
+    Write an MDI_DetailStatus workbook: summary lines above the header row,
+    then one row per dict in rows, keyed by header (missing keys stay blank)
+    """
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = sheet_name
+    for line in range(1, HEADER_ROW):
+        sheet.append([f'Summary line {line}'])
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([row.get(header) for header in headers])
+    workbook.save(path)
+    return str(path)
+
+def mdi_row(company_doc_no, **values):
+    """One workbook row keyed by header, from field names (see MDI_COLUMNS)"""
+    row = {'CompanyDoc.No.': company_doc_no}
+    for col, header in zip(MDI_COLUMNS, WORKBOOK_HEADERS):
+        if col.field in values:
+            row[header] = values[col.field]
+    return row
+
+@pytest.fixture
+def doc_processor(tmp_path, monkeypatch):
+    """doc_processor bound to a fresh database (it reads the path from argv on import)"""
+    db_path = str(tmp_path / 'project_data.db')
+    monkeypatch.setattr(sys, 'argv', ['doc_processor.py', db_path])
+    module = importlib.import_module('doc_processor')
+    monkeypatch.setattr(module, 'DB_NAME', db_path)
+    return module
+
+@pytest.fixture
+def db_path(doc_processor):
+    """Path of a database created by init_db, with every trigger in place"""
+    doc_processor.init_db()
+    return doc_processor.DB_NAME
+
+@pytest.fixture
+def app_module(db_path, tmp_path, monkeypatch):
+    """The Flask app bound to the test database, with its own job queue and upload folder"""
+    monkeypatch.chdir(tmp_path)
+    module = importlib.import_module('app')
+    queue = JobQueue(str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(module, 'DATABASE_PATH', db_path)
+    monkeypatch.setattr(module, 'jobs', queue)
+    monkeypatch.setattr(module, 'UPLOAD_FOLDER', str(tmp_path))
+    yield module
+    queue.shutdown()
+    close_connections()
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
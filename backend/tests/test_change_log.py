@@ -0,0 +1,52 @@
+"""change_log: field-level changes recorded per import and served by /api/changes"""
+
+import excel_importer
+from conftest import write_mdi_workbook, mdi_row
+
+def run_import(tmp_path, name, rows, db_path):
+    excel_path = write_mdi_workbook(tmp_path / name, rows)
+    return excel_importer.process_excel_file(excel_path, db_path, progress=lambda *args: None)
+
+def test_imports_record_created_and_changed_fields(client, db_path, tmp_path):
+    first = run_import(tmp_path, 'v1.xlsx', [
+        mdi_row('DOC-1', ipi_status='IFR', review_code='A1'),
+        mdi_row('DOC-2', ipi_status='IFR'),
+    ], db_path)
+    second = run_import(tmp_path, 'v2.xlsx', [
+        mdi_row('DOC-1', ipi_status='IFA', review_code='A1'),
+        mdi_row('DOC-2', ipi_status='IFR', pic_lsp='Lan'),
+    ], db_path)
+
+    data = client.get('/api/changes').get_json()['data']
+
+    assert [(c['importId'], c['companyDocNo'], c['field'], c['oldValue'], c['newValue']) for c in data['changes']] == [
+        (first['import_id'], 'DOC-1', '*', None, None),
+        (first['import_id'], 'DOC-2', '*', None, None),
+        (second['import_id'], 'DOC-1', 'ipi_status', 'IFR', 'IFA'),
+        (second['import_id'], 'DOC-2', 'pic_lsp', None, 'Lan'),
+    ]
+    assert second['changes'] == 2
+    assert data['latestImportId'] == second['import_id']
+
+def test_since_and_cursor_page_through_newer_changes(client, db_path, tmp_path):
+    first = run_import(tmp_path, 'v1.xlsx', [mdi_row(f'DOC-{i}', ipi_status='IFR') for i in range(3)], db_path)
+    run_import(tmp_path, 'v2.xlsx', [mdi_row(f'DOC-{i}', ipi_status='IFA') for i in range(3)], db_path)
+
+    page = client.get(f"/api/changes?since={first['import_id']}&limit=2").get_json()['data']
+    assert [c['newValue'] for c in page['changes']] == ['IFA', 'IFA']
+    assert page['pagination']['hasMore']
+
+    rest = client.get(f"/api/changes?since={first['import_id']}&limit=2"
+                      f"&cursor={page['pagination']['nextCursor']}").get_json()['data']
+    assert [c['companyDocNo'] for c in page['changes'] + rest['changes']] == ['DOC-0', 'DOC-1', 'DOC-2']
+    assert not rest['pagination']['hasMore']
+
+def test_unchanged_reimport_records_nothing(client, db_path, tmp_path):
+    rows = [mdi_row('DOC-1', ipi_status='IFR')]
+    first = run_import(tmp_path, 'v1.xlsx', rows, db_path)
+    run_import(tmp_path, 'v1-copy.xlsx', rows + [mdi_row(None)], db_path)
+
+    data = client.get('/api/changes').get_json()['data']
+
+    assert len(data['changes']) == 1
+    assert data['latestImportId'] == first['import_id']
@@ -0,0 +1,57 @@
+"""excel_importer --clean: the cleaner's transforms applied in memory, in the same pass as the import"""
+
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+import excel_importer
+from clean_excel_for_import_v2 import clean_excel_file
+from mdi_schema import SHEET_NAME
+from conftest import WORKBOOK_HEADERS, write_mdi_workbook, mdi_row
+
+def quiet(*args):
+    pass
+
+def fetch_dates(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            'SELECT companyDocNo, ifi_plan_date, ifr_actual_date FROM documents ORDER BY companyDocNo').fetchall()
+    finally:
+        conn.close()
+
+def workbook(tmp_path):
+    rows = [
+        dict(mdi_row('DOC-1', ifi_plan=45458, ifr_actual=datetime(2024, 3, 15)), Remarks='late'),
+        dict(mdi_row('DOC-2', ifi_plan='TBA', ifr_actual=45000.0), Remarks=None),
+    ]
+    return write_mdi_workbook(tmp_path / 'mdi.xlsx', rows, headers=WORKBOOK_HEADERS + ['Remarks'])
+
+def test_clean_import_converts_serial_dates(db_path, tmp_path):
+    excel_path = workbook(tmp_path)
+
+    excel_importer.process_excel_file(excel_path, db_path, progress=quiet)
+    plain = fetch_dates(db_path)
+    stats = excel_importer.process_excel_file(excel_path, db_path, progress=quiet, clean=True)
+
+    assert plain == [('DOC-1', '45458', '2024-03-15'), ('DOC-2', 'TBA', '45000')]
+    # As in the standalone cleaner, text that is not a date is dropped
+    assert fetch_dates(db_path) == [('DOC-1', '2024-06-15', '2024-03-15'), ('DOC-2', None, '2023-03-15')]
+    # Cleaned and plain imports of one file are hashed apart, so this was not short-circuited
+    assert stats['updated'] == 2 and stats['errors'] == []
+    assert excel_importer.process_excel_file(excel_path, db_path, progress=quiet, clean=True)['file_unchanged']
+
+def test_clean_output_matches_the_standalone_cleaner(db_path, tmp_path):
+    excel_path = workbook(tmp_path)
+    clean_output = tmp_path / 'pipeline_CLEAN.xlsx'
+
+    stats = excel_importer.process_excel_file(excel_path, db_path, progress=quiet, clean_output=str(clean_output))
+    standalone = clean_excel_file(excel_path, str(tmp_path / 'standalone_CLEAN.xlsx'))
+
+    assert stats['imported'] == 2
+    assert fetch_dates(db_path)[0] == ('DOC-1', '2024-06-15', '2024-03-15')
+    pipeline_frame = pd.read_excel(clean_output, sheet_name=SHEET_NAME)
+    pd.testing.assert_frame_equal(pipeline_frame, pd.read_excel(standalone, sheet_name=SHEET_NAME))
+    assert list(pipeline_frame.columns[:2]) == ['stt', 'scope']
+    assert pipeline_frame['Remarks'].tolist()[0] == 'late'
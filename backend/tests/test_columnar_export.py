@@ -0,0 +1,67 @@
+"""export_db_to_json_v2: the columnar format is built column by column and decodes to the JSON export"""
+
+import json
+import sqlite3
+
+from export_db_to_json_v2 import (
+    decode_columnar, encode_columnar, iter_columnar_json, open_export_stream
+)
+
+def seed(db_path, count):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(
+            'INSERT INTO documents (localPath, companyDocNo, discipline, doc_status, ifr_plan_date) VALUES (?, ?, ?, ?, ?)',
+            [(f'/d/{i}', f'DOC-{i}', 'EM'[i % 2], ['Done', 'Waiting Cmt', None][i % 3], '2024-05-01' if i % 4 else None)
+             for i in range(count)])
+    conn.close()
+
+def export(db_path, export_format, chunk_size=7):
+    return json.loads(''.join(open_export_stream(db_path, compact=True, chunk_size=chunk_size,
+                                                 export_format=export_format)))
+
+def test_columnar_export_decodes_to_the_json_export(db_path):
+    seed(db_path, 25)
+
+    columnar = export(db_path, 'columnar')
+    documents = export(db_path, 'json')['documents']
+
+    assert columnar['metadata']['format'] == 'columnar'
+    assert columnar['count'] == 25
+    assert columnar['columns']['discipline'] == {'dictionary': ['E', 'M'], 'codes': [i % 2 for i in range(25)]}
+    assert columnar['columns']['id'] == [f'/d/{i}' for i in range(25)]
+    assert 'planDates.ifr' in columnar['columns']
+    assert decode_columnar(columnar) == documents
+
+def test_chunks_are_consumed_after_the_metadata_and_dropped():
+    consumed = []
+
+    def chunks():
+        for start in range(0, 6, 2):
+            chunk = [{'id': str(i), 'flag': i % 2 == 0, 'dates': {'ifi': None}} for i in range(start, start + 2)]
+            consumed.append(len(chunk))
+            yield chunk
+
+    pieces = iter_columnar_json({'totalDocuments': 6}, chunks(), chunk_size=4)
+    assert next(pieces) == '{"metadata":{"totalDocuments":6,"format":"columnar"}'
+    assert consumed == []
+
+    data = json.loads('{"metadata":{}' + ''.join(pieces))
+
+    assert consumed == [2, 2, 2]
+    assert data['columns']['id'] == [str(i) for i in range(6)]
+    assert data['columns']['flag'] == {'dictionary': [True, False], 'codes': [0, 1, 0, 1, 0, 1]}
+    assert data['columns']['dates.ifi'] == {'dictionary': [None], 'codes': [0] * 6}
+
+def test_a_document_breaking_the_nested_shape_keeps_whole_objects():
+    documents = [
+        {'id': 'a', 'dates': {'ifi': '2024-01-01'}, 'tags': ['x']},
+        {'id': 'b', 'dates': {'ifi': None, 'ifr': '2024-02-01'}, 'tags': ['x']},
+        {'id': 'c', 'dates': None, 'tags': []},
+    ]
+
+    data = encode_columnar(documents)
+
+    assert list(data['columns']) == ['id', 'dates', 'tags']
+    assert data['columns']['tags'] == [['x'], ['x'], []]
+    assert decode_columnar(data) == documents
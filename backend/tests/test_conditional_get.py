@@ -0,0 +1,41 @@
+"""cached_by_data_version: ETags follow the data version, not the clock"""
+
+import sqlite3
+
+from data_version import bump_data_version
+
+def bump(db_path):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        bump_data_version(conn.cursor())
+    conn.close()
+
+def test_unchanged_data_is_answered_with_304(client):
+    first = client.get('/api/stats')
+    assert first.status_code == 200
+
+    again = client.get('/api/stats', headers={'If-None-Match': first.headers['ETag']})
+
+    assert again.status_code == 304
+    assert again.headers['ETag'] == first.headers['ETag']
+
+def test_write_in_the_same_second_is_not_hidden(client, db_path):
+    bump(db_path)
+    first = client.get('/api/stats')
+    bump(db_path)
+
+    # Both versions share one Last-Modified second; only the ETag tells them apart
+    again = client.get('/api/stats', headers={
+        'If-None-Match': first.headers['ETag'],
+        'If-Modified-Since': first.headers['Last-Modified'],
+    })
+    assert again.status_code == 200
+    assert again.headers['ETag'] != first.headers['ETag']
+
+def test_if_modified_since_alone_never_gives_304(client, db_path):
+    bump(db_path)
+    first = client.get('/api/stats')
+
+    again = client.get('/api/stats', headers={'If-Modified-Since': first.headers['Last-Modified']})
+
+    assert again.status_code == 200
@@ -0,0 +1,45 @@
+"""mdi_schema.convert_date_column: the vectorized cleaner gives convert_excel_date's output cell for cell"""
+
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mdi_schema import convert_date_column, convert_excel_date
+
+SERIALS = [1, 45835, 45835.75, 60000, 0, 60001, -3, 0.5]
+STRINGS = ['2024-03-15', '15/03/2024', 'Mar 15, 2024', '2024-03-15 08:30', 'TBA', 'Hold', '-', '45835']
+DATETIMES = [datetime(2024, 3, 15, 8, 30), pd.Timestamp('2025-06-15'), datetime(1, 1, 1), date(2024, 3, 15)]
+BLANKS = [None, np.nan, pd.NaT, '', 'N/A']
+BAD_VALUES = [True, object(), [45835], float('inf')]
+
+def assert_matches_per_cell(series):
+    converted, serial_count = convert_date_column(series)
+
+    assert converted.tolist() == [convert_excel_date(value) for value in series]
+    assert converted.index.equals(series.index)
+    return serial_count
+
+@pytest.mark.parametrize('values', [SERIALS, STRINGS, DATETIMES, BLANKS, BAD_VALUES],
+                         ids=['serials', 'strings', 'datetimes', 'blanks', 'bad-values'])
+def test_each_kind_of_cell(values):
+    assert_matches_per_cell(pd.Series(values, dtype=object))
+
+def test_mixed_column_with_repeats_and_a_gapped_index():
+    values = (SERIALS + STRINGS + DATETIMES + BLANKS + BAD_VALUES) * 3
+    series = pd.Series(values, index=range(0, 2 * len(values), 2), dtype=object)
+
+    # bool is an int to both paths, so True counts as serial 1
+    serials = [value for value in values if isinstance(value, (int, float)) and 1 <= value <= 60000]
+    assert assert_matches_per_cell(series) == len(serials) == 15
+
+@pytest.mark.parametrize('series', [
+    pd.Series([45835.0, np.nan, 1.0, 70000.0]),
+    pd.Series([45835, 1, 0]),
+    pd.Series(pd.to_datetime(['2024-03-15 00:00', None, '2025-06-15 23:59'])),
+    pd.Series(['2024-03-15', None, 'TBA']),
+    pd.Series([], dtype=object),
+], ids=['float', 'int', 'datetime64', 'str', 'empty'])
+def test_typed_columns_as_pandas_reads_them(series):
+    assert_matches_per_cell(series)
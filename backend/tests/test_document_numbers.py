@@ -0,0 +1,75 @@
+"""document_numbers: one stt per MDI document, the same in the export, deltas, pages and search"""
+
+import json
+import sqlite3
+
+from db_connection import connect
+from document_numbers import ensure_document_numbers
+from export_db_to_json_v2 import open_export_stream
+from row_version import query_delta
+
+def write(db_path, *statements):
+    conn = connect(db_path)
+    with conn:
+        for sql in statements:
+            conn.execute(sql)
+    conn.close()
+
+def numbers(documents):
+    return {doc['id']: doc['stt'] for doc in documents}
+
+def test_every_endpoint_shows_the_export_numbers(client, db_path):
+    # A supporting file (no companyDocNo) first: its rowid must not shift the numbers
+    write(db_path, "INSERT INTO documents (localPath, name) VALUES ('/d/0', 'Pump photo')",
+          "INSERT INTO documents (localPath, companyDocNo, name) VALUES "
+          "('/d/1', 'DOC-1', 'Pump A'), ('/d/2', 'DOC-2', 'Pump B'), ('/d/3', 'DOC-3', 'Pump C')")
+
+    exported = numbers(json.loads(''.join(open_export_stream(db_path)))['documents'])
+
+    assert exported == {'/d/1': 1, '/d/2': 2, '/d/3': 3}
+    assert numbers(query_delta(db_path, since=0)['upserted']) == exported
+    assert numbers(client.get('/api/documents').get_json()['data']['documents']) == exported
+    assert numbers(client.get('/api/search?q=pump').get_json()['data']['documents']) == exported
+
+def test_numbers_are_kept_by_rewrites_and_given_to_new_mdi_documents(doc_processor, db_path):
+    write(db_path, "INSERT INTO documents (localPath, companyDocNo) VALUES ('/d/1', 'DOC-1'), ('/d/2', 'DOC-2')",
+          "INSERT INTO documents (localPath, name) VALUES ('/d/3', 'support')",
+          "DELETE FROM documents WHERE localPath = '/d/1'",
+          # The scanner rewrites rows with REPLACE INTO, carrying stt along
+          "REPLACE INTO documents (localPath, companyDocNo, stt) VALUES ('/d/2', 'DOC-2', 2)",
+          "UPDATE documents SET companyDocNo = 'DOC-3' WHERE localPath = '/d/3'")
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT localPath, stt FROM documents ORDER BY localPath').fetchall()
+    conn.close()
+    assert rows == [('/d/2', 2), ('/d/3', 3)]
+
+def test_existing_documents_are_numbered_in_export_order(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE documents (localPath TEXT PRIMARY KEY, companyDocNo TEXT, stt INTEGER)')
+    conn.executemany('INSERT INTO documents VALUES (?, ?, ?)',
+                     [('/d/1', 'DOC-1', None), ('/d/2', None, None), ('/d/3', 'DOC-3', 7), ('/d/4', 'DOC-4', None)])
+    conn.commit()
+
+    ensure_document_numbers(conn)
+    conn.execute("INSERT INTO documents (localPath, companyDocNo) VALUES ('/d/5', 'DOC-5')")
+
+    assert conn.execute('SELECT localPath, stt FROM documents ORDER BY localPath').fetchall() == [
+        ('/d/1', 8), ('/d/2', None), ('/d/3', 7), ('/d/4', 9), ('/d/5', 10)]
+    conn.close()
+
+def test_rescanning_a_changed_file_keeps_its_number(doc_processor, db_path, tmp_path):
+    root = tmp_path / 'project'
+    root.mkdir()
+    for name in ('TF1-2A19-PI-0001_A.pdf', 'TF1-2A19-PI-0002_A.pdf'):
+        (root / name).write_bytes(b'%PDF')
+    doc_processor.scan_documents(str(root), incremental=True)
+    (root / 'TF1-2A19-PI-0001_A.pdf').write_bytes(b'%PDF changed')
+
+    doc_processor.scan_documents(str(root), incremental=True)
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT name, stt FROM documents ORDER BY name').fetchall()
+    conn.close()
+    assert rows == [('TF1-2A19-PI-0001_A', 1), ('TF1-2A19-PI-0002_A', 2)]
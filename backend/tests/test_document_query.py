@@ -0,0 +1,92 @@
+"""document_query: keyset pages over NULL and repeated sort values, filters and /api/documents"""
+
+import sqlite3
+
+import pytest
+
+from document_query import query_documents
+
+# localPath, companyDocNo, discipline, doc_status
+DOCUMENTS = [
+    ('/d/1', 'DOC-1', 'M', 'Done'),
+    ('/d/2', 'DOC-2', None, 'Done'),
+    ('/d/3', 'DOC-3', 'E', 'Waiting Cmt'),
+    ('/d/4', 'DOC-4', 'M', None),
+    ('/d/5', 'DOC-5', None, 'Done'),
+    ('/d/6', 'DOC-6', 'E', 'Done'),
+    ('/d/7', None, 'E', 'Done'),  # supporting file, never listed
+    ('/d/8', 'DOC-8', 'M', 'Waiting Cmt'),
+]
+
+@pytest.fixture
+def seeded(db_path):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany('INSERT INTO documents (localPath, companyDocNo, discipline, doc_status) VALUES (?, ?, ?, ?)',
+                         DOCUMENTS)
+    conn.close()
+    return db_path
+
+def all_pages(db_path, **kwargs):
+    ids, cursor = [], None
+    while True:
+        page = query_documents(db_path, limit=2, cursor=cursor, **kwargs)
+        ids.extend(doc['id'] for doc in page['documents'])
+        cursor = page['pagination']['nextCursor']
+        if not page['pagination']['hasMore']:
+            assert cursor is None
+            return ids
+
+def expected_order(descending):
+    """SQLite order: NULLs first ascending and last descending, rowid breaking ties"""
+    listed = [row for row in DOCUMENTS if row[1]]
+    nulls = [row[0] for row in listed if row[2] is None]
+    # sorted() is stable, so insertion (rowid) order breaks ties
+    values = [row[0] for row in sorted((row for row in listed if row[2] is not None), key=lambda row: row[2])]
+    if descending:
+        return values[::-1] + nulls[::-1]
+    return nulls + values
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_pages_cover_null_and_repeated_sort_values_once(seeded, order):
+    ids = all_pages(seeded, sort='discipline', order=order)
+
+    assert ids == expected_order(order == 'desc')
+
+def test_default_sort_follows_the_export_numbers(seeded):
+    assert all_pages(seeded) == ['/d/1', '/d/2', '/d/3', '/d/4', '/d/5', '/d/6', '/d/8']
+    assert all_pages(seeded, order='desc') == ['/d/8', '/d/6', '/d/5', '/d/4', '/d/3', '/d/2', '/d/1']
+
+def test_repeated_filter_params_match_any_value(seeded, client):
+    response = client.get('/api/documents?doc_status=Waiting%20Cmt&doc_status=Done&discipline=E&discipline=M&limit=10')
+    data = response.get_json()['data']
+
+    assert sorted(doc['id'] for doc in data['documents']) == ['/d/1', '/d/3', '/d/6', '/d/8']
+    assert data['total'] == 4
+    assert data['pagination']['hasMore'] is False
+
+def test_total_counts_every_match_not_the_page(seeded, client):
+    data = client.get('/api/documents?limit=2&discipline=M').get_json()['data']
+
+    assert len(data['documents']) == 2
+    assert data['total'] == 3
+    assert data['pagination']['nextCursor']
+
+@pytest.mark.parametrize('query', ['cursor=not-a-cursor', 'sort=secret', 'order=sideways'])
+def test_bad_parameters_are_a_400(seeded, client, query):
+    response = client.get(f'/api/documents?{query}')
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+def test_reading_creates_no_index(seeded):
+    conn = sqlite3.connect(seeded)
+    with conn:
+        conn.execute('DROP INDEX idx_discipline')
+    conn.close()
+
+    query_documents(seeded, sort='discipline')
+
+    conn = sqlite3.connect(seeded)
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'idx_discipline'").fetchone() is None
+    conn.close()
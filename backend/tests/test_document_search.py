@@ -0,0 +1,107 @@
+"""document_search: the FTS index follows every documents write and can be rebuilt"""
+
+import sqlite3
+import threading
+
+from db_connection import connect
+from document_search import (
+    check_search_index, ensure_search_index, rebuild_search_index, search_documents
+)
+
+def insert_documents(db_path, rows):
+    conn = connect(db_path)
+    with conn:
+        conn.executemany('INSERT INTO documents (localPath, companyDocNo, name) VALUES (?, ?, ?)', rows)
+    conn.close()
+
+def found(db_path, text):
+    return sorted(doc['documentNo'] for doc in search_documents(db_path, text)['documents'])
+
+def drop_search_index(db_path):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        for name in ('insert', 'delete', 'update'):
+            conn.execute(f'DROP TRIGGER trg_documents_fts_{name}')
+        conn.execute('DROP TABLE documents_fts')
+    conn.close()
+
+def test_index_follows_replace_update_and_delete(db_path):
+    insert_documents(db_path, [('/d/1', 'LSP-PI-0001', 'Pump datasheet'), ('/d/2', 'LSP-PI-0002', 'Valve list')])
+    conn = connect(db_path)
+    with conn:
+        # The scanner rewrites rows with REPLACE INTO: the old entry must leave the index
+        conn.execute("REPLACE INTO documents (localPath, companyDocNo, name) VALUES ('/d/1', 'LSP-PI-0001', 'Compressor datasheet')")
+        conn.execute("UPDATE documents SET name = 'Valve schedule' WHERE localPath = '/d/2'")
+    conn.close()
+
+    assert found(db_path, 'pump') == []
+    assert found(db_path, 'compressor') == ['LSP-PI-0001']
+    assert found(db_path, 'datasheet') == ['LSP-PI-0001']
+    assert found(db_path, 'valve sched') == ['LSP-PI-0002']
+    assert found(db_path, 'list') == []
+
+    conn = connect(db_path)
+    with conn:
+        conn.execute("DELETE FROM documents WHERE localPath = '/d/1'")
+    assert check_search_index(conn)['consistent']
+    conn.close()
+
+    assert found(db_path, 'LSP-PI') == ['LSP-PI-0002']
+
+def test_search_endpoint(client, db_path):
+    insert_documents(db_path, [
+        ('/d/1', 'LSP-PI-0001', 'Bơm ly tâm'),
+        ('/d/2', 'LSP-PI-0002', 'Pump curve'),
+        ('/d/3', None, 'Pump photo'),  # supporting file, not an MDI document
+    ])
+
+    response = client.get('/api/search?q=pump')
+    accents = client.get('/api/search?q=bom')
+
+    assert response.get_json()['data']['total'] == 1
+    assert [doc['documentNo'] for doc in response.get_json()['data']['documents']] == ['LSP-PI-0002']
+    assert [doc['documentNo'] for doc in accents.get_json()['data']['documents']] == ['LSP-PI-0001']
+    assert client.get('/api/search?q=').status_code == 400
+
+def test_concurrent_first_searches_build_the_index_once(db_path):
+    insert_documents(db_path, [('/d/1', 'LSP-PI-0001', 'Pump datasheet')])
+    drop_search_index(db_path)
+    barrier = threading.Barrier(4)
+    results, errors = [], []
+
+    def first_search():
+        conn = connect(db_path, check_same_thread=False)
+        barrier.wait()
+        try:
+            results.append(ensure_search_index(conn))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=first_search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(results) == 4 and all(columns == results[0] for columns in results)
+    assert 'companyDocNo' in results[0]
+    assert found(db_path, 'pump') == ['LSP-PI-0001']
+
+def test_rebuild_after_rowids_change(db_path):
+    insert_documents(db_path, [('/d/1', 'LSP-PI-0001', 'Pump datasheet'), ('/d/2', 'LSP-PI-0002', 'Valve list')])
+    conn = connect(db_path)
+    with conn:
+        # What a VACUUM renumbering looks like to the index: same rows, new rowids
+        conn.execute('UPDATE documents SET rowid = rowid + 100')
+
+    assert not check_search_index(conn)['consistent']
+    assert not conn.in_transaction
+
+    rebuild_search_index(conn, db_path)
+
+    assert check_search_index(conn)['consistent']
+    conn.close()
+    assert found(db_path, 'pump') == ['LSP-PI-0001']
@@ -0,0 +1,62 @@
+"""doc_processor.get_document_stats: totals aggregated by SQLite from document_stats"""
+
+import sqlite3
+
+DOCUMENTS = [
+    # localPath, table, doc_status, discipline, scope, trn_out_date, trn_in_date, feedbackStatus
+    ('/d/1', 'A', 'Overdue Cmt', 'E', 'S1', '2024-01-01', None, None),
+    ('/d/2', 'A', 'overdue cmt', 'E', None, '2024-01-01', '2024-02-01', 'ok'),
+    ('/d/3', 'B', 'Input Plan', 'M', 'S2', None, None, ''),
+    ('/d/4', 'B', 'Waiting Cmt', None, 'S1', '2024-01-01', None, 'ok'),
+    ('/d/5', None, 'Overdue Re-submit', 'E', 'S1', None, None, None),
+    ('/d/6', 'A', None, 'M', None, None, None, None),
+]
+
+def seed(db_path):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany('''
+            INSERT INTO documents (localPath, "table", doc_status, discipline, scope,
+                                   trn_out_date, trn_in_date, feedbackStatus)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', DOCUMENTS)
+    conn.close()
+
+def test_totals_and_distributions(doc_processor, db_path):
+    seed(db_path)
+
+    stats = doc_processor.get_document_stats()
+
+    assert stats['total_documents'] == 6
+    assert stats['trn_stats'] == {'total_trn_out': 3, 'trn_pending': 2, 'trn_received': 1}
+    assert stats['docs_needing_feedback'] == 4
+    assert list(stats['docs_by_discipline'].items()) == [('E', 3), ('M', 2), ('N/A', 1)]
+    assert stats['docs_by_scope'] == {'S1': 3, 'S2': 1}
+    assert stats['status_by_table'] == {
+        'A': {'Overdue Cmt': 1, 'overdue cmt': 1},
+        'B': {'Input Plan': 1, 'Waiting Cmt': 1},
+    }
+
+def test_status_categories_match_like_sqlite(doc_processor, db_path):
+    seed(db_path)
+
+    stats = doc_processor.get_document_stats()
+
+    # LIKE is case-insensitive: both spellings of 'Overdue Cmt' count
+    assert stats['status_detail_distribution']['Overdue Cmt'] == {'by_table': {'A': 2}, 'total': 2}
+    assert stats['status_detail_distribution']['Overdue Re-submit'] == {'by_table': {'N/A': 1}, 'total': 1}
+    assert stats['status_detail_distribution']['Ongoing Resubmit'] == {'by_table': {}, 'total': 0}
+    assert stats['overdue_by_table'] == {'A': 2}
+
+def test_follows_later_writes(doc_processor, db_path):
+    seed(db_path)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("UPDATE documents SET doc_status = 'Input Plan' WHERE localPath = '/d/1'")
+        conn.execute("DELETE FROM documents WHERE localPath = '/d/5'")
+    conn.close()
+
+    stats = doc_processor.get_document_stats()
+
+    assert stats['total_documents'] == 5
+    assert stats['status_detail_distribution']['Input Plan']['by_table'] == {'A': 1, 'B': 1}
+    assert stats['overdue_by_table'] == {'A': 1}
@@ -0,0 +1,102 @@
+"""doc_processor Excel exports: the streaming writer gives the same workbook as the DataFrame one it replaced"""
+
+import json
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+DOCUMENTS = [
+    ('/p/E/TF1-2A19-EL-0001_A.pdf', 'TF1-2A19-EL-0001_A', 'TF1-2A19-EL-0001', 'E', 'Sơ đồ một sợi',
+     '2024-03-15', '2024-01-10', None, 'Waiting Cmt'),
+    ('/p/M/TF1-2A19-ME-0002_B.pdf', 'TF1-2A19-ME-0002_B', 'TF1-2A19-ME-0002', 'M', 'Pump datasheet',
+     None, '2023-12-01', '2024-02-29', 'Done'),
+    ('/p/M/Thư mục/TF1-2A19-ME-0003_A.docx', 'TF1-2A19-ME-0003_A', 'TF1-2A19-ME-0003', 'M', '',
+     '2025-06-15', None, None, None),
+    ('/p/photos/site.pdf', 'site', None, None, None, None, None, None, None),
+]
+COLUMNS = ('localPath', 'name', 'companyDocNo', 'discipline', 'description',
+           'dateReceived', 'ifi_plan_date', 'ifi_actual_date', 'doc_status')
+DATE_HEADERS = ['Ngày nhận', 'IFI Plan', 'IFI Actual']
+
+def old_export_to_excel(documents, columns_map, output_path):
+    """export_to_excel before the streaming writer (c9f75d2), with links written as external:"""
+    excel_dir = os.path.dirname(output_path)
+    sanitized_documents = []
+    for doc in documents:
+        sanitized_doc = {key: value.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+                         if isinstance(value, str) else value for key, value in doc.items()}
+        if sanitized_doc.get('localPath'):
+            sanitized_doc['localLink'] = os.path.relpath(sanitized_doc['localPath'], excel_dir).replace('\\', '/')
+        sanitized_documents.append(sanitized_doc)
+
+    df = pd.DataFrame(sanitized_documents)
+    df_export = df[[key for key in columns_map if key in df.columns]].rename(columns=columns_map)
+    writer = pd.ExcelWriter(output_path, engine='xlsxwriter')
+    df_export.to_excel(writer, sheet_name='Sheet1', index=False)
+    url_format = writer.book.add_format({'font_color': 'blue', 'underline': 1})
+    link_col_idx = df_export.columns.get_loc('Đường dẫn Local')
+    for index, row in df_export.iterrows():
+        if row['Đường dẫn Local']:
+            writer.sheets['Sheet1'].write_url(index + 1, link_col_idx, 'external:' + row['Đường dẫn Local'],
+                                              string='Mở File', cell_format=url_format)
+    writer.close()
+
+def read_back(path):
+    """Headers, rows and link targets of Sheet1"""
+    sheet = load_workbook(path)['Sheet1']
+    rows = [[cell.value for cell in row] for row in sheet.iter_rows()]
+    links = {cell.coordinate: cell.hyperlink.target for row in sheet.iter_rows() for cell in row if cell.hyperlink}
+    return rows[0], rows[1:], links
+
+@pytest.fixture
+def documents(doc_processor, db_path, capsys):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(f'INSERT INTO documents ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})',
+                         DOCUMENTS)
+    conn.close()
+    capsys.readouterr()
+    # What the app sends to the 'export' command: the loaded document list
+    doc_processor.load_all_docs()
+    return json.loads(capsys.readouterr().out)
+
+@pytest.fixture
+def baseline(doc_processor, documents, tmp_path):
+    path = str(tmp_path / 'old.xlsx')
+    old_export_to_excel(documents, doc_processor.EXCEL_COLUMNS, path)
+    return read_back(path)
+
+def test_export_matches_the_old_writer(doc_processor, documents, baseline, tmp_path, capsys):
+    path = str(tmp_path / 'new.xlsx')
+
+    doc_processor.export_to_excel(json.dumps(documents), path)
+
+    assert json.loads(capsys.readouterr().out) == {'success': True, 'path': path}
+    headers, rows, links = read_back(path)
+    assert headers == baseline[0]
+    assert len(rows) == len(baseline[1]) == len(DOCUMENTS)
+    assert rows == baseline[1]
+    assert links == baseline[2]
+    assert len(links) == len(DOCUMENTS)
+
+def test_export_db_writes_the_same_workbook_from_the_cursor(doc_processor, baseline, tmp_path, capsys):
+    path = str(tmp_path / 'db.xlsx')
+
+    doc_processor.export_db_to_excel(path)
+
+    assert json.loads(capsys.readouterr().out)['count'] == len(DOCUMENTS)
+    assert read_back(path) == baseline
+
+def test_date_cells_are_the_stored_text(doc_processor, documents, baseline, tmp_path):
+    path = str(tmp_path / 'new.xlsx')
+    doc_processor.export_to_excel(json.dumps(documents), path)
+    headers, rows, _ = read_back(path)
+
+    dates = [[row[headers.index(header)] for header in DATE_HEADERS] for row in rows]
+
+    assert dates == [[row[headers.index(header)] for header in DATE_HEADERS] for row in baseline[1]]
+    assert ['2024-03-15', '2024-01-10', None] in dates
+    assert ['2025-06-15', None, None] in dates
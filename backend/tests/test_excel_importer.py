@@ -0,0 +1,84 @@
+"""excel_importer: vectorized conversion and the batched executemany upsert"""
+
+import sqlite3
+from datetime import datetime
+
+import excel_importer
+from conftest import write_mdi_workbook, mdi_row
+
+def fetch_documents(db_path, columns='companyDocNo, localPath, ipi_status, ifi_plan_date'):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f'SELECT {columns} FROM documents ORDER BY companyDocNo, localPath').fetchall()
+    finally:
+        conn.close()
+
+def seed_documents(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany('INSERT INTO documents (localPath, name, companyDocNo) VALUES (?, ?, ?)', rows)
+    conn.close()
+
+def test_new_rows_are_inserted_with_converted_values(db_path, tmp_path):
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', [
+        mdi_row('DOC-1', ipi_status=' IFR ', ifi_plan=datetime(2024, 3, 15)),
+        mdi_row('DOC-2', ipi_status=42, ifi_plan='TBA'),
+        mdi_row(None, ipi_status='no key'),
+    ])
+
+    stats = excel_importer.process_excel_file(excel_path, db_path, progress=lambda *args: None)
+
+    assert stats['imported'] == 2
+    assert stats['updated'] == 0
+    assert stats['skipped'] == 1
+    assert stats['errors'] == []
+    assert fetch_documents(db_path) == [
+        ('DOC-1', 'IMPORT_DOC-1', 'IFR', '2024-03-15'),
+        ('DOC-2', 'IMPORT_DOC-2', '42', 'TBA'),
+    ]
+
+def test_existing_key_updates_every_document_row(db_path, tmp_path):
+    seed_documents(db_path, [('/docs/a.pdf', 'a', 'DOC-1'), ('/docs/b.pdf', 'b', 'DOC-1')])
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', [mdi_row('DOC-1', ipi_status='IFA')])
+
+    stats = excel_importer.process_excel_file(excel_path, db_path, progress=lambda *args: None)
+
+    assert (stats['imported'], stats['updated']) == (0, 1)
+    assert fetch_documents(db_path) == [
+        ('DOC-1', '/docs/a.pdf', 'IFA', None),
+        ('DOC-1', '/docs/b.pdf', 'IFA', None),
+    ]
+
+def test_repeated_key_inserts_once_and_last_row_wins(db_path, tmp_path):
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', [
+        mdi_row('DOC-1', ipi_status='IFR'),
+        mdi_row('DOC-1', ipi_status='IFC'),
+    ])
+
+    stats = excel_importer.process_excel_file(excel_path, db_path, progress=lambda *args: None)
+
+    assert (stats['imported'], stats['updated']) == (1, 1)
+    assert fetch_documents(db_path) == [('DOC-1', 'IMPORT_DOC-1', 'IFC', None)]
+
+def test_upsert_runs_in_batches_and_reports_progress(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_importer, 'IMPORT_BATCH_SIZE', 2)
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', [mdi_row(f'DOC-{i}') for i in range(5)])
+    calls = []
+
+    stats = excel_importer.process_excel_file(
+        excel_path, db_path, progress=lambda processed, total, message=None: calls.append((processed, total, message))
+    )
+
+    assert stats['count'] == 5
+    assert [(processed, total) for processed, total, message in calls if message is None] == [(2, 5), (4, 5), (5, 5)]
+    assert len(fetch_documents(db_path)) == 5
+
+def test_update_by_key_uses_an_index_on_a_fresh_database(db_path, tmp_path):
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', [mdi_row('DOC-1')])
+
+    excel_importer.process_excel_file(excel_path, db_path, progress=lambda *args: None)
+
+    conn = sqlite3.connect(db_path)
+    plan = conn.execute('EXPLAIN QUERY PLAN ' + excel_importer.UPDATE_SQL, [None] * excel_importer.UPDATE_SQL.count('?')).fetchall()
+    conn.close()
+    assert any('idx_company_doc' in row[-1] for row in plan)
@@ -0,0 +1,79 @@
+"""feedback_matcher: token lookup, the containment fallback and agreement with the old loop"""
+
+import pytest
+
+from feedback_matcher import FeedbackMatcher, doc_number_tokens
+
+DOCUMENTS = [
+    {'name': 'TF1-2A19-PI-0001_A', 'companyDocNo': 'TF1-2A19-PI-0001', 'localPath': '/d/1a'},
+    {'name': 'TF1-2A19-PI-0001_B', 'companyDocNo': 'TF1-2A19-PI-0001', 'localPath': '/d/1b'},
+    {'name': 'TF1-2A19-PI-0002_A', 'companyDocNo': 'TF1-2A19-PI-0002', 'localPath': '/d/2'},
+    {'name': 'LSPET-TCPT-T-PI-0001', 'contractorDocNo': 'LSPET-TCPT-T-PI-0001', 'localPath': '/d/3'},
+    {'name': 'Pump datasheet', 'localPath': '/d/4'},
+    {'name': 'Pump datasheet rev 2', 'localPath': '/d/5'},
+    {'name': 'Cable schedule', 'localPath': '/d/6'},
+]
+
+def old_match(documents, feedback_name):
+    """process_feedback before FeedbackMatcher: first containment hit in dict order"""
+    doc_map = {doc['name']: doc for doc in documents}
+    return next((doc_data for doc_name, doc_data in doc_map.items()
+                 if feedback_name in doc_name or doc_name in feedback_name), None)
+
+def path(doc):
+    return doc['localPath'] if doc else None
+
+@pytest.fixture
+def matcher():
+    return FeedbackMatcher(DOCUMENTS)
+
+def test_tokens_are_normalized_doc_numbers():
+    assert doc_number_tokens('lspet_tcpt_t_pi_0001 Rev B') == ['LSPET-TCPT-T-PI-0001']
+    assert doc_number_tokens('Cable-schedule-final') == []
+
+@pytest.mark.parametrize('feedback_name, expected', [
+    ('TF1-2A19-PI-0002_A', '/d/2'),
+    ('TF1-2A19-PI-0001_B_Comments', '/d/1b'),
+    # Only the doc number matches: the name has no '_Rev B_Comments' suffix
+    ('LSPET_TCPT_T_PI_0001_Rev B_Comments', '/d/3'),
+    ('tf1-2a19-pi-0002_a reply', '/d/2'),
+])
+def test_exact_token_match(matcher, feedback_name, expected):
+    assert path(matcher.match(feedback_name)) == expected
+
+@pytest.mark.parametrize('feedback_name, expected', [
+    ('Cable schedule - comments', '/d/6'),  # name contained in the filename
+    ('Cable sched', '/d/6'),                # filename contained in the name
+])
+def test_containment_fallback(matcher, feedback_name, expected):
+    assert path(matcher.match(feedback_name)) == expected
+
+def test_ties_go_to_the_closest_name_then_the_earliest_document(matcher):
+    # Both revisions contain the bare doc number equally: the first one wins
+    assert path(matcher.match('TF1-2A19-PI-0001')) == '/d/1a'
+    # Both datasheets contain 'Pump data'; the shorter name is closer
+    assert path(matcher.match('Pump data')) == '/d/4'
+    assert path(matcher.match('Pump datasheet rev 2 - reply')) == '/d/5'
+
+def test_input_order_decides_exact_ties():
+    assert path(FeedbackMatcher(list(reversed(DOCUMENTS[:2]))).match('TF1-2A19-PI-0001')) == '/d/1b'
+
+@pytest.mark.parametrize('feedback_name', ['', 'Minutes of meeting', 'TF1-2A19-PI-0099_A'])
+def test_no_match(matcher, feedback_name):
+    assert matcher.match(feedback_name) is None
+
+def test_empty_names_match_nothing():
+    assert FeedbackMatcher([{'name': '', 'localPath': '/d/0'}]).match('anything') is None
+
+@pytest.mark.parametrize('feedback_name', [
+    'TF1-2A19-PI-0001_A', 'TF1-2A19-PI-0001_B', 'TF1-2A19-PI-0001', 'TF1-2A19-PI-0002_A_reply',
+    'LSPET-TCPT-T-PI-0001', 'LSPET-TCPT-T-PI-0001 comments', 'Pump datasheet', 'Pump', 'Pu',
+    'Cable schedule (signed)', 'schedule', 'Minutes of meeting',
+])
+def test_agrees_with_the_old_loop_wherever_it_matched(matcher, feedback_name):
+    expected = old_match(DOCUMENTS, feedback_name)
+
+    if expected is not None:
+        assert path(matcher.match(feedback_name)) == path(expected)
+    else:
+        assert matcher.match(feedback_name) is None
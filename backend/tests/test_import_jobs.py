@@ -0,0 +1,70 @@
+"""Upload imports on the job queue: a rolled-back import must fail its job"""
+
+import io
+import sqlite3
+
+import excel_importer
+from conftest import write_mdi_workbook, mdi_row
+
+def add_failing_trigger(db_path):
+    """Abort any write that sets ipi_status to 'BOOM', half-way through the upsert"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TRIGGER trg_test_fail BEFORE UPDATE ON documents WHEN NEW.ipi_status = 'BOOM'
+        BEGIN SELECT RAISE(ABORT, 'boom'); END''')
+    conn.commit()
+    conn.close()
+
+def snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            'documents': conn.execute('SELECT companyDocNo, ipi_status FROM documents ORDER BY 1').fetchall(),
+            'version': conn.execute('SELECT version FROM data_version').fetchone()[0],
+            'row_hashes': conn.execute('SELECT * FROM import_row_hashes ORDER BY 1').fetchall(),
+            'changes': conn.execute('SELECT COUNT(*) FROM document_changes').fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+def test_failed_reimport_rolls_everything_back(db_path, tmp_path):
+    first = write_mdi_workbook(tmp_path / 'v1.xlsx', [mdi_row('DOC-1', ipi_status='IFR'), mdi_row('DOC-2', ipi_status='IFR')])
+    excel_importer.process_excel_file(first, db_path, progress=lambda *args: None)
+    before = snapshot(db_path)
+    add_failing_trigger(db_path)
+    second = write_mdi_workbook(tmp_path / 'v2.xlsx', [mdi_row('DOC-1', ipi_status='IFA'), mdi_row('DOC-2', ipi_status='BOOM')])
+
+    stats = excel_importer.process_excel_file(second, db_path, progress=lambda *args: None)
+
+    assert stats['errors'] and 'boom' in stats['errors'][0]
+    assert stats['count'] == 0
+    assert snapshot(db_path) == before
+
+def test_upload_job_fails_when_the_import_rolls_back(client, app_module, db_path, tmp_path):
+    add_failing_trigger(db_path)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("INSERT INTO documents (localPath, companyDocNo) VALUES ('/d/1', 'DOC-1')")
+    conn.close()
+    excel_path = write_mdi_workbook(tmp_path / 'upload.xlsx', [mdi_row('DOC-1', ipi_status='BOOM')])
+
+    with open(excel_path, 'rb') as f:
+        response = client.post('/api/upload', data={'file': (io.BytesIO(f.read()), 'MDI.xlsx')})
+    assert response.status_code == 202
+    app_module.jobs.shutdown(wait=True)
+
+    job = client.get(response.get_json()['data']['statusUrl']).get_json()['data']
+    assert job['status'] == 'failed'
+    assert 'boom' in job['error']
+    assert not list(tmp_path.glob('*_MDI.xlsx'))
+
+def test_upload_job_succeeds_with_the_import_stats(client, app_module, tmp_path):
+    excel_path = write_mdi_workbook(tmp_path / 'upload.xlsx', [mdi_row('DOC-1', ipi_status='IFR')])
+
+    with open(excel_path, 'rb') as f:
+        response = client.post('/api/upload', data={'file': (io.BytesIO(f.read()), 'MDI.xlsx')})
+    app_module.jobs.shutdown(wait=True)
+
+    job = client.get(response.get_json()['data']['statusUrl']).get_json()['data']
+    assert job['status'] == 'succeeded'
+    assert job['result']['imported'] == 1
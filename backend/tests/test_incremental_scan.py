@@ -0,0 +1,85 @@
+"""doc_processor.scan_documents: the incremental mode and its file_state index"""
+
+import os
+import sqlite3
+
+import pytest
+
+@pytest.fixture
+def scan_root(tmp_path):
+    root = tmp_path / 'project'
+    folder = root / 'LSPET-TCPT-T-PI-0001'
+    folder.mkdir(parents=True)
+    for name in ('TF1-2A19-PI-0001_A.pdf', 'TF1-2A19-PI-0002_A.pdf', 'notes.txt'):
+        (folder / name).write_bytes(b'%PDF')
+    return root
+
+def document_paths(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(os.path.basename(row[0]) for row in conn.execute('SELECT localPath FROM documents'))
+    finally:
+        conn.close()
+
+def test_incremental_scan_skips_unchanged_and_removes_deleted(doc_processor, db_path, scan_root):
+    first = doc_processor.scan_documents(str(scan_root), incremental=True)
+    assert first == {'added': 2, 'changed': 0, 'removed': 0, 'unchanged': 0, 'unreadable': 0}
+
+    assert doc_processor.scan_documents(str(scan_root), incremental=True) == \
+        {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 2, 'unreadable': 0}
+
+    os.remove(scan_root / 'LSPET-TCPT-T-PI-0001' / 'TF1-2A19-PI-0002_A.pdf')
+    third = doc_processor.scan_documents(str(scan_root), incremental=True)
+    assert third == {'added': 0, 'changed': 0, 'removed': 1, 'unchanged': 1, 'unreadable': 0}
+    assert document_paths(db_path) == ['TF1-2A19-PI-0001_A.pdf']
+
+def test_scan_root_spellings_share_one_index(doc_processor, db_path, scan_root):
+    doc_processor.scan_documents(str(scan_root), incremental=True)
+
+    delta = doc_processor.scan_documents(os.path.join(str(scan_root), '.', ''), incremental=True)
+
+    assert delta['unchanged'] == 2
+    conn = sqlite3.connect(db_path)
+    roots = {row[0] for row in conn.execute('SELECT scanRoot FROM file_state')}
+    conn.close()
+    assert roots == {os.path.abspath(scan_root)}
+
+def test_full_scan_leaves_delta_reporting_to_the_incremental_command(doc_processor, db_path, scan_root, capsys):
+    doc_processor.scan_documents(str(scan_root))
+    capsys.readouterr()
+
+    delta = doc_processor.scan_documents(str(scan_root))
+
+    assert delta['unchanged'] == 2
+    assert 'scan_delta' not in capsys.readouterr().err
+    assert document_paths(db_path) == ['TF1-2A19-PI-0001_A.pdf', 'TF1-2A19-PI-0002_A.pdf']
+
+def test_unreachable_root_removes_nothing(doc_processor, db_path, scan_root):
+    doc_processor.scan_documents(str(scan_root), incremental=True)
+    os.rename(scan_root, str(scan_root) + '-offline')
+
+    delta = doc_processor.scan_documents(str(scan_root), incremental=True)
+
+    assert delta == {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0, 'unreadable': 1}
+    assert document_paths(db_path) == ['TF1-2A19-PI-0001_A.pdf', 'TF1-2A19-PI-0002_A.pdf']
+
+def test_unlistable_subdirectory_keeps_its_rows(doc_processor, db_path, scan_root, monkeypatch):
+    (scan_root / 'other').mkdir()
+    (scan_root / 'other' / 'TF1-2B01-ME-0001_A.pdf').write_bytes(b'%PDF')
+    doc_processor.scan_documents(str(scan_root), incremental=True)
+    offline = os.path.join(str(scan_root), 'LSPET-TCPT-T-PI-0001')
+    scandir = os.scandir
+
+    def failing_scandir(path):
+        if path == offline:
+            raise PermissionError(13, 'Permission denied')
+        return scandir(path)
+
+    monkeypatch.setattr(doc_processor.os, 'scandir', failing_scandir)
+    os.remove(scan_root / 'other' / 'TF1-2B01-ME-0001_A.pdf')
+
+    delta = doc_processor.scan_documents(str(scan_root), incremental=True)
+
+    # The deleted file in the listed folder goes; the unread folder's rows stay
+    assert delta['removed'] == 1 and delta['unreadable'] == 1
+    assert document_paths(db_path) == ['TF1-2A19-PI-0001_A.pdf', 'TF1-2A19-PI-0002_A.pdf']
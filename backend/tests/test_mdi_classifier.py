@@ -0,0 +1,45 @@
+"""MDIClassifier: longest-prefix lookups, and the importer classifying new rows"""
+
+import sqlite3
+
+import excel_importer
+from mdi_classifier import MDIClassifier
+from conftest import write_mdi_workbook, mdi_row
+
+MAPPING = {
+    'TF1-2A': ['A'],
+    'TF1-2A1': ['A1'],
+    'TF1-2A19': ['A19'],
+    'TF1-2B': 'N/A',
+    'TCPT-': ['T'],
+}
+
+def linear_longest_prefix(name):
+    """The SORTED_MDI_KEYS scan the trie replaced"""
+    return next((key for key in sorted(MAPPING, key=len, reverse=True) if name.startswith(key)), None)
+
+def test_longest_prefix_matches_the_linear_scan():
+    classifier = MDIClassifier(MAPPING)
+    for name in ['TF1-2A19-PI-0001', 'TF1-2A1', 'TF1-2A2-X', 'TF1-2', 'TF1-2B01', 'TCPT-LSP', 'XYZ', '']:
+        assert classifier.longest_prefix(name) == linear_longest_prefix(name)
+
+def test_doc_class_is_the_first_mapping_entry():
+    classifier = MDIClassifier(MAPPING)
+    assert classifier.doc_class('TF1-2A19-PI-0001') == 'A19'
+    assert classifier.doc_class('TF1-2B01') is None
+    assert classifier.doc_class('XYZ', 'N/A') == 'N/A'
+
+def test_importer_classifies_inserted_rows_without_a_class(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_importer, 'MDI_CLASSIFIER', MDIClassifier(MAPPING))
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', [
+        mdi_row('TF1-2A19-PI-0001'),
+        mdi_row('TF1-2A19-PI-0002', doc_class='Z'),
+        mdi_row('OTHER-0001'),
+    ])
+
+    excel_importer.process_excel_file(excel_path, db_path, progress=lambda *args: None)
+
+    conn = sqlite3.connect(db_path)
+    classes = conn.execute('SELECT companyDocNo, doc_class FROM documents ORDER BY companyDocNo').fetchall()
+    conn.close()
+    assert classes == [('OTHER-0001', None), ('TF1-2A19-PI-0001', 'A19'), ('TF1-2A19-PI-0002', 'Z')]
@@ -0,0 +1,30 @@
+"""mdi_schema.resolve_headers: header matching that survives wrapped, repeated and blank headers"""
+
+import pandas as pd
+
+from mdi_schema import HEADER_ROW, SHEET_NAME, normalize_header, read_mdi_sheet, resolve_headers
+from conftest import write_mdi_workbook
+
+HEADERS = ['Scope', 'CompanyDoc.No.', 'IFI\nPlan  Date ', None, 'Scope', 'Remarks', 'Remarks', '']
+
+def test_schema_columns_only():
+    assert resolve_headers(HEADERS) == [('scope', 0), ('company_doc_no', 1), ('ifi_plan', 2)]
+
+def test_all_columns_name_extras_as_pandas_does():
+    assert resolve_headers(HEADERS, all_columns=True) == [
+        ('scope', 0), ('company_doc_no', 1), ('ifi_plan', 2), ('Unnamed: 3', 3),
+        ('Scope.1', 4), ('Remarks', 5), ('Remarks.1', 6), ('Unnamed: 7', 7),
+    ]
+
+def test_first_repeated_header_wins(tmp_path):
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', [
+        {'Scope': 'PTSC', 'CompanyDoc.No.': 'DOC-1', 'IFI\nPlan  Date ': '2024-05-01', 'Remarks': 'first'},
+    ], headers=['Scope', 'CompanyDoc.No.', 'IFI\nPlan  Date ', 'Remarks', 'Scope', 'Remarks'])
+
+    frame = read_mdi_sheet(excel_path, all_columns=True)
+    pandas_frame = pd.read_excel(excel_path, sheet_name=SHEET_NAME, header=HEADER_ROW - 1)
+
+    assert list(frame.columns) == ['scope', 'company_doc_no', 'ifi_plan', 'Remarks', 'Scope.1', 'Remarks.1']
+    # Apart from schema fields and whitespace, the names match pd.read_excel's
+    assert [normalize_header(name) for name in pandas_frame.columns[3:]] == list(frame.columns[3:])
+    assert frame.iloc[0].tolist()[:4] == ['PTSC', 'DOC-1', '2024-05-01', 'first']
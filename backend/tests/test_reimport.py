@@ -0,0 +1,87 @@
+"""Re-imports: file hash short-circuit and per-row hashes in import_row_hashes"""
+
+import sqlite3
+
+import excel_importer
+from data_version import bump_data_version
+from conftest import write_mdi_workbook, mdi_row
+
+def run_import(excel_path, db_path, **kwargs):
+    return excel_importer.process_excel_file(excel_path, db_path, progress=lambda *args: None, **kwargs)
+
+def data_version(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT version FROM data_version').fetchone()[0]
+    finally:
+        conn.close()
+
+def rows(count, changed=None):
+    return [mdi_row(f'DOC-{i}', ipi_status='IFA' if i == changed else 'IFR') for i in range(count)]
+
+def test_same_file_again_short_circuits(db_path, tmp_path):
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', rows(3))
+    run_import(excel_path, db_path)
+    version = data_version(db_path)
+
+    stats = run_import(excel_path, db_path)
+
+    assert stats['file_unchanged'] is True
+    assert (stats['count'], stats['unchanged']) == (0, 3)
+    assert data_version(db_path) == version
+
+def test_only_changed_rows_are_written(db_path, tmp_path):
+    run_import(write_mdi_workbook(tmp_path / 'v1.xlsx', rows(4)), db_path)
+    version = data_version(db_path)
+
+    stats = run_import(write_mdi_workbook(tmp_path / 'v2.xlsx', rows(4, changed=2)), db_path)
+
+    assert 'file_unchanged' not in stats
+    assert (stats['updated'], stats['unchanged']) == (1, 3)
+    assert data_version(db_path) == version + 1
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT ipi_status FROM documents WHERE companyDocNo = 'DOC-2'").fetchone() == ('IFA',)
+    conn.close()
+
+def test_other_writes_disable_the_short_circuit_but_not_row_skipping(db_path, tmp_path):
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', rows(3))
+    run_import(excel_path, db_path)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        bump_data_version(conn.cursor())
+    conn.close()
+
+    stats = run_import(excel_path, db_path)
+
+    assert 'file_unchanged' not in stats
+    assert (stats['count'], stats['unchanged']) == (0, 3)
+    # Nothing written, so the file is recorded at the current version again
+    assert run_import(excel_path, db_path)['file_unchanged'] is True
+
+def test_key_gaining_a_scanned_row_is_rewritten(db_path, tmp_path):
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', rows(2))
+    run_import(excel_path, db_path)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        # As a scan adds it: same companyDocNo, none of the imported fields
+        conn.execute("INSERT INTO documents (localPath, companyDocNo) VALUES ('/docs/DOC-1.pdf', 'DOC-1')")
+        bump_data_version(conn.cursor())
+    conn.close()
+
+    stats = run_import(excel_path, db_path)
+
+    assert (stats['updated'], stats['unchanged']) == (1, 1)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute(
+        "SELECT ipi_status FROM documents WHERE localPath = '/docs/DOC-1.pdf'").fetchone() == ('IFR',)
+    assert conn.execute(
+        "SELECT doc_count FROM import_row_hashes WHERE companyDocNo = 'DOC-1'").fetchone() == (2,)
+    conn.close()
+
+def test_cleaned_import_has_its_own_file_hash(db_path, tmp_path):
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', rows(2))
+    run_import(excel_path, db_path)
+
+    stats = run_import(excel_path, db_path, clean=True)
+
+    assert 'file_unchanged' not in stats
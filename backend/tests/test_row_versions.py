@@ -0,0 +1,99 @@
+"""row_version: per-row versions, tombstones and /api/documents/delta"""
+
+import sqlite3
+
+import excel_importer
+from conftest import write_mdi_workbook, mdi_row
+from db_connection import connect
+from row_version import query_delta
+
+def write(db_path, *statements):
+    conn = connect(db_path)
+    with conn:
+        for sql in statements:
+            conn.execute(sql)
+    conn.close()
+
+def current_version(db_path):
+    return query_delta(db_path, since=0)['version']
+
+def ids(documents):
+    return sorted(doc['id'] for doc in documents)
+
+def test_delta_returns_only_rows_written_after_since(db_path):
+    write(db_path, "INSERT INTO documents (localPath, companyDocNo) VALUES ('/d/1', 'DOC-1'), ('/d/2', 'DOC-2')")
+    since = current_version(db_path)
+    write(db_path, "UPDATE documents SET doc_status = 'Done' WHERE localPath = '/d/2'",
+          "INSERT INTO documents (localPath, companyDocNo) VALUES ('/d/3', 'DOC-3')")
+
+    delta = query_delta(db_path, since=since)
+
+    assert ids(delta['upserted']) == ['/d/2', '/d/3']
+    assert delta['deleted'] == []
+    assert delta['version'] > since
+    assert query_delta(db_path, since=delta['version'])['upserted'] == []
+
+def test_delete_leaves_a_tombstone(db_path):
+    write(db_path, "INSERT INTO documents (localPath, companyDocNo) VALUES ('/d/1', 'DOC-1'), ('/d/2', 'DOC-2')")
+    since = current_version(db_path)
+    write(db_path, "DELETE FROM documents WHERE localPath = '/d/1'")
+
+    delta = query_delta(db_path, since=since)
+
+    assert delta['deleted'] == ['/d/1']
+    assert delta['upserted'] == []
+
+def test_replace_into_is_an_update_not_a_delete(db_path):
+    write(db_path, "INSERT INTO documents (localPath, companyDocNo, name) VALUES ('/d/1', 'DOC-1', 'old')")
+    since = current_version(db_path)
+    # The scanner rewrites rows this way; its delete half must not tombstone the row
+    write(db_path, "REPLACE INTO documents (localPath, companyDocNo, name) VALUES ('/d/1', 'DOC-1', 'new')")
+
+    delta = query_delta(db_path, since=since)
+
+    assert [doc['title'] for doc in delta['upserted']] == ['new']
+    assert delta['deleted'] == []
+
+def test_row_leaving_the_mdi_set_is_reported_deleted(db_path):
+    write(db_path, "INSERT INTO documents (localPath, companyDocNo) VALUES ('/d/1', 'DOC-1')")
+    since = current_version(db_path)
+    write(db_path, "UPDATE documents SET companyDocNo = NULL WHERE localPath = '/d/1'")
+
+    assert query_delta(db_path, since=since)['deleted'] == ['/d/1']
+
+def test_since_ahead_of_the_database_asks_for_a_reset(client, db_path):
+    write(db_path, "INSERT INTO documents (localPath, companyDocNo) VALUES ('/d/1', 'DOC-1')")
+
+    data = client.get('/api/documents/delta?since=1000000').get_json()['data']
+
+    assert data['reset'] is True
+    assert data['upserted'] == [] and data['deleted'] == []
+    assert ids(client.get('/api/documents/delta?since=0').get_json()['data']['upserted']) == ['/d/1']
+
+def test_delta_never_migrates_the_database(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE documents (localPath TEXT PRIMARY KEY, companyDocNo TEXT)')
+    conn.execute("INSERT INTO documents VALUES ('/d/1', 'DOC-1')")
+    conn.commit()
+    conn.close()
+
+    delta = query_delta(db_path, since=0)
+
+    assert delta == {"version": 0, "reset": True, "upserted": [], "deleted": []}
+    conn = sqlite3.connect(db_path)
+    assert [row[1] for row in conn.execute('PRAGMA table_info(documents)')] == ['localPath', 'companyDocNo']
+    assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall() == []
+    conn.close()
+
+def test_import_installs_row_versions(db_path, tmp_path):
+    write(db_path, "INSERT INTO documents (localPath, companyDocNo) VALUES ('/d/1', 'DOC-1')",
+          *[f"DROP TRIGGER trg_row_version_{name}" for name in ('insert', 'update', 'delete')])
+    assert query_delta(db_path, since=1)['reset']
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', [mdi_row('DOC-1', doc_status='Done')])
+
+    excel_importer.process_excel_file(excel_path, db_path, progress=lambda *args: None)
+
+    delta = query_delta(db_path, since=1)
+    assert not delta['reset']
+    assert [(doc['id'], doc['status']) for doc in delta['upserted']] == [('/d/1', 'Done')]
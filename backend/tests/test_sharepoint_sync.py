@@ -0,0 +1,79 @@
+"""sharepoint_sync: unchanged files are skipped, using the manifest when the drive resets mtimes"""
+
+import json
+import os
+import sqlite3
+
+from sharepoint_sync import load_sync_manifest, sync_files
+
+def write(path, content, mtime):
+    path.write_bytes(content)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+def reset_mtime(path):
+    """What an upload to SharePoint does to the copy: same bytes, new mtime"""
+    os.utime(path, (2_000_000_000, 2_000_000_000))
+
+def test_manifest_skips_a_copy_whose_mtime_was_reset(tmp_path):
+    src = write(tmp_path / 'a.pdf', b'rev A', 1_700_000_000)
+    dest = str(tmp_path / 'dest.pdf')
+    results, summary = sync_files([(src, dest)])
+    assert summary['copied'] == 1
+    reset_mtime(dest)
+
+    without_manifest, _ = sync_files([(src, dest)])
+    manifest = {src: (dest, results[0]['size'], results[0]['mtime'])}
+    with_manifest, summary = sync_files([(src, dest)], manifest)
+
+    assert without_manifest[0]['status'] == 'copied'
+    assert with_manifest[0]['status'] == 'skipped'
+    assert summary['skipped'] == 1 and summary['bytes_copied'] == 0
+
+def test_changed_source_is_copied_despite_the_manifest(tmp_path):
+    src = write(tmp_path / 'a.pdf', b'rev A', 1_700_000_000)
+    dest = str(tmp_path / 'dest.pdf')
+    results, _ = sync_files([(src, dest)])
+    manifest = {src: (dest, results[0]['size'], results[0]['mtime'])}
+    write(tmp_path / 'a.pdf', b'rev B', 1_700_000_100)
+
+    results, _ = sync_files([(src, dest)], manifest)
+
+    assert results[0]['status'] == 'copied'
+    assert open(dest, 'rb').read() == b'rev B'
+
+def test_hash_verify_skips_identical_content(tmp_path):
+    src = write(tmp_path / 'a.pdf', b'same bytes', 1_700_000_000)
+    dest = write(tmp_path / 'dest.pdf', b'same bytes', 1_800_000_000)
+    other = write(tmp_path / 'other.pdf', b'diff bytes', 1_800_000_000)
+
+    results, _ = sync_files([(src, dest), (src, other)], verify='hash')
+
+    assert [result['status'] for result in results] == ['skipped', 'copied']
+
+def test_upload_records_the_manifest_and_skips_the_next_time(doc_processor, db_path, tmp_path, capsys):
+    local = tmp_path / 'local'
+    local.mkdir()
+    sp_root = tmp_path / 'sharepoint'
+    sp_root.mkdir()
+    src = write(local / 'LSP-PI-0001.pdf', b'rev A', 1_700_000_000)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("INSERT INTO documents (localPath, companyDocNo, discipline) VALUES (?, 'LSP-PI-0001', 'PI')", (src,))
+    conn.close()
+    documents = json.dumps([{'localPath': src, 'discipline': 'PI'}])
+    dest = str(sp_root / 'PI' / 'LSP-PI-0001.pdf')
+
+    first = doc_processor.upload_to_sharepoint(documents, str(sp_root), workers=2)
+    reset_mtime(dest)
+    second = doc_processor.upload_to_sharepoint(documents, str(sp_root), workers=2)
+    capsys.readouterr()
+
+    assert first['copied'] == 1
+    assert second['copied'] == 0 and second['skipped'] == 1
+    conn = sqlite3.connect(db_path)
+    manifest = load_sync_manifest(conn.cursor())
+    sharepoint_path = conn.execute('SELECT sharepointPath FROM documents WHERE localPath = ?', (src,)).fetchone()[0]
+    conn.close()
+    assert manifest == {src: (dest, 5, 1_700_000_000)}
+    assert sharepoint_path == dest
@@ -0,0 +1,97 @@
+"""stats_summary: trigger-maintained counts, read-only readers and rebuilds"""
+
+import sqlite3
+
+import excel_importer
+from db_connection import connect
+from stats_summary import (
+    check_stats_summary, ensure_stats_summary, read_stats_summary, summary_ready
+)
+from conftest import write_mdi_workbook, mdi_row
+
+def insert_documents(conn, rows):
+    with conn:
+        conn.executemany(
+            'INSERT INTO documents (localPath, discipline, doc_status, "table") VALUES (?, ?, ?, ?)', rows)
+
+def drop_summary(conn):
+    with conn:
+        for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_document_stats_%'").fetchall():
+            conn.execute(f'DROP TRIGGER {name}')
+        conn.execute('DROP TABLE document_stats')
+
+def test_counts_follow_replace_update_and_delete(db_path):
+    conn = connect(db_path)
+    insert_documents(conn, [('/d/1', 'E', 'Done', 'A'), ('/d/2', 'E', 'Waiting Cmt', 'A'), ('/d/3', 'M', None, 'B')])
+    with conn:
+        # The scanner rewrites rows with REPLACE INTO: the old row must be subtracted
+        conn.execute("REPLACE INTO documents (localPath, discipline, doc_status, \"table\") VALUES ('/d/1', 'M', 'Done', 'A')")
+        conn.execute("UPDATE documents SET doc_status = 'Done' WHERE localPath = '/d/2'")
+        conn.execute("DELETE FROM documents WHERE localPath = '/d/3'")
+
+    summary = read_stats_summary(conn)
+
+    assert dict(summary['discipline']) == {'E': 1, 'M': 1}
+    assert dict(summary['table_status']) == {('A', 'Done'): 2}
+    assert check_stats_summary(conn)['consistent']
+    conn.close()
+
+def test_reading_never_builds_the_summary(db_path):
+    conn = connect(db_path)
+    insert_documents(conn, [('/d/1', 'E', 'Done', 'A'), ('/d/2', None, 'Done', 'A')])
+    drop_summary(conn)
+
+    summary = read_stats_summary(conn)
+
+    assert dict(summary['discipline']) == {'E': 1, None: 1}
+    assert dict(summary['table_status']) == {('A', 'Done'): 2}
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'document_stats'").fetchone() is None
+    assert not conn.in_transaction
+    conn.close()
+
+def test_overdue_column_added_later_triggers_a_rebuild(db_path):
+    conn = connect(db_path)
+    insert_documents(conn, [('/d/1', 'E', 'Done', 'A')])
+    with conn:
+        conn.execute('ALTER TABLE documents ADD COLUMN is_overdue INTEGER')
+        conn.execute("UPDATE documents SET is_overdue = 1")
+
+    assert not summary_ready(conn.cursor())
+    assert dict(read_stats_summary(conn)['overdue']) == {1: 1}
+
+    ensure_stats_summary(conn)
+    with conn:
+        conn.execute("UPDATE documents SET is_overdue = 0")
+
+    assert summary_ready(conn.cursor())
+    assert dict(read_stats_summary(conn)['overdue']) == {0: 1}
+    assert check_stats_summary(conn)['consistent']
+    conn.close()
+
+def test_import_builds_the_summary(db_path, tmp_path):
+    conn = connect(db_path)
+    drop_summary(conn)
+    conn.close()
+    excel_path = write_mdi_workbook(tmp_path / 'mdi.xlsx', [mdi_row('DOC-1', doc_status='Done')])
+
+    excel_importer.process_excel_file(excel_path, db_path, progress=lambda *args: None)
+
+    conn = sqlite3.connect(db_path)
+    assert summary_ready(conn.cursor())
+    assert check_stats_summary(conn)['consistent']
+    conn.close()
+
+def test_live_fallback_gives_the_same_statistics(doc_processor, db_path, client):
+    conn = connect(db_path)
+    insert_documents(conn, [('/d/1', 'E', 'Overdue Cmt', 'A'), ('/d/2', 'M', 'Done', 'B'), ('/d/3', 'E', 'Done', None)])
+    materialized = doc_processor.get_document_stats()
+    api_materialized = client.get('/api/stats').get_json()
+    drop_summary(conn)
+    conn.close()
+
+    assert doc_processor.get_document_stats() == materialized
+    assert client.get('/api/stats').get_json()['stats'] == api_materialized['stats']
+    conn = sqlite3.connect(db_path)
+    assert not summary_ready(conn.cursor())
+    conn.close()
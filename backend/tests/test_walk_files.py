@@ -0,0 +1,65 @@
+"""doc_processor.walk_files: same directories, order and files as the os.walk loop it replaced"""
+
+import os
+
+import pytest
+
+ALLOWED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.xls', '.xlsx')
+
+def os_walk_files(root_folder):
+    """The scan loop before walk_files: os.walk, filtered by extension"""
+    return [
+        (dirpath, sorted(name for name in filenames if name.lower().endswith(ALLOWED_EXTENSIONS)))
+        for dirpath, _, filenames in os.walk(root_folder)
+    ]
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'project'
+    for folder in ('A/A1/deep', 'A/A2', 'B', 'C/empty', 'LSPET-TCPT-T-PI-0001'):
+        (root / folder).mkdir(parents=True)
+    for name in ('root.pdf', 'A/a.DOCX', 'A/skip.txt', 'A/A1/deep/x.xlsx', 'A/A2/y.xls',
+                 'B/b.doc', 'B/B.PDF', 'B/readme', 'LSPET-TCPT-T-PI-0001/TF1-2A19-PI-0001_A.pdf'):
+        (root / name).write_bytes(b'data')
+    # Symlinked directories are listed but not entered, as with followlinks=False
+    os.symlink(root / 'A', root / 'B' / 'link-to-A')
+    return str(root)
+
+def test_matches_os_walk(doc_processor, tree):
+    walked = [
+        (dirpath, sorted(name for name, _ in files))
+        for dirpath, files in doc_processor.walk_files(tree, workers=4)
+    ]
+
+    assert walked == os_walk_files(tree)
+
+def test_stats_are_the_files_own(doc_processor, tree):
+    for dirpath, files in doc_processor.walk_files(tree, workers=2):
+        for name, file_stat in files:
+            expected = os.stat(os.path.join(dirpath, name))
+            assert (file_stat.st_size, file_stat.st_mtime, file_stat.st_ino) == \
+                (expected.st_size, expected.st_mtime, expected.st_ino)
+
+def test_unlistable_directories_are_reported_and_skipped(doc_processor, tree, monkeypatch):
+    offline = os.path.join(tree, 'A')
+    scandir = os.scandir
+
+    def failing_scandir(path):
+        if path == offline:
+            raise PermissionError(13, 'Permission denied')
+        return scandir(path)
+
+    monkeypatch.setattr(doc_processor.os, 'scandir', failing_scandir)
+    errors = []
+
+    walked = [dirpath for dirpath, _ in doc_processor.walk_files(tree, onerror=errors.append)]
+
+    assert [error.filename for error in errors] == [offline]
+    assert not any(dirpath.startswith(offline) for dirpath in walked)
+    assert os.path.join(tree, 'B') in walked
+
+def test_missing_root_yields_nothing(doc_processor, tmp_path):
+    errors = []
+
+    assert list(doc_processor.walk_files(str(tmp_path / 'offline'), onerror=errors.append)) == []
+    assert [error.filename for error in errors] == [str(tmp_path / 'offline')]
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { DashboardView } from './components/DashboardView';
 import { DocumentTable } from './components/DocumentTable';
 import { AppHeader } from './components/AppHeader';
@@ -7,13 +7,15 @@ import { MDIDocument } from './types/mdi';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { useAppStore } from './store/useAppStore';
 import { Toaster } from 'sonner';
-import { loadDocumentsFromJSON, getExportMetadata } from './utils/dataLoader';
+import { API_URL, loadDocumentSnapshot, refreshDocuments, DocumentSnapshot } from './utils/dataLoader';
 
 const App = () => {
   const [documents, setDocuments] = useState<MDIDocument[]>([]);
   const [view, setView] = useState<'dashboard' | 'list'>('dashboard');
   const [loading, setLoading] = useState(true);
   const [dbStats, setDbStats] = useState<{ total: number; lastImport?: string } | null>(null);
+  // Browser mode: documents with the row version they are current to, for delta reloads
+  const snapshotRef = useRef<DocumentSnapshot>({ documents: [] });
   
   // Subscribe to store to auto-switch views if a filter is applied from Dashboard
   const filters = useAppStore((state) => state.filters);
@@ -23,6 +25,17 @@ const App = () => {
     loadDocumentsFromDB();
   }, []);
   
+  // Browser mode with a backend (VITE_API_URL): pick up database changes as a
+  // delta when the tab is shown again; the static build has nothing to poll
+  useEffect(() => {
+    if (typeof window === 'undefined' || window.electronAPI || !API_URL) return;
+    const onVisibilityChange = () => {
+      if (document.visibilityState === 'visible') applyDocumentChanges();
+    };
+    document.addEventListener('visibilitychange', onVisibilityChange);
+    return () => document.removeEventListener('visibilitychange', onVisibilityChange);
+  }, []);
+  
   useEffect(() => {
       // If a filter is applied (e.g. clicking a chart bar), switch to list view automatically
       if (filters.discipline || filters.status || filters.isOverdue) {
@@ -58,14 +71,16 @@ const App = () => {
         // Browser mode - load from static JSON
         console.log('[App] Running in browser mode - loading from static JSON...');
         
-        const docs = await loadDocumentsFromJSON();
+        const snapshot = await loadDocumentSnapshot();
+        snapshotRef.current = snapshot;
+        const docs = snapshot.documents;
         setDocuments(docs);
         
         if (docs.length > 0) {
           console.log(`[App] ✅ Loaded ${docs.length} documents from JSON`);
           
           // Get metadata for stats
-          const metadata = await getExportMetadata();
+          const metadata = snapshot.metadata;
           if (metadata) {
             setDbStats({
               total: metadata.totalDocuments,
@@ -84,6 +99,21 @@ const App = () => {
     }
   };
 
+  /**
+   * Browser mode: apply the changes since the loaded row version
+   * (/api/documents/delta); keeps the loaded documents if there is no delta
+   */
+  const applyDocumentChanges = async () => {
+    const previous = snapshotRef.current;
+    const snapshot = await refreshDocuments(previous);
+    if (snapshot === previous) return;
+    
+    snapshotRef.current = snapshot;
+    setDocuments(snapshot.documents);
+    // A delta only changes the total
+    setDbStats((stats) => ({ ...stats, total: snapshot.documents.length }));
+  };
+
   /**
    * Handle Excel import and save to database
    */
@@ -0,0 +1,182 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import {
+  applyDocumentDelta, decodeColumnarExport, loadDocumentSnapshot, refreshDocuments, DocumentDelta
+} from './dataLoader';
+import { MDIDocument } from '../types/mdi';
+
+const doc = (id: string, status = 'Waiting Cmt'): MDIDocument => ({
+  id,
+  stt: 1,
+  documentNo: `DOC-${id}`,
+  title: `Doc ${id}`,
+  revision: '0',
+  discipline: 'EE',
+  scope: 'PTSC',
+  docClass: '1',
+  table: '1',
+  item: 'A19',
+  status,
+  ipiStatus: 'IFR',
+  planDates: {},
+  actualDates: {},
+} as MDIDocument);
+
+const delta = (changes: Partial<DocumentDelta>): DocumentDelta => ({
+  version: 10,
+  reset: false,
+  upserted: [],
+  deleted: [],
+  ...changes,
+});
+
+const jsonResponse = (body: unknown) => ({ ok: true, json: async () => body }) as Response;
+
+const fullExport = {
+  metadata: {
+    exportDate: '2025-11-20',
+    totalDocuments: 1,
+    lastUpdate: '2025-11-20',
+    version: '2.0',
+    rowVersion: 42,
+    statistics: { total: 1, approved: 0, overdue: 0, disciplines: 1 },
+  },
+  documents: [doc('full')],
+};
+
+describe('decodeColumnarExport', () => {
+  it('expands dictionary columns and nests "parent.child" columns', () => {
+    const documents = decodeColumnarExport({
+      metadata: { ...fullExport.metadata, totalDocuments: 3 },
+      count: 3,
+      columns: {
+        id: ['a', 'b', 'c'],
+        status: { dictionary: ['Approved', null], codes: [0, 1, 0] },
+        'planDates.ifr': { dictionary: [null], codes: [0, 0, 0] },
+        'planDates.ifa': ['2025-01-01', null, '2025-03-01'],
+        isOverdue: { dictionary: [false, true], codes: [0, 0, 1] },
+      },
+    });
+
+    expect(documents).toEqual([
+      { id: 'a', status: 'Approved', planDates: { ifr: null, ifa: '2025-01-01' }, isOverdue: false },
+      { id: 'b', status: null, planDates: { ifr: null, ifa: null }, isOverdue: false },
+      { id: 'c', status: 'Approved', planDates: { ifr: null, ifa: '2025-03-01' }, isOverdue: true },
+    ]);
+  });
+
+  it('decodes an empty export', () => {
+    expect(decodeColumnarExport({ metadata: fullExport.metadata, count: 0, columns: {} })).toEqual([]);
+  });
+});
+
+describe('applyDocumentDelta', () => {
+  it('replaces updated documents in place', () => {
+    const result = applyDocumentDelta([doc('a'), doc('b'), doc('c')], delta({ upserted: [doc('b', 'Approved')] }));
+
+    expect(result.map((d) => d.id)).toEqual(['a', 'b', 'c']);
+    expect(result[1].status).toBe('Approved');
+  });
+
+  it('appends inserted documents', () => {
+    const result = applyDocumentDelta([doc('a')], delta({ upserted: [doc('new')] }));
+
+    expect(result.map((d) => d.id)).toEqual(['a', 'new']);
+  });
+
+  it('drops tombstoned documents', () => {
+    const result = applyDocumentDelta([doc('a'), doc('b')], delta({ deleted: ['a', 'unknown'] }));
+
+    expect(result.map((d) => d.id)).toEqual(['b']);
+  });
+
+  it('handles updates, inserts and tombstones together without mutating the input', () => {
+    const documents = [doc('a'), doc('b'), doc('c')];
+
+    const result = applyDocumentDelta(documents, delta({
+      upserted: [doc('d'), doc('c', 'Approved')],
+      deleted: ['b'],
+    }));
+
+    expect(result.map((d) => [d.id, d.status])).toEqual([
+      ['a', 'Waiting Cmt'],
+      ['c', 'Approved'],
+      ['d', 'Waiting Cmt'],
+    ]);
+    expect(documents.map((d) => d.id)).toEqual(['a', 'b', 'c']);
+  });
+});
+
+describe('loadDocumentSnapshot', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('loads the full export with its row version', async () => {
+    const fetchMock = vi.fn(async () => jsonResponse(fullExport));
+    vi.stubGlobal('fetch', fetchMock);
+
+    const snapshot = await loadDocumentSnapshot();
+
+    expect(fetchMock).toHaveBeenCalledWith('/data.json');
+    expect(snapshot.documents.map((d) => d.id)).toEqual(['full']);
+    expect(snapshot.rowVersion).toBe(42);
+    expect(snapshot.metadata?.totalDocuments).toBe(1);
+  });
+});
+
+describe('refreshDocuments', () => {
+  const apiUrl = 'http://localhost:5000/api';
+
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('applies the delta since the known row version', async () => {
+    const fetchMock = vi.fn(async () => jsonResponse({
+      success: true,
+      data: delta({ version: 43, upserted: [doc('b')], deleted: ['a'] }),
+    }));
+    vi.stubGlobal('fetch', fetchMock);
+
+    const snapshot = await refreshDocuments({ documents: [doc('a')], rowVersion: 42 }, apiUrl);
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(fetchMock).toHaveBeenCalledWith(`${apiUrl}/documents/delta?since=42`);
+    expect(snapshot.documents.map((d) => d.id)).toEqual(['b']);
+    expect(snapshot.rowVersion).toBe(43);
+    expect(snapshot.metadata).toBeUndefined();
+  });
+
+  it('does nothing without an API (static build) or a row version', async () => {
+    const fetchMock = vi.fn(async () => jsonResponse(fullExport));
+    vi.stubGlobal('fetch', fetchMock);
+    const loaded = { documents: [doc('a')], rowVersion: 42 };
+    const unversioned = { documents: [doc('a')] };
+
+    expect(await refreshDocuments(loaded, '')).toBe(loaded);
+    expect(await refreshDocuments(unversioned, apiUrl)).toBe(unversioned);
+    expect(fetchMock).not.toHaveBeenCalled();
+  });
+
+  it('never reloads data.json when the delta is unusable', async () => {
+    const responses = [
+      jsonResponse({ success: true, data: delta({ version: 3, reset: true }) }),
+      ({ ok: false, status: 404 }) as Response,
+    ];
+    const fetchMock = vi.fn(async () => responses.shift() as Response);
+    vi.stubGlobal('fetch', fetchMock);
+    const loaded = { documents: [doc('a')], rowVersion: 42 };
+
+    expect(await refreshDocuments(loaded, apiUrl)).toBe(loaded);
+    expect(await refreshDocuments(loaded, apiUrl)).toBe(loaded);
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+    expect(fetchMock).not.toHaveBeenCalledWith('/data.json');
+  });
+
+  it('keeps the loaded documents when the API is unreachable', async () => {
+    vi.stubGlobal('fetch', vi.fn(async () => { throw new Error('offline'); }));
+    const loaded = { documents: [doc('a')], rowVersion: 42 };
+
+    expect(await refreshDocuments(loaded, apiUrl)).toBe(loaded);
+  });
+});
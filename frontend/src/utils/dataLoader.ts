@@ -11,6 +11,8 @@ export interface DataExport {
     totalDocuments: number;
     lastUpdate: string;
     version: string;
+    rowVersion?: number; // starting point for /api/documents/delta
+    format?: 'columnar';
     statistics: {
       total: number;
       approved: number;
@@ -21,6 +23,58 @@ export interface DataExport {
   documents: MDIDocument[];
 }
 
+type ColumnarColumn = unknown[] | { dictionary: unknown[]; codes: number[] };
+
+export interface ColumnarExport {
+  metadata: DataExport['metadata'];
+  count: number;
+  columns: Record<string, ColumnarColumn>;
+}
+
+/**
+ * Rebuild documents from a columnar export (export_db_to_json_v2 --format=columnar):
+ * "parent.child" columns become nested objects, dictionary columns are expanded
+ */
+export function decodeColumnarExport(data: ColumnarExport): MDIDocument[] {
+  const fields = Object.entries(data.columns).map(([name, column]) => {
+    const values = Array.isArray(column) ? column : column.codes.map((code) => column.dictionary[code]);
+    const dot = name.indexOf('.');
+    return dot < 0
+      ? { key: name, subKey: null, values }
+      : { key: name.slice(0, dot), subKey: name.slice(dot + 1), values };
+  });
+  
+  const documents: Record<string, unknown>[] = [];
+  for (let i = 0; i < data.count; i++) {
+    const doc: Record<string, any> = {};
+    for (const { key, subKey, values } of fields) {
+      if (subKey === null) {
+        doc[key] = values[i];
+      } else {
+        (doc[key] ??= {})[subKey] = values[i];
+      }
+    }
+    documents.push(doc);
+  }
+  return documents as unknown as MDIDocument[];
+}
+
+/**
+ * Load the full JSON export (indented, compact or columnar) with its metadata
+ */
+export async function loadDocumentExport(): Promise<DataExport> {
+  const response = await fetch('/data.json');
+  
+  if (!response.ok) {
+    throw new Error(`Failed to fetch data.json: ${response.status}`);
+  }
+  
+  const raw = await response.json();
+  return raw.metadata?.format === 'columnar'
+    ? { metadata: raw.metadata, documents: decodeColumnarExport(raw) }
+    : raw;
+}
+
 /**
  * Load documents from static JSON file
  * Used for static web deployment (GitHub Pages)
@@ -29,13 +83,7 @@ export async function loadDocumentsFromJSON(): Promise<MDIDocument[]> {
   try {
     console.log('[DataLoader] Loading documents from static JSON...');
     
-    const response = await fetch('/data.json');
-    
-    if (!response.ok) {
-      throw new Error(`Failed to fetch data.json: ${response.status}`);
-    }
-    
-    const data: DataExport = await response.json();
+    const data = await loadDocumentExport();
     
     console.log('[DataLoader] ✅ Loaded data:');
     console.log(`  - Total: ${data.metadata.totalDocuments} documents`);
@@ -53,6 +101,92 @@ export async function loadDocumentsFromJSON(): Promise<MDIDocument[]> {
   }
 }
 
+export interface DocumentDelta {
+  version: number;
+  reset: boolean; // true: the database was rebuilt, reload everything
+  upserted: MDIDocument[];
+  deleted: string[];
+}
+
+/**
+ * Backend API base from VITE_API_URL (e.g. http://localhost:5000/api).
+ * Unset for the static build (GitHub Pages): there is no API to ask for deltas
+ */
+export const API_URL: string | undefined = import.meta.env.VITE_API_URL || undefined;
+
+/**
+ * Fetch documents inserted, updated or deleted since a row version
+ * (metadata.rowVersion of the JSON export, or version of the last delta)
+ */
+export async function fetchDocumentDelta(since: number, apiUrl: string): Promise<DocumentDelta | null> {
+  try {
+    const response = await fetch(`${apiUrl}/documents/delta?since=${since}`);
+    if (!response.ok) return null;
+    
+    const body: { success: boolean; data: DocumentDelta } = await response.json();
+    return body.success ? body.data : null;
+    
+  } catch (error) {
+    console.error('[DataLoader] Failed to fetch delta:', error);
+    return null;
+  }
+}
+
+/**
+ * Apply a delta to the loaded documents, keeping their order;
+ * new documents are appended
+ */
+export function applyDocumentDelta(documents: MDIDocument[], delta: DocumentDelta): MDIDocument[] {
+  const deleted = new Set(delta.deleted);
+  const upserted = new Map(delta.upserted.map((doc) => [doc.id, doc]));
+  
+  const result: MDIDocument[] = [];
+  for (const doc of documents) {
+    if (deleted.has(doc.id)) continue;
+    const updated = upserted.get(doc.id);
+    result.push(updated ?? doc);
+    upserted.delete(doc.id);
+  }
+  result.push(...upserted.values());
+  
+  console.log(`[DataLoader] Delta v${delta.version}: ${delta.upserted.length} upserted, ${delta.deleted.length} deleted`);
+  return result;
+}
+
+export interface DocumentSnapshot {
+  documents: MDIDocument[];
+  rowVersion?: number; // version the documents are current to, if known
+  metadata?: DataExport['metadata']; // set when the snapshot came from a full load
+}
+
+/**
+ * Full load of the JSON export, remembering its row version for later deltas
+ */
+export async function loadDocumentSnapshot(): Promise<DocumentSnapshot> {
+  const data = await loadDocumentExport();
+  return { documents: data.documents, rowVersion: data.metadata.rowVersion, metadata: data.metadata };
+}
+
+/**
+ * Bring loaded documents up to date with the delta since snapshot.rowVersion.
+ * Never reloads data.json: without an API, a row version or a usable delta
+ * (endpoint down, or reset after a rebuild) the snapshot is returned as is
+ */
+export async function refreshDocuments(snapshot: DocumentSnapshot, apiUrl = API_URL): Promise<DocumentSnapshot> {
+  if (!apiUrl || snapshot.rowVersion === undefined) return snapshot;
+  
+  const delta = await fetchDocumentDelta(snapshot.rowVersion, apiUrl);
+  if (!delta) return snapshot;
+  if (delta.reset) {
+    console.log('[DataLoader] Database was rebuilt, reload the page for the full data');
+    return snapshot;
+  }
+  return {
+    documents: applyDocumentDelta(snapshot.documents, delta),
+    rowVersion: delta.version
+  };
+}
+
 /**
  * Get metadata from JSON export
  */